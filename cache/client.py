@@ -1,21 +1,33 @@
 # cache/redis_client.py
 from __future__ import annotations
 
-import redis
-from config import REDIS_HOST, REDIS_PORT
+from typing import TYPE_CHECKING, Optional
+
+from config import REDIS_HOST, REDIS_PORT, REDIS_PING_ON_CONNECT
+
+if TYPE_CHECKING:
+    import redis
 
 
 _redis_client: redis.Redis | None = None
 
 
-def get_redis() -> redis.Redis:
+def get_redis(*, ping: Optional[bool] = None) -> redis.Redis:
+    """
+    Process-wide client (connections are opened on first use). ping (default
+    REDIS_PING_ON_CONNECT) checks reachability once, when the client is created.
+    """
     global _redis_client
     if _redis_client is None:
-        _redis_client = redis.Redis(
+        import redis
+
+        client = redis.Redis(
             host=REDIS_HOST,
             port=REDIS_PORT,
             decode_responses=False,
         )
-        # Fail fast if Redis is unreachable
-        _redis_client.ping()
+        if REDIS_PING_ON_CONNECT if ping is None else ping:
+            # Fail fast if Redis is unreachable
+            client.ping()
+        _redis_client = client
     return _redis_client
@@ -0,0 +1,106 @@
+# cache/codec.py
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import CACHE_VECTOR_DTYPE, CACHE_COMPRESS, CACHE_COMPRESS_MIN_BYTES
+
+# Binary Redis cache values:  MAGIC(2) | version(1) | kind(1) | flags(1) | body
+# Anything else (older JSON entries, other versions) decodes to None = cache miss.
+MAGIC = b"\xc4\x1e"
+CODEC_VERSION = 1
+
+_KIND_VECTOR = ord("V")
+_KIND_MATCHES = ord("M")
+
+_FLAG_F16 = 0x01
+_FLAG_ZLIB = 0x02
+
+_HEADER = struct.Struct("<2sBBB")
+
+
+def vector_bytes(vec: Sequence[float]) -> bytes:
+    """float32 bytes of a vector (what Pinecone keeps anyway)."""
+    return array("f", vec).tobytes()
+
+
+def vector_digest(vec: Sequence[float]) -> str:
+    """Stable cache-key digest, hashed directly over the packed float32 bytes."""
+    return hashlib.sha1(vector_bytes(vec)).hexdigest()
+
+
+def _pack(kind: int, flags: int, body: bytes) -> bytes:
+    if CACHE_COMPRESS and len(body) >= CACHE_COMPRESS_MIN_BYTES:
+        packed = zlib.compress(body, 1)
+        if len(packed) < len(body):
+            body, flags = packed, flags | _FLAG_ZLIB
+    return _HEADER.pack(MAGIC, CODEC_VERSION, kind, flags) + body
+
+
+def _unpack(blob: Optional[bytes], kind: int) -> Optional[tuple]:
+    if not blob or len(blob) < _HEADER.size:
+        return None
+    magic, version, k, flags = _HEADER.unpack_from(blob)
+    if magic != MAGIC or version != CODEC_VERSION or k != kind:
+        return None
+    body = blob[_HEADER.size:]
+    if flags & _FLAG_ZLIB:
+        body = zlib.decompress(body)
+    return flags, body
+
+
+def encode_vector(vec: Sequence[float], *, dtype: str = CACHE_VECTOR_DTYPE) -> bytes:
+    """float32 (lossless for our embeddings) or float16 (half the size)."""
+    if dtype == "float16":
+        return _pack(_KIND_VECTOR, _FLAG_F16, struct.pack(f"<{len(vec)}e", *vec))
+    return _pack(_KIND_VECTOR, 0, vector_bytes(vec))
+
+
+def decode_vector(blob: Optional[bytes]) -> Optional[List[float]]:
+    hit = _unpack(blob, _KIND_VECTOR)
+    if hit is None:
+        return None
+    flags, body = hit
+    if flags & _FLAG_F16:
+        return list(struct.unpack(f"<{len(body) // 2}e", body))
+    a = array("f")
+    a.frombytes(body)
+    return a.tolist()
+
+
+def encode_matches(matches: List[Dict[str, Any]], *, meta_fields: Sequence[str] = ()) -> bytes:
+    """
+    Query matches as  n | float32 scores | JSON {ids, meta}; only `meta_fields`
+    of each match's metadata are kept (the rest is hydrated from the docstore).
+    """
+    ids = [m["id"] for m in matches]
+    scores = array("f", (float(m.get("score", 0.0) or 0.0) for m in matches))
+    doc: Dict[str, Any] = {"ids": ids}
+    if meta_fields:
+        doc["meta"] = [
+            {k: md[k] for k in meta_fields if k in md}
+            for md in ((m.get("metadata") or {}) for m in matches)
+        ]
+    body = struct.pack("<I", len(ids)) + scores.tobytes() + json.dumps(doc, separators=(",", ":")).encode("utf-8")
+    return _pack(_KIND_MATCHES, 0, body)
+
+
+def decode_matches(blob: Optional[bytes]) -> Optional[List[Dict[str, Any]]]:
+    hit = _unpack(blob, _KIND_MATCHES)
+    if hit is None:
+        return None
+    _, body = hit
+    (n,) = struct.unpack_from("<I", body)
+    scores = array("f")
+    scores.frombytes(body[4:4 + 4 * n])
+    doc = json.loads(body[4 + 4 * n:])
+    metas = doc.get("meta") or [{}] * n
+    return [
+        {"id": cid, "score": score, "metadata": md}
+        for cid, score, md in zip(doc["ids"], scores.tolist(), metas)
+    ]
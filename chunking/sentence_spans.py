@@ -0,0 +1,229 @@
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from chunking.sentence_aware import (
+    _PAR_SPLIT,
+    _SENT_SPLIT,
+    _normalize_whitespace,
+)
+
+# Same output as chunking.sentence_aware.chunk, computed in one pass:
+# - every regex runs once per block (no re-splitting of finished chunks)
+# - units / chunks are (start, end) offsets into the normalized page text
+# - overlap tails are derived from unit + sentence boundaries already found
+#
+# Characters that make a unit join a sentence boundary (mirrors _SENT_SPLIT's
+# lookbehind / lookahead).
+_SENT_END = frozenset(".!?")
+_SENT_START_EXTRA = frozenset("\"'(")
+
+Span = Tuple[int, int]
+
+# Equivalent to sentence_aware._CLAUSE_SPLIT ("(?<!\S)" == "(?<=\s)|^" without
+# MULTILINE; "[0-9]{1,3}[.)]" == "[0-9]{1,3}\.|[0-9]{1,3}\)"), but cheaper to scan.
+_CLAUSE_FAST = re.compile(r"(?<!\S)(?:\(?[a-zA-Z]\)|[0-9]{1,3}[.)])\s+")
+
+
+def _normalize(text: str) -> str:
+    """_normalize_whitespace, skipping the regex pass when it would be a no-op."""
+    if "\t" in text or "  " in text or "\r\n" in text:
+        return _normalize_whitespace(text)
+    return text.strip()
+
+
+@dataclass(frozen=True)
+class ChunkSpan:
+    """
+    start/end: the chunk body in the normalized page text (for loader output this
+    is the page text itself). overlap_start: where the overlap tail borrowed from
+    the previous chunk begins (== start when there is no overlap).
+    """
+    start: int
+    end: int
+    overlap_start: int
+    text: str
+
+
+def _strip_span(t: str, s: int, e: int) -> Span:
+    while s < e and t[s].isspace():
+        s += 1
+    while e > s and t[e - 1].isspace():
+        e -= 1
+    return s, e
+
+
+def _gaps(matches, base: int, end: int) -> List[Span]:
+    """Equivalent of pattern.split(): the text between matches, as offsets."""
+    out: List[Span] = []
+    pos = base
+    for m in matches:
+        out.append((pos, base + m.start()))
+        pos = base + m.end()
+    out.append((pos, end))
+    return out
+
+
+def _is_sent_start(ch: str) -> bool:
+    return ("A" <= ch <= "Z") or ("0" <= ch <= "9") or ch in _SENT_START_EXTRA
+
+
+class _Page:
+    """Normalized text + units + sentence-boundary whitespace runs (sorted)."""
+
+    __slots__ = ("t", "units", "ws_starts", "ws_ends")
+
+    def __init__(self, text: str):
+        t = _normalize(text)
+        self.t = t
+        self.units: List[Span] = []
+        self.ws_starts: List[int] = []
+        self.ws_ends: List[int] = []
+        if not t:
+            return
+
+        if "\n\n" in t:
+            blocks = [_strip_span(t, s, e) for s, e in _gaps(_PAR_SPLIT.finditer(t), 0, len(t))]
+        else:
+            blocks = [(0, len(t))]  # already stripped by _normalize
+
+        for bs, be in blocks:
+            if bs >= be:
+                continue
+            b = t if (bs == 0 and be == len(t)) else t[bs:be]
+
+            # Sentence boundaries are needed for every block (overlap tails), so
+            # record them once; sentence pieces need no stripping: each starts at the
+            # lookahead char and ends at the punctuation (block edges are stripped).
+            sent_units: List[Span] = []
+            pos = bs
+            for m in _SENT_SPLIT.finditer(b):
+                a, z = m.span()
+                a += bs
+                z += bs
+                self.ws_starts.append(a)
+                self.ws_ends.append(z)
+                sent_units.append((pos, a))
+                pos = z
+            sent_units.append((pos, be))
+
+            parts: List[Span] = []
+            pos = bs
+            for m in _CLAUSE_FAST.finditer(b):
+                a, z = m.span()
+                parts.append((pos, bs + a))
+                pos = bs + z
+            if parts:
+                parts.append((pos, be))
+                parts = [sp for sp in (_strip_span(t, s, e) for s, e in parts) if sp[0] < sp[1]]
+
+            if len(parts) >= 2:
+                self.units.extend(parts)
+            else:
+                self.units.extend(sp for sp in sent_units if sp[0] < sp[1])
+
+    def internal_boundaries(self, s: int, e: int) -> List[Span]:
+        """Sentence-boundary whitespace runs that lie strictly inside t[s:e]."""
+        i = bisect_left(self.ws_starts, s + 1)
+        out: List[Span] = []
+        while i < len(self.ws_starts) and self.ws_ends[i] < e:
+            out.append((self.ws_starts[i], self.ws_ends[i]))
+            i += 1
+        return out
+
+    def join_is_boundary(self, left: Span, right: Span) -> bool:
+        return self.t[left[1] - 1] in _SENT_END and _is_sent_start(self.t[right[0]])
+
+
+def _pack(page: _Page, chunk_size: int) -> List[List[Span]]:
+    """Pack units into chunks (same rules as sentence_aware.chunk). Each chunk = its segments."""
+    t = page.t
+    chunks: List[List[Span]] = []
+    current: List[Span] = []
+    current_len = 0
+
+    for s, e in page.units:
+        u_len = e - s
+        # If one unit is huge, hard-split it
+        if u_len > chunk_size:
+            if current:
+                chunks.append(current)
+            current, current_len = [], 0
+            for i in range(s, e, chunk_size):
+                ps, pe = _strip_span(t, i, min(i + chunk_size, e))
+                if ps < pe:
+                    chunks.append([(ps, pe)])
+            continue
+
+        if current_len + u_len + (1 if current else 0) <= chunk_size:
+            current_len += u_len + (1 if current else 0)
+            current.append((s, e))
+        else:
+            if current:
+                chunks.append(current)
+            current, current_len = [(s, e)], u_len
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _tail(page: _Page, segs: List[Span], n: int) -> Tuple[int, str]:
+    """
+    Last n sentences of a chunk, as sentence_aware's overlap produced them
+    (boundaries collapsed to one space). Walks backwards from the chunk end and
+    only touches the segments it needs.
+    """
+    t = page.t
+    pieces_left = n
+    subsegs: List[Span] = []  # collected in reverse
+
+    for j in range(len(segs) - 1, -1, -1):
+        s, e = segs[j]
+        hi = e
+        for ws_s, ws_e in reversed(page.internal_boundaries(s, e)):
+            subsegs.append((ws_e, hi))
+            hi = ws_s
+            pieces_left -= 1
+            if pieces_left == 0:
+                break
+        if pieces_left == 0:
+            break
+        subsegs.append((s, hi))
+        if j > 0 and page.join_is_boundary(segs[j - 1], segs[j]):
+            pieces_left -= 1
+            if pieces_left == 0:
+                break
+
+    subsegs.reverse()
+    return subsegs[0][0], " ".join(t[a:b] for a, b in subsegs)
+
+
+def chunk_spans(text: str, chunk_size: int = 900, overlap_sentences: int = 1) -> List[ChunkSpan]:
+    """
+    Sentence/clause-aware chunking as offsets. Text output is identical to
+    chunking.sentence_aware.chunk for the same arguments.
+    """
+    page = _Page(text)
+    if not page.units:
+        return []
+
+    t = page.t
+    packed = _pack(page, chunk_size)
+    bodies = [" ".join(t[s:e] for s, e in segs) for segs in packed]
+
+    out: List[ChunkSpan] = []
+    for i, segs in enumerate(packed):
+        start, end = segs[0][0], segs[-1][1]
+        if i == 0 or overlap_sentences <= 0:
+            out.append(ChunkSpan(start, end, start, bodies[i]))
+            continue
+        tail_start, tail = _tail(page, packed[i - 1], overlap_sentences)
+        out.append(ChunkSpan(start, end, tail_start, tail + " " + bodies[i]))
+    return out
+
+
+def chunk(text: str, chunk_size: int = 900, overlap_sentences: int = 1) -> List[str]:
+    """Drop-in replacement for sentence_aware.chunk (same output, single pass)."""
+    return [c.text for c in chunk_spans(text, chunk_size=chunk_size, overlap_sentences=overlap_sentences)]
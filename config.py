@@ -13,17 +13,54 @@ load_dotenv(ROOT / ".env")
 # OpenAI
 # -----------------------------
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise RuntimeError("Missing OPENAI_API_KEY in .env")
 
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+def require_openai_key() -> str:
+    """
+    Checked when an OpenAI client is first built (not at import), so offline
+    tooling (benchmarks, local backends) can import config without a key.
+    """
+    if not OPENAI_API_KEY:
+        raise RuntimeError("Missing OPENAI_API_KEY in .env")
+    return OPENAI_API_KEY
+
+# Embedding backend: "openai" (API) or "local" (sentence-transformers model on this
+# machine, loaded once and kept warm; no network round trip per query).
+# Defaults below follow the backend, so each backend gets its own model id, dimension,
+# Pinecone index (fia-rag-<dim>) and namespace (+ "_local") and both can coexist.
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "openai").strip().lower()
+if EMBED_BACKEND not in ("openai", "local"):
+    raise RuntimeError(f"Unknown EMBED_BACKEND={EMBED_BACKEND!r} (expected 'openai' or 'local')")
+_LOCAL_EMBED = EMBED_BACKEND == "local"
+
+EMBEDDING_MODEL = os.getenv(
+    "EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5" if _LOCAL_EMBED else "text-embedding-3-small"
+)
 GEN_MODEL = os.getenv("GEN_MODEL", "gpt-4.1-mini")
 
-# Vector dimension (matches text-embedding-3-small)
+# Vector dimension (matches the default model of the backend: 384 / 1536)
 # If you ever change embedding model, you MUST update dimension + index.
-EMBED_DIM = int(os.getenv("EMBED_DIM", "1536"))
+EMBED_DIM = int(os.getenv("EMBED_DIM", "384" if _LOCAL_EMBED else "1536"))
 METRIC = os.getenv("METRIC", "cosine")  # Pinecone index metric
 
+# Local backend only: runtime ("torch" or "onnx"), device and inference batch size
+LOCAL_EMBED_RUNTIME = os.getenv("LOCAL_EMBED_RUNTIME", "torch").strip().lower()
+LOCAL_EMBED_DEVICE = os.getenv("LOCAL_EMBED_DEVICE", "cpu")
+LOCAL_EMBED_BATCH_SIZE = int(os.getenv("LOCAL_EMBED_BATCH_SIZE", "32"))
+
+# Embedding request packing (per-request budgets; OpenAI caps a request at
+# 2048 inputs / 300k tokens, smaller batches keep latency + memory per batch low)
+EMBED_MAX_BATCH_TOKENS = int(os.getenv("EMBED_MAX_BATCH_TOKENS", "60000"))
+EMBED_MAX_BATCH_ITEMS = int(os.getenv("EMBED_MAX_BATCH_ITEMS", "256"))
+
+# Query-time micro-batching: while an embeddings request is in flight, embed_query
+# calls arriving within the window (or until EMBED_MICROBATCH_MAX are waiting) share
+# the next one; a call with nothing in flight is sent at once
+EMBED_MICROBATCH_ENABLED = os.getenv("EMBED_MICROBATCH_ENABLED", "1") == "1"
+EMBED_MICROBATCH_WINDOW_MS = float(os.getenv("EMBED_MICROBATCH_WINDOW_MS", "2"))
+EMBED_MICROBATCH_MAX = int(os.getenv("EMBED_MICROBATCH_MAX", "64"))
+EMBED_MICROBATCH_CONCURRENCY = int(os.getenv("EMBED_MICROBATCH_CONCURRENCY", "4"))  # requests in flight
+
 # Dataset name (useful for multi-dataset projects later)
 DATASET_NAME = os.getenv("DATASET_NAME", "fia")
 
@@ -34,6 +71,65 @@ PDF_DIR = os.getenv("PDF_DIR", str(ROOT / "data" / "fia_pdfs"))
 
 # DocStore (chunk text store)
 DOCSTORE_PATH = os.getenv("DOCSTORE_PATH", str(ROOT / "docstore.sqlite"))
+# FTS5 / BM25 index over chunk text in the docstore (maintained at ingest; needed by
+# RETRIEVAL_MODE=hybrid / lexical)
+LEXICAL_INDEX_ENABLED = os.getenv("LEXICAL_INDEX_ENABLED", "1") == "1"
+# Connections: one writer + a persistent read connection per thread.
+# WAL lets readers run while ingest writes (turn off on filesystems without shared
+# memory, e.g. network mounts); mmap / page cache are per read connection.
+DOCSTORE_WAL = os.getenv("DOCSTORE_WAL", "1") == "1"
+DOCSTORE_MMAP_BYTES = int(os.getenv("DOCSTORE_MMAP_BYTES", str(256 * 1024 * 1024)))
+DOCSTORE_CACHE_KB = int(os.getenv("DOCSTORE_CACHE_KB", "16384"))
+# Bound parameters per IN (...) statement (docstore, embedding cache); bigger lookups
+# are split (SQLite builds before 3.32 cap bound parameters at 999)
+DOCSTORE_MAX_VARS = int(os.getenv("DOCSTORE_MAX_VARS", "512"))
+if DOCSTORE_MAX_VARS < 1 or DOCSTORE_MAX_VARS > 999:
+    raise RuntimeError("DOCSTORE_MAX_VARS must be between 1 and 999")
+
+# Index manifest: (namespace, source) -> version_hash + chunk_ids
+# Lives next to the docstore by default so both stay consistent.
+MANIFEST_PATH = os.getenv("MANIFEST_PATH", DOCSTORE_PATH)
+# Incremental builds skip PDFs whose version_hash is unchanged
+INCREMENTAL_INDEX = os.getenv("INCREMENTAL_INDEX", "0") == "1"
+
+# Article lookup index: (season, series, regulation_type, article) -> chunk ids.
+# Built at ingest; explicit-article queries use it instead of embedding + vector search.
+ARTICLE_INDEX_ENABLED = os.getenv("ARTICLE_INDEX_ENABLED", "1") == "1"
+ARTICLE_INDEX_PATH = os.getenv("ARTICLE_INDEX_PATH", DOCSTORE_PATH)
+
+# Per-article clause diffs between seasons of the same regulation (latest issue of
+# each season), rebuilt from the article index after ingest. Compare queries read
+# them instead of retrieving raw chunks for every season.
+ARTICLE_DIFF_ENABLED = os.getenv("ARTICLE_DIFF_ENABLED", "1") == "1"
+ARTICLE_DIFF_PATH = os.getenv("ARTICLE_DIFF_PATH", DOCSTORE_PATH)
+ARTICLE_DIFF_MAX_ITEMS = int(os.getenv("ARTICLE_DIFF_MAX_ITEMS", "8"))    # clauses shown per added/removed/changed
+ARTICLE_DIFF_MAX_CHARS = int(os.getenv("ARTICLE_DIFF_MAX_CHARS", "300"))  # chars shown per clause
+
+# Content-addressed embedding store used by ingestion:
+# hash(model, dim, chunk text) -> vector, so only new texts hit the embeddings API
+EMBED_STORE_ENABLED = os.getenv("EMBED_STORE_ENABLED", "1") == "1"
+EMBED_STORE_PATH = os.getenv("EMBED_STORE_PATH", str(ROOT / "embeddings.sqlite"))
+
+# Two-stage retrieval: Pinecone stores only the first FIRST_STAGE_DIM components of
+# each embedding (renormalized; text-embedding-3 models are trained to be shortened).
+# Recall is oversampled by RESCORE_OVERSAMPLE and rescored with the full-dimension
+# vectors kept in the embedding store. 0 = off (Pinecone stores EMBED_DIM vectors).
+FIRST_STAGE_DIM = int(os.getenv("FIRST_STAGE_DIM", "0"))
+RESCORE_OVERSAMPLE = float(os.getenv("RESCORE_OVERSAMPLE", "2"))
+if FIRST_STAGE_DIM:
+    if not 0 < FIRST_STAGE_DIM < EMBED_DIM:
+        raise RuntimeError(f"FIRST_STAGE_DIM={FIRST_STAGE_DIM} must be between 1 and EMBED_DIM-1 ({EMBED_DIM - 1})")
+    if not EMBED_STORE_ENABLED:
+        raise RuntimeError("FIRST_STAGE_DIM needs EMBED_STORE_ENABLED=1 (full vectors for rescoring)")
+# Dimension of the vectors in the vector index
+INDEX_DIM = FIRST_STAGE_DIM or EMBED_DIM
+
+# Cross-season dedup: chunks that are identical (content hash) or near-identical
+# (SimHash within DEDUP_MAX_DISTANCE bits) across seasons/issues share one vector.
+# Membership lives in metadata (season_tags / issue_tags) and the docstore (chunk_members).
+# Uses its own namespace (PINECONE_NAMESPACE + "_dedup") and always does full builds.
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "0") == "1"
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))  # 0 = exact duplicates only
 
 # -----------------------------
 # PDF cleaning (header/footer removal)
@@ -44,6 +140,22 @@ HF_MIN_LINE_LEN = int(os.getenv("HF_MIN_LINE_LEN", "8"))
 HF_MAX_LINE_LEN = int(os.getenv("HF_MAX_LINE_LEN", "180"))
 HF_MAX_REMOVE_PER_PAGE = int(os.getenv("HF_MAX_REMOVE_PER_PAGE", "6"))  # safety cap
 
+# -----------------------------
+# PDF extraction (backend + parallelism)
+# -----------------------------
+# Text backend: "pypdf" (default, pure Python), "pymupdf" or "pdfium" (optional, much faster)
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf").strip().lower()
+# 0/1 = serial (default), N = process pool with N workers, -1 = one worker per CPU
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+# Large PDFs are split into page ranges of this size so one big document
+# does not pin a single worker while the others sit idle.
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "48"))
+
+# Cleaned page text cache keyed by file_version_hash + HF_*/CLEAN_HEADERS_FOOTERS,
+# so repeated builds (e.g. chunking experiments) skip PDF parsing entirely.
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1") == "1"
+PAGE_CACHE_PATH = os.getenv("PAGE_CACHE_PATH", str(ROOT / "page_cache.sqlite"))
+
 # -----------------------------
 # Chunking
 # -----------------------------
@@ -56,11 +168,42 @@ OVERLAP = int(os.getenv("OVERLAP", "100"))
 # sentence-aware chunker (units)
 OVERLAP_SENTENCES = int(os.getenv("OVERLAP_SENTENCES", "1"))
 
+# -----------------------------
+# Ingestion pipeline
+# -----------------------------
+# Ingest batches are packed by EMBED_MAX_BATCH_TOKENS / EMBED_MAX_BATCH_ITEMS (one embed request);
+# upserts are split further into UPSERT_BATCH_SIZE vectors (Pinecone request size limits).
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "96"))
+INGEST_PAGE_QUEUE = int(os.getenv("INGEST_PAGE_QUEUE", "64"))  # pages buffered between load and chunking
+INGEST_BATCH_QUEUE = int(os.getenv("INGEST_BATCH_QUEUE", "4"))  # batches buffered before the write stages
+# Requests in flight per network stage during ingestion (1 + 1 = old sequential behaviour)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))
+# Bulk upserts: requests are also capped by JSON payload size (Pinecone: 2 MB / request),
+# sent UPSERT_PARALLEL at a time; 429 / 5xx / network errors are retried with jittered backoff
+UPSERT_MAX_REQUEST_BYTES = int(os.getenv("UPSERT_MAX_REQUEST_BYTES", "1800000"))
+UPSERT_PARALLEL = int(os.getenv("UPSERT_PARALLEL", "4"))
+UPSERT_MAX_RETRIES = int(os.getenv("UPSERT_MAX_RETRIES", "5"))
+UPSERT_BACKOFF_S = float(os.getenv("UPSERT_BACKOFF_S", "0.5"))
+UPSERT_BACKOFF_MAX_S = float(os.getenv("UPSERT_BACKOFF_MAX_S", "30"))
+
 # -----------------------------
 # Retrieval + reranking knobs
 # -----------------------------
 RERANK_ENABLED = os.getenv("RERANK_ENABLED", "1") == "1"
 RECALL_K = int(os.getenv("RECALL_K", "24"))
+# Vector queries in flight for one retrieve_many call (compare plans)
+RETRIEVE_CONCURRENCY = int(os.getenv("RETRIEVE_CONCURRENCY", "8"))
+# "vector" (dense only), "hybrid" (dense + BM25, reciprocal-rank fusion) or
+# "lexical" (BM25 only: no embedding / vector store calls)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector").strip().lower()
+if RETRIEVAL_MODE not in ("vector", "hybrid", "lexical"):
+    raise RuntimeError(f"Unknown RETRIEVAL_MODE={RETRIEVAL_MODE!r} (expected 'vector', 'hybrid' or 'lexical')")
+if RETRIEVAL_MODE != "vector" and not LEXICAL_INDEX_ENABLED:
+    raise RuntimeError(f"RETRIEVAL_MODE={RETRIEVAL_MODE} needs LEXICAL_INDEX_ENABLED=1")
+RRF_K = int(os.getenv("RRF_K", "60"))  # fused score = sum 1 / (RRF_K + rank)
+# hybrid: answer from BM25 alone when the dense side fails or takes longer (0 = wait)
+HYBRID_VECTOR_TIMEOUT_S = float(os.getenv("HYBRID_VECTOR_TIMEOUT_S", "0"))
 TOP_K = int(os.getenv("TOP_K", "6"))
 
 RERANK_MODEL = os.getenv("RERANK_MODEL", "gpt-4.1-mini")
@@ -75,22 +218,77 @@ CROSS_ENCODER_BATCH_SIZE = int(os.getenv("CROSS_ENCODER_BATCH_SIZE", "16"))
 # Pinecone (Vector DB)
 # -----------------------------
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_INDEX = os.getenv("PINECONE_INDEX", "fia-rag-1536")
+PINECONE_INDEX = os.getenv("PINECONE_INDEX", f"fia-rag-{INDEX_DIM}")
 PINECONE_NAMESPACE = os.getenv("PINECONE_NAMESPACE", f"{DATASET_NAME}_{CHUNKER}")
+# Local-model vectors live apart from OpenAI vectors
+if _LOCAL_EMBED and "_local" not in PINECONE_NAMESPACE:
+    PINECONE_NAMESPACE += "_local"
+# Deduplicated vectors never share a namespace with per-chunk vectors
+if DEDUP_ENABLED and not PINECONE_NAMESPACE.endswith("_dedup"):
+    PINECONE_NAMESPACE += "_dedup"
+
+# Vector layout: "none" (everything in PINECONE_NAMESPACE), "season" or "season_series"
+# (one namespace per season / season x series: <PINECONE_NAMESPACE>__2024[_f1]).
+# Season-scoped queries then search only their partitions, without season filters.
+# Each layout has its own manifest (MANIFEST_TARGET): the first build after changing
+# it, incremental or not, writes every document into the new partitions.
+NAMESPACE_PARTITION = os.getenv("NAMESPACE_PARTITION", "none").strip().lower()
+if NAMESPACE_PARTITION not in ("none", "season", "season_series"):
+    raise RuntimeError(
+        f"Unknown NAMESPACE_PARTITION={NAMESPACE_PARTITION!r} (expected 'none', 'season' or 'season_series')"
+    )
+if NAMESPACE_PARTITION != "none" and DEDUP_ENABLED:
+    # one deduplicated vector stands for chunks of several seasons
+    raise RuntimeError("NAMESPACE_PARTITION needs DEDUP_ENABLED=0")
+# Queries without a season scope fan out over the partitions the index manifest lists;
+# retrievers re-read that list this often (builds in the same process refresh it at once)
+PARTITION_REFRESH_S = float(os.getenv("PARTITION_REFRESH_S", "60"))
 
 # Recommended: use host-based Index(host=...) in prod for speed/stability.
 # If empty, your code can fallback to describe_index() to fetch host once.
 PINECONE_HOST = os.getenv("PINECONE_HOST", "").strip() or None
 
+# Data-plane client: one per process, reused by every call. POOL_THREADS sizes the
+# HTTP connection pool / async_req threads, POOL_MAXSIZE the client's connection pool
+# (0 = SDK default). PINECONE_GRPC=1 uses the gRPC transport (pinecone[grpc]).
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "8"))
+PINECONE_POOL_MAXSIZE = int(os.getenv("PINECONE_POOL_MAXSIZE", "0"))
+PINECONE_GRPC = os.getenv("PINECONE_GRPC", "0") == "1"
+
+# ensure_index (list_indexes + describe_index) result + host cached on disk for this
+# many seconds; 0 = check every time
+PINECONE_INDEX_CHECK_TTL_S = int(os.getenv("PINECONE_INDEX_CHECK_TTL_S", "86400"))
+PINECONE_INDEX_CHECK_PATH = os.getenv("PINECONE_INDEX_CHECK_PATH", str(ROOT / ".pinecone_index.json"))
+
 # Serverless location (EU close to Sweden)
 PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")
 PINECONE_REGION = os.getenv("PINECONE_REGION", "us-east-1")
 
+# -----------------------------
+# Vector store backend
+# -----------------------------
+# "pinecone" (default) or "local": memory-mapped matrix + exact search on this machine
+# (offline runs / small corpora), stored under LOCAL_STORE_DIR/<PINECONE_INDEX>
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").strip().lower()
+if VECTOR_BACKEND not in ("pinecone", "local"):
+    raise RuntimeError(f"Unknown VECTOR_BACKEND={VECTOR_BACKEND!r} (expected 'pinecone' or 'local')")
+LOCAL_STORE_DIR = os.getenv("LOCAL_STORE_DIR", str(ROOT / "vector_store"))
+
+# Build target the index manifest is kept per: the same namespace in another index
+# (e.g. fia-rag-<FIRST_STAGE_DIM>), on the other backend or in another partition layout
+# gets its own rows, so an incremental build there does not skip PDFs that were only
+# indexed elsewhere.
+MANIFEST_TARGET = f"{VECTOR_BACKEND}:{PINECONE_INDEX}"
+if NAMESPACE_PARTITION != "none":
+    MANIFEST_TARGET += f":{NAMESPACE_PARTITION}"
+
 # -----------------------------
 # Redis (Cache)
 # -----------------------------
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+# PING when the client is created (fail fast); 0 = connect lazily on the first command
+REDIS_PING_ON_CONNECT = os.getenv("REDIS_PING_ON_CONNECT", "1") == "1"
 
 # -----------------------------
 # Cache controls
@@ -98,6 +296,13 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
 CACHE_EMBEDDINGS = os.getenv("CACHE_EMBEDDINGS", "1") == "1"
 CACHE_RETRIEVAL = os.getenv("CACHE_RETRIEVAL", "1") == "1"
+# Cached values use a versioned binary codec (cache/codec.py); entries written by
+# other versions are treated as misses and overwritten.
+CACHE_VECTOR_DTYPE = os.getenv("CACHE_VECTOR_DTYPE", "float32").strip().lower()  # or "float16"
+if CACHE_VECTOR_DTYPE not in ("float32", "float16"):
+    raise RuntimeError(f"Unknown CACHE_VECTOR_DTYPE={CACHE_VECTOR_DTYPE!r} (expected 'float32' or 'float16')")
+CACHE_COMPRESS = os.getenv("CACHE_COMPRESS", "1") == "1"  # zlib, only when it shrinks the value
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "512"))
 
 
 # -----------------------------
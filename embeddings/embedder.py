@@ -1,10 +1,24 @@
 # embeddings/embedder.py
 from __future__ import annotations
 
-from typing import List, Sequence
-from openai import OpenAI
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence
 
-from config import OPENAI_API_KEY, EMBEDDING_MODEL, EMBED_DIM
+from config import (
+    require_openai_key,
+    EMBED_BACKEND,
+    EMBED_MICROBATCH_ENABLED,
+    EMBEDDING_MODEL,
+    EMBED_DIM,
+    EMBED_MAX_BATCH_TOKENS,
+    EMBED_MAX_BATCH_ITEMS,
+)
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 _client: OpenAI | None = None
@@ -13,13 +27,26 @@ _client: OpenAI | None = None
 def _get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        from openai import OpenAI  # ~0.4 s import, only paid by the API backend
+
+        _client = OpenAI(api_key=require_openai_key())
     return _client
 
 
+def warmup() -> None:
+    """Load the configured backend (local model + one tiny batch, or the OpenAI client)."""
+    if EMBED_BACKEND == "local":
+        from embeddings.local_embedder import get_local_embedder
+
+        get_local_embedder().warmup()
+    else:
+        _get_client()
+
+
 def embed_texts(texts: Sequence[str]) -> List[List[float]]:
     """
-    Embed a batch of texts using OpenAI embeddings.
+    Embed a batch of texts with the configured backend
+    (EMBED_BACKEND: OpenAI embeddings API or the local model).
 
     Returns:
         list of vectors (list[float]) in the same order as inputs.
@@ -27,12 +54,17 @@ def embed_texts(texts: Sequence[str]) -> List[List[float]]:
     if not texts:
         return []
 
-    client = _get_client()
-    resp = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=list(texts),
-    )
-    vecs = [d.embedding for d in resp.data]
+    if EMBED_BACKEND == "local":
+        from embeddings.local_embedder import get_local_embedder
+
+        vecs = get_local_embedder()(texts)
+    else:
+        client = _get_client()
+        resp = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=list(texts),
+        )
+        vecs = [d.embedding for d in resp.data]
 
     # Optional: sanity check (dimension mismatch is a common bug)
     for i, v in enumerate(vecs):
@@ -47,7 +79,157 @@ def embed_texts(texts: Sequence[str]) -> List[List[float]]:
 
 def embed_query(query: str) -> List[float]:
     """
-    Convenience wrapper: embed a single query string.
+    Embed a single query string. With EMBED_MICROBATCH_ENABLED, concurrent
+    calls (threads / compare subqueries) are coalesced into one request.
     """
+    if EMBED_MICROBATCH_ENABLED:
+        from embeddings.micro_batcher import get_micro_batcher
+
+        return get_micro_batcher().embed(query)
     vecs = embed_texts([query])
     return vecs[0]
+
+
+def shorten(vec: Sequence[float], dim: int) -> List[float]:
+    """
+    First `dim` components renormalized to unit length: the same shortening the
+    embeddings API applies for `dimensions=` (first-stage vectors, FIRST_STAGE_DIM).
+    """
+    head = vec[:dim]
+    norm = math.sqrt(sum(x * x for x in head)) or 1.0
+    return [x / norm for x in head]
+
+
+# -----------------------------
+# Token-budget batching
+# -----------------------------
+
+_encoder: Any = None
+_encoder_loaded = False
+
+
+def _get_encoder() -> Any:
+    """tiktoken encoder for EMBEDDING_MODEL, or None if tiktoken is not installed."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+        except ImportError:
+            _encoder = None
+        else:
+            try:
+                _encoder = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+            except KeyError:
+                _encoder = tiktoken.get_encoding("cl100k_base")
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """
+    Exact token count with tiktoken (OpenAI tokenizer; for local models it only
+    drives request packing); otherwise a conservative estimate
+    (~3 chars/token, regulation text is dense with numbers and punctuation).
+    """
+    enc = _get_encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return len(text) // 3 + 1
+
+
+def pack_batches(
+    token_counts: Sequence[int],
+    *,
+    max_tokens: int = EMBED_MAX_BATCH_TOKENS,
+    max_items: int = EMBED_MAX_BATCH_ITEMS,
+) -> Iterator[range]:
+    """
+    Greedy, order-preserving packing: yields index ranges whose token sum stays
+    within max_tokens and whose length stays within max_items.
+    A single text above max_tokens gets a batch of its own.
+    """
+    start = 0
+    tokens = 0
+    for i, n in enumerate(token_counts):
+        if i > start and (tokens + n > max_tokens or i - start >= max_items):
+            yield range(start, i)
+            start, tokens = i, 0
+        tokens += n
+    if start < len(token_counts):
+        yield range(start, len(token_counts))
+
+
+@dataclass
+class EmbedStats:
+    requests: int = 0
+    texts: int = 0
+    tokens: int = 0
+    request_seconds: float = 0.0  # summed request latency
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+
+    def record(self, *, texts: int, tokens: int, t0: float, t1: float) -> None:
+        self.requests += 1
+        self.texts += texts
+        self.tokens += tokens
+        self.request_seconds += t1 - t0
+        self.first_start = t0 if self.first_start is None else min(self.first_start, t0)
+        self.last_end = t1 if self.last_end is None else max(self.last_end, t1)
+
+    def snapshot(self) -> Dict[str, float]:
+        # wall-clock span, so concurrent requests are not double counted
+        wall = (self.last_end - self.first_start) if self.first_start is not None else 0.0
+        s = wall or 1e-9
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "tokens": self.tokens,
+            "wall_seconds": wall,
+            "mean_request_ms": (self.request_seconds / self.requests * 1000.0) if self.requests else 0.0,
+            "tokens_per_sec": self.tokens / s,
+            "requests_per_sec": self.requests / s,
+        }
+
+
+embed_stats = EmbedStats()
+_stats_lock = threading.Lock()
+
+
+def embed_texts_batched(
+    texts: Sequence[str],
+    *,
+    max_tokens: Optional[int] = None,
+    max_items: Optional[int] = None,
+    embed_fn: Optional[Callable[[Sequence[str]], List[List[float]]]] = None,
+    token_counts: Optional[Sequence[int]] = None,
+) -> List[List[float]]:
+    """
+    Embed any number of texts in requests packed up to a token + item budget
+    (EMBED_MAX_BATCH_TOKENS / EMBED_MAX_BATCH_ITEMS). Output is in input order.
+    Throughput is accumulated in `embed_stats`.
+
+    embed_fn: one request (defaults to embed_texts); lets offline tooling swap in
+    a stand-in embedder while keeping the same packing + stats.
+    token_counts: count_tokens of each text when the caller already has them.
+    """
+    request = embed_fn or embed_texts
+    if not texts:
+        return []
+
+    counts = list(token_counts) if token_counts is not None else [count_tokens(t) for t in texts]
+    if len(counts) != len(texts):
+        raise ValueError(f"token_counts has {len(counts)} entries for {len(texts)} texts")
+    out: List[List[float]] = []
+    for r in pack_batches(
+        counts,
+        max_tokens=max_tokens or EMBED_MAX_BATCH_TOKENS,
+        max_items=max_items or EMBED_MAX_BATCH_ITEMS,
+    ):
+        t0 = time.perf_counter()
+        out.extend(request(texts[r.start:r.stop]))
+        t1 = time.perf_counter()
+
+        with _stats_lock:
+            embed_stats.record(texts=len(r), tokens=sum(counts[r.start:r.stop]), t0=t0, t1=t1)
+
+    return out
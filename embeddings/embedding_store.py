@@ -0,0 +1,121 @@
+# embeddings/embedding_store.py
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from typing import Callable, Dict, List, Sequence
+
+from index.sqlite_batches import in_batches
+
+
+def content_key(model: str, dimension: int, text: str) -> str:
+    """Content address of one embedding: same model + dim + text => same vector."""
+    h = hashlib.sha1()
+    h.update(f"{model}|{dimension}|".encode("utf-8"))
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _pack(vec: Sequence[float]) -> bytes:
+    return array("f", vec).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    a = array("f")
+    a.frombytes(blob)
+    return a.tolist()
+
+
+class EmbeddingStore:
+    """
+    Local, persistent embedding store used by ingestion.
+
+    Keyed by hash(embedding model, dimension, chunk text), so re-chunking
+    experiments and namespace rebuilds only pay for texts never embedded before.
+    Vectors are stored as packed float32 (what Pinecone keeps anyway).
+    """
+
+    def __init__(self, path: str, *, model: str, dimension: int):
+        self.path = path
+        self.model = model
+        self.dimension = dimension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # embed() may run on several ingest workers
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        with self._conn() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    dim INTEGER NOT NULL,
+                    vec BLOB NOT NULL
+                )
+                """
+            )
+            con.commit()
+
+    def key(self, text: str) -> str:
+        return content_key(self.model, self.dimension, text)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        out: Dict[str, List[float]] = {}
+        with self._conn() as con:
+            for placeholders, params in in_batches(keys, reserved=1):
+                cur = con.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders}) AND dim = ?",
+                    (*params, self.dimension),
+                )
+                for k, blob in cur.fetchall():
+                    out[k] = _unpack(blob)
+        return out
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        if not items:
+            return
+        payload = [(k, self.dimension, _pack(v)) for k, v in items.items()]
+        with self._conn() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO embeddings(key, dim, vec) VALUES (?, ?, ?)",
+                payload,
+            )
+            con.commit()
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        embed_fn: Callable[[Sequence[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """
+        Return vectors for texts (input order), calling embed_fn only for cache misses.
+        Identical texts inside one call are embedded once.
+        """
+        keys = [self.key(t) for t in texts]
+        found = self.get_many(list(dict.fromkeys(keys)))
+
+        misses: Dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in found and k not in misses:
+                misses[k] = t
+        miss_keys = list(misses)
+        miss_texts = list(misses.values())
+
+        with self._lock:
+            self.hits += len(texts) - len(miss_texts)
+            self.misses += len(miss_texts)
+
+        if miss_texts:
+            new = dict(zip(miss_keys, embed_fn(miss_texts)))
+            self.put_many(new)
+            found.update(new)
+
+        return [found[k] for k in keys]
@@ -0,0 +1,36 @@
+# embeddings/fake_embedder.py
+from __future__ import annotations
+
+import hashlib
+import math
+import time
+from typing import List, Sequence
+
+from config import EMBED_DIM
+
+
+class FakeEmbedder:
+    """
+    Deterministic offline stand-in for embed_texts (no API key, no network).
+
+    The same text always maps to the same unit vector (derived from its hash), so
+    ingestion output is reproducible; identical texts still collide like real
+    embeddings would. latency_ms simulates the per-request round trip.
+    """
+
+    def __init__(self, dimension: int = EMBED_DIM, *, latency_ms: float = 0.0):
+        self.dimension = dimension
+        self.latency_s = max(0.0, latency_ms) / 1000.0
+        self.requests = 0
+
+    def vector(self, text: str) -> List[float]:
+        raw = hashlib.shake_256(text.encode("utf-8")).digest(self.dimension)
+        vec = [b - 127.5 for b in raw]
+        norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+        return [x / norm for x in vec]
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self.requests += 1
+        return [self.vector(t) for t in texts]
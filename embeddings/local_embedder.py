@@ -0,0 +1,93 @@
+# embeddings/local_embedder.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+
+from config import (
+    EMBEDDING_MODEL,
+    EMBED_DIM,
+    LOCAL_EMBED_RUNTIME,
+    LOCAL_EMBED_DEVICE,
+    LOCAL_EMBED_BATCH_SIZE,
+)
+from embeddings.embedder import EmbedStats
+
+
+class LocalEmbedder:
+    """
+    On-box embedding backend (EMBED_BACKEND=local): a sentence-transformers model
+    on CPU, loaded once per process and kept warm. Calling it embeds one request;
+    inference runs in batches of `batch_size` and every batch is timed into `stats`.
+
+    Needs `pip install sentence-transformers` (plus `optimum[onnxruntime]` for
+    runtime="onnx"); imported lazily so the OpenAI backend does not pay for torch.
+    """
+
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL,
+        *,
+        runtime: str = LOCAL_EMBED_RUNTIME,
+        device: str = LOCAL_EMBED_DEVICE,
+        batch_size: int = LOCAL_EMBED_BATCH_SIZE,
+    ):
+        if runtime not in ("torch", "onnx"):
+            raise ValueError(f"Unknown LOCAL_EMBED_RUNTIME={runtime!r} (expected 'torch' or 'onnx')")
+        self.model_name = model
+        self.runtime = runtime
+        self.device = device
+        self.batch_size = max(1, batch_size)
+        self._model: Any = None
+        # one forward pass at a time: torch already uses every core per batch
+        self._lock = threading.Lock()
+        self.stats = EmbedStats()  # requests = model batches
+
+    def _get_model(self) -> Any:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            kwargs = {"backend": "onnx"} if self.runtime == "onnx" else {}
+            self._model = SentenceTransformer(self.model_name, device=self.device, **kwargs)
+            dim = self._model.get_sentence_embedding_dimension()
+            if dim is not None and dim != EMBED_DIM:
+                raise RuntimeError(
+                    f"Local model {self.model_name} has dim {dim}, expected EMBED_DIM={EMBED_DIM}. "
+                    f"Set EMBED_DIM (and use a matching Pinecone index)."
+                )
+        return self._model
+
+    def warmup(self) -> None:
+        """Load the model and run one tiny batch, so the first real query is not slow."""
+        self([" "])
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        out: List[List[float]] = []
+        with self._lock:
+            model = self._get_model()
+            for i in range(0, len(texts), self.batch_size):
+                batch = list(texts[i:i + self.batch_size])
+                t0 = time.perf_counter()
+                # unit vectors: cosine in Pinecone == dot product here
+                vecs = model.encode(batch, batch_size=len(batch), normalize_embeddings=True)
+                t1 = time.perf_counter()
+                self.stats.record(texts=len(batch), tokens=0, t0=t0, t1=t1)
+                out.extend(v.tolist() for v in vecs)
+        return out
+
+
+_local: Optional[LocalEmbedder] = None
+_local_lock = threading.Lock()
+
+
+def get_local_embedder() -> LocalEmbedder:
+    """Process-wide instance (the model stays loaded between queries)."""
+    global _local
+    if _local is None:
+        with _local_lock:
+            if _local is None:
+                _local = LocalEmbedder()
+    return _local
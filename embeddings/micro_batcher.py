@@ -0,0 +1,169 @@
+# embeddings/micro_batcher.py
+from __future__ import annotations
+
+import asyncio
+import bisect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from config import (
+    EMBED_MICROBATCH_WINDOW_MS,
+    EMBED_MICROBATCH_MAX,
+    EMBED_MICROBATCH_CONCURRENCY,
+)
+
+EmbedFn = Callable[[Sequence[str]], List[List[float]]]
+
+
+class Histogram:
+    """Fixed-bucket histogram (thread-safe); bucket i counts values <= bounds[i], the last one the rest."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += 1
+            self.sum += value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            out: Dict[str, float] = {f"<={b:g}": n for b, n in zip(self.bounds, self.counts)}
+            out[f">{self.bounds[-1]:g}"] = self.counts[-1]
+            out["count"] = self.total
+            out["mean"] = self.sum / self.total if self.total else 0.0
+        return out
+
+
+@dataclass
+class _Pending:
+    text: str
+    future: Future
+    enqueued: float
+
+
+class EmbedMicroBatcher:
+    """
+    Coalesces concurrent single-text embedding calls into one embed request.
+
+    A call arriving while no request is in flight is sent straight away (a lone
+    query never waits). Otherwise the first waiting call opens a window of
+    `window_ms`; every call arriving before it closes (or until `max_batch` calls
+    are waiting) rides in the same request.
+    Identical texts in a batch are embedded once. Requests are sent from a small
+    pool (`concurrency`), so the next window fills while one is in flight.
+
+    Usable from threads (embed / submit) and asyncio (aembed). Batch sizes and
+    queue waits are recorded in `batch_sizes` / `queue_wait_ms`.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[EmbedFn] = None,
+        *,
+        window_ms: float = EMBED_MICROBATCH_WINDOW_MS,
+        max_batch: int = EMBED_MICROBATCH_MAX,
+        concurrency: int = EMBED_MICROBATCH_CONCURRENCY,
+    ):
+        if embed_fn is None:
+            from embeddings.embedder import embed_texts
+
+            embed_fn = embed_texts
+        self.embed_fn = embed_fn
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+
+        self._pending: List[_Pending] = []
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="embed-batch")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._inflight = 0  # batches handed to the pool and not finished
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100, 250])
+
+    def submit(self, text: str) -> Future:
+        fut: Future = Future()
+        with self._cond:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                self._dispatcher.start()
+            self._pending.append(_Pending(text, fut, time.perf_counter()))
+            self._cond.notify()
+        return fut
+
+    def embed(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """Several texts from one caller (e.g. compare subqueries) -> the same window."""
+        futures = [self.submit(t) for t in texts]
+        return [f.result() for f in futures]
+
+    async def aembed(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = self._pending[0].enqueued + self.window_s
+                while self._inflight and len(self._pending) < self.max_batch:
+                    left = deadline - time.perf_counter()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._inflight += 1
+            self._pool.submit(self._send, batch)
+
+    def _send(self, batch: List[_Pending]) -> None:
+        try:
+            self._embed_batch(batch)
+        finally:
+            with self._cond:
+                self._inflight -= 1
+
+    def _embed_batch(self, batch: List[_Pending]) -> None:
+        t_send = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for p in batch:
+            self.queue_wait_ms.observe((t_send - p.enqueued) * 1000.0)
+
+        texts = list(dict.fromkeys(p.text for p in batch))
+        try:
+            vecs = dict(zip(texts, self.embed_fn(texts)))
+        except BaseException as e:
+            for p in batch:
+                p.future.set_exception(e)
+            return
+        for p in batch:
+            p.future.set_result(vecs[p.text])
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {"batch_size": self.batch_sizes.snapshot(), "queue_wait_ms": self.queue_wait_ms.snapshot()}
+
+
+_batcher: Optional[EmbedMicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_micro_batcher() -> EmbedMicroBatcher:
+    """Process-wide batcher used by embed_query (EMBED_MICROBATCH_ENABLED)."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbedMicroBatcher()
+    return _batcher
@@ -7,7 +7,7 @@ from typing import Any, Dict, List
 
 from openai import OpenAI
 
-from config import OPENAI_API_KEY
+from config import require_openai_key
 import os
 
 JUDGE_MODEL = os.getenv("JUDGE_MODEL", os.getenv("GEN_MODEL", "gpt-4.1-mini"))
@@ -18,7 +18,7 @@ _client: OpenAI | None = None
 def _get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        _client = OpenAI(api_key=require_openai_key())
     return _client
 
 
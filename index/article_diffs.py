@@ -0,0 +1,388 @@
+# index/article_diffs.py
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from config import ARTICLE_DIFF_MAX_ITEMS, ARTICLE_DIFF_MAX_CHARS
+from index.article_index import ArticleIndex
+from index.docstore_sqlite import SQLiteDocStore
+
+# Clause boundaries: sentence ends (and ";") followed by a capital / number / quote,
+# but not "Art. 12.3" cross references
+_CLAUSE_SPLIT = re.compile(r"(?<=[.!?;])(?<![Aa]rt\.)\s+(?=[A-Z0-9\"'(])")
+
+# replaced clauses at least this similar are reported as "changed", else removed + added
+_CHANGED_MIN_RATIO = 0.5
+
+# One regulation whose seasons are diffed against each other: (tenant, doc_type, regulation_type)
+DiffGroup = Tuple[Any, Any, Any]
+
+
+def diff_group(meta: Mapping[str, Any]) -> DiffGroup:
+    """The regulation a chunk's metadata belongs to (what its diffs are rebuilt by)."""
+    return (meta.get("tenant"), meta.get("doc_type"), meta.get("regulation_type"))
+
+
+def split_clauses(texts: Iterable[str]) -> List[str]:
+    """
+    An article's chunk texts (document order) -> clauses, whitespace-normalized.
+    Repeats are dropped, which also removes the sentences chunk overlap duplicates.
+    """
+    clauses: Dict[str, None] = {}
+    for text in texts:
+        for c in _CLAUSE_SPLIT.split(text or ""):
+            c = " ".join(c.split())
+            if c:
+                clauses.setdefault(c, None)
+    return list(clauses)
+
+
+@dataclass
+class ClauseDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[Tuple[str, str]] = field(default_factory=list)  # (old, new)
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def diff_clauses(old: Sequence[str], new: Sequence[str]) -> ClauseDiff:
+    """Clause-level diff (order-aware); replaced clauses are paired up when similar."""
+    out = ClauseDiff()
+    sm = SequenceMatcher(None, list(old), list(new), autojunk=False)
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag == "equal":
+            continue
+        olds, news = list(old[i1:i2]), list(new[j1:j2])
+        k = 0
+        while k < min(len(olds), len(news)):
+            pair = SequenceMatcher(None, olds[k], news[k], autojunk=False)
+            if pair.quick_ratio() >= _CHANGED_MIN_RATIO and pair.ratio() >= _CHANGED_MIN_RATIO:
+                out.changed.append((olds[k], news[k]))
+            else:
+                out.removed.append(olds[k])
+                out.added.append(news[k])
+            k += 1
+        out.removed.extend(olds[k:])
+        out.added.extend(news[k:])
+    return out
+
+
+@dataclass
+class ArticleDiff:
+    tenant: Optional[str]
+    series: Optional[str]
+    doc_type: Optional[str]
+    regulation_type: Optional[str]
+    article: str
+    season_from: int
+    season_to: int
+    source_from: Optional[str]
+    source_to: Optional[str]
+    issue_from: Optional[int]
+    issue_to: Optional[int]
+    page_from: Optional[int]
+    page_to: Optional[int]
+    diff: ClauseDiff
+
+    @property
+    def status(self) -> str:
+        if self.source_from is None:
+            return "added"
+        if self.source_to is None:
+            return "removed"
+        return "unchanged" if self.diff.unchanged else "changed"
+
+
+def _clip(text: str, n: int) -> str:
+    return text if len(text) <= n else text[: n - 3].rstrip() + "..."
+
+
+def render_diff(d: ArticleDiff, *, max_items: int = ARTICLE_DIFF_MAX_ITEMS, max_chars: int = ARTICLE_DIFF_MAX_CHARS) -> str:
+    """Compact text for the LLM context."""
+    head = (
+        f"Article {d.article} ({d.regulation_type or 'regulations'}, {d.series or '?'}) "
+        f"changes {d.season_from} -> {d.season_to}"
+    )
+    if d.status == "unchanged":
+        return f"{head}: no changes between {d.season_from} and {d.season_to}."
+
+    if d.status == "added":
+        lines = [f"{head}: article is new in {d.season_to}."]
+    elif d.status == "removed":
+        lines = [f"{head}: article no longer present in {d.season_to}."]
+    else:
+        lines = [head + ":"]
+
+    def section(title: str, items: List[str]) -> None:
+        if not items:
+            return
+        lines.append(f"{title} ({len(items)}):")
+        lines.extend(items[:max_items])
+        if len(items) > max_items:
+            lines.append(f"- ... {len(items) - max_items} more")
+
+    section("Changed", [
+        f"- {d.season_from}: {_clip(o, max_chars)}\n  {d.season_to}: {_clip(n, max_chars)}"
+        for o, n in d.diff.changed
+    ])
+    section("Added", [f"- {_clip(c, max_chars)}" for c in d.diff.added])
+    section("Removed", [f"- {_clip(c, max_chars)}" for c in d.diff.removed])
+    return "\n".join(lines)
+
+
+def _article_key(article: str) -> Tuple[int, ...]:
+    return tuple(int(p) for p in article.split(".") if p.isdigit())
+
+
+class ArticleDiffIndex:
+    """
+    Local store of per-article diffs between consecutive seasons of one regulation
+    (tenant + doc_type + regulation_type), computed from the latest issue of each season.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        with self._conn() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_diffs (
+                    namespace TEXT NOT NULL,
+                    tenant TEXT,
+                    series TEXT,
+                    doc_type TEXT,
+                    regulation_type TEXT,
+                    article TEXT NOT NULL,
+                    season_from INTEGER NOT NULL,
+                    season_to INTEGER NOT NULL,
+                    source_from TEXT,
+                    source_to TEXT,
+                    issue_from INTEGER,
+                    issue_to INTEGER,
+                    page_from INTEGER,
+                    page_to INTEGER,
+                    status TEXT NOT NULL,
+                    diff_json TEXT NOT NULL,
+                    built_at REAL NOT NULL
+                )
+                """
+            )
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS idx_article_diffs_lookup "
+                "ON article_diffs(namespace, article, season_from, season_to)"
+            )
+            con.commit()
+
+    def replace(
+        self,
+        namespace: str,
+        diffs: Iterable[ArticleDiff],
+        *,
+        groups: Optional[Iterable[DiffGroup]] = None,
+    ) -> int:
+        """Replace the namespace's diffs, or only those of `groups` (by diff_group)."""
+        now = time.time()
+        payload = [
+            (
+                namespace, d.tenant, d.series, d.doc_type, d.regulation_type, d.article,
+                d.season_from, d.season_to, d.source_from, d.source_to, d.issue_from, d.issue_to,
+                d.page_from, d.page_to, d.status,
+                json.dumps(
+                    {"added": d.diff.added, "removed": d.diff.removed, "changed": d.diff.changed},
+                    ensure_ascii=False,
+                ),
+                now,
+            )
+            for d in diffs
+        ]
+        with self._conn() as con:
+            if groups is None:
+                con.execute("DELETE FROM article_diffs WHERE namespace = ?", (namespace,))
+            else:
+                con.executemany(
+                    "DELETE FROM article_diffs WHERE namespace = ? "
+                    "AND tenant IS ? AND doc_type IS ? AND regulation_type IS ?",
+                    [(namespace, *g) for g in groups],
+                )
+            con.executemany(
+                """
+                INSERT INTO article_diffs(
+                    namespace, tenant, series, doc_type, regulation_type, article,
+                    season_from, season_to, source_from, source_to, issue_from, issue_to,
+                    page_from, page_to, status, diff_json, built_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                payload,
+            )
+            con.commit()
+        return len(payload)
+
+    @staticmethod
+    def _where(
+        namespace: str,
+        season_min: int,
+        season_max: int,
+        tenants: Optional[Sequence[str]],
+        doc_types: Optional[Sequence[str]],
+        regulation_types: Optional[Sequence[str]],
+    ) -> Tuple[List[str], List[Any]]:
+        where = ["namespace = ?", "season_from >= ?", "season_to <= ?"]
+        params: List[Any] = [namespace, season_min, season_max]
+        for col, vals in (
+            ("tenant", tenants),
+            ("doc_type", doc_types),
+            ("regulation_type", regulation_types),
+        ):
+            if vals:
+                where.append(f"{col} IN ({','.join(['?'] * len(vals))})")
+                params.extend(vals)
+        return where, params
+
+    def has_range(
+        self,
+        namespace: str,
+        season_min: int,
+        season_max: int,
+        *,
+        tenants: Optional[Sequence[str]] = None,
+        doc_types: Optional[Sequence[str]] = None,
+        regulation_types: Optional[Sequence[str]] = None,
+    ) -> bool:
+        """True if any diff lies inside [season_min, season_max] for this scope."""
+        where, params = self._where(namespace, season_min, season_max, tenants, doc_types, regulation_types)
+        with self._conn() as con:
+            row = con.execute(
+                "SELECT 1 FROM article_diffs WHERE " + " AND ".join(where) + " LIMIT 1", params
+            ).fetchone()
+        return row is not None
+
+    def lookup(
+        self,
+        namespace: str,
+        articles: Sequence[str],
+        season_min: int,
+        season_max: int,
+        *,
+        tenants: Optional[Sequence[str]] = None,
+        doc_types: Optional[Sequence[str]] = None,
+        regulation_types: Optional[Sequence[str]] = None,
+    ) -> List[ArticleDiff]:
+        """
+        Consecutive-season diffs for the given articles within [season_min, season_max],
+        in article order (as given), then season order.
+        """
+        if not articles:
+            return []
+        where, params = self._where(namespace, season_min, season_max, tenants, doc_types, regulation_types)
+        where.append(f"article IN ({','.join(['?'] * len(articles))})")
+        params.extend(articles)
+
+        sql = (
+            "SELECT tenant, series, doc_type, regulation_type, article, season_from, season_to, "
+            "source_from, source_to, issue_from, issue_to, page_from, page_to, diff_json "
+            "FROM article_diffs WHERE " + " AND ".join(where)
+        )
+        with self._conn() as con:
+            rows = con.execute(sql, params).fetchall()
+
+        out: List[ArticleDiff] = []
+        for r in rows:
+            raw = json.loads(r[13])
+            out.append(
+                ArticleDiff(
+                    *r[:13],
+                    diff=ClauseDiff(
+                        added=raw["added"],
+                        removed=raw["removed"],
+                        changed=[tuple(p) for p in raw["changed"]],
+                    ),
+                )
+            )
+        order = {a: i for i, a in enumerate(articles)}
+        out.sort(key=lambda d: (order[d.article], d.season_from, d.doc_type or "", d.regulation_type or ""))
+        return out
+
+
+def build_article_diffs(
+    namespace: str,
+    *,
+    article_index: ArticleIndex,
+    docstore: SQLiteDocStore,
+    diff_index: ArticleDiffIndex,
+    groups: Optional[Iterable[DiffGroup]] = None,
+) -> int:
+    """
+    Rebuild the diffs of a namespace from the article index (section rows) and the
+    docstore (chunk text): all of them, or only those of `groups` (regulations whose
+    documents changed). Local only; returns the number of diffs written.
+    """
+    wanted = None if groups is None else set(groups)
+    diffs: List[ArticleDiff] = []
+
+    for tenant, series, doc_type, regulation_type in article_index.section_groups(namespace):
+        if wanted is not None and (tenant, doc_type, regulation_type) not in wanted:
+            continue
+        rows = article_index.section_rows(
+            namespace, tenant=tenant, doc_type=doc_type, regulation_type=regulation_type
+        )
+        ids = list(dict.fromkeys(r[1] for r in rows))
+        docs = docstore.get_many_with_meta(ids)
+
+        # latest issue per season (ties: last source by name)
+        chosen: Dict[int, Tuple[int, str]] = {}
+        for _art, cid, season, issue, _page, _ci in rows:
+            if cid not in docs:
+                continue
+            key = (issue if issue is not None else -1, docs[cid][1].get("source") or "")
+            if season not in chosen or key > chosen[season]:
+                chosen[season] = key
+
+        # season -> article -> (texts in document order, first page)
+        texts: Dict[int, Dict[str, List[str]]] = {s: {} for s in chosen}
+        first_page: Dict[Tuple[int, str], Optional[int]] = {}
+        for art, cid, season, _issue, page, _ci in rows:
+            if cid not in docs or docs[cid][1].get("source") != chosen[season][1]:
+                continue
+            texts[season].setdefault(art, []).append(docs[cid][0])
+            first_page.setdefault((season, art), page)
+
+        seasons = sorted(texts)
+        clauses = {s: {a: split_clauses(t) for a, t in texts[s].items()} for s in seasons}
+
+        for a, b in zip(seasons, seasons[1:]):
+            for art in sorted(set(clauses[a]) | set(clauses[b]), key=_article_key):
+                in_a, in_b = art in clauses[a], art in clauses[b]
+                diffs.append(
+                    ArticleDiff(
+                        tenant=tenant,
+                        series=series,
+                        doc_type=doc_type,
+                        regulation_type=regulation_type,
+                        article=art,
+                        season_from=a,
+                        season_to=b,
+                        source_from=chosen[a][1] if in_a else None,
+                        source_to=chosen[b][1] if in_b else None,
+                        issue_from=(chosen[a][0] if chosen[a][0] >= 0 else None) if in_a else None,
+                        issue_to=(chosen[b][0] if chosen[b][0] >= 0 else None) if in_b else None,
+                        page_from=first_page.get((a, art)),
+                        page_to=first_page.get((b, art)),
+                        diff=diff_clauses(clauses[a].get(art, []), clauses[b].get(art, [])),
+                    )
+                )
+
+    return diff_index.replace(namespace, diffs, groups=wanted)
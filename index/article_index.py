@@ -0,0 +1,178 @@
+# index/article_index.py
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# rank: lower = stronger evidence that a chunk is "about" the article
+RANK_SECTION = 0   # chunk sits under the article's heading (tracked across pages)
+RANK_MENTION = 1   # chunk text references the article
+
+
+@dataclass(frozen=True)
+class ArticleRow:
+    chunk_id: str
+    article: str
+    rank: int
+    meta: Dict[str, Any]
+
+
+class ArticleIndex:
+    """
+    Local article lookup built at ingest time:
+      (namespace, tenant, season, doc_type/series, regulation_type, article) -> chunk ids
+
+    Lets explicit-article queries ("What does Article 12.3 say ...") skip the
+    embedding call and the vector search entirely.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        with self._conn() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_chunks (
+                    namespace TEXT NOT NULL,
+                    article TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    tenant TEXT,
+                    season INTEGER,
+                    series TEXT,
+                    doc_type TEXT,
+                    regulation_type TEXT,
+                    issue INTEGER,
+                    page INTEGER,
+                    chunk_index INTEGER,
+                    PRIMARY KEY (namespace, article, chunk_id)
+                )
+                """
+            )
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS idx_article_chunks_chunk ON article_chunks(namespace, chunk_id)"
+            )
+            con.commit()
+
+    def put_many(self, namespace: str, rows: Iterable[ArticleRow]) -> None:
+        payload = []
+        for r in rows:
+            md = r.meta
+            payload.append(
+                (
+                    namespace, r.article, r.chunk_id, r.rank,
+                    md.get("tenant"), md.get("season"), md.get("series"), md.get("doc_type"),
+                    md.get("regulation_type"), md.get("issue"), md.get("page"), md.get("chunk_index"),
+                )
+            )
+        if not payload:
+            return
+        with self._conn() as con:
+            # re-indexed chunks replace their previous rows
+            con.executemany(
+                "DELETE FROM article_chunks WHERE namespace = ? AND chunk_id = ?",
+                list({(namespace, p[2]) for p in payload}),
+            )
+            # keep the strongest rank if a chunk is both under the heading and mentions it
+            con.executemany(
+                """
+                INSERT INTO article_chunks(
+                    namespace, article, chunk_id, rank, tenant, season, series, doc_type,
+                    regulation_type, issue, page, chunk_index
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(namespace, article, chunk_id) DO UPDATE SET rank = MIN(rank, excluded.rank)
+                """,
+                payload,
+            )
+            con.commit()
+
+    def delete_chunks(self, namespace: str, chunk_ids: Iterable[str]) -> None:
+        ids = [(namespace, cid) for cid in chunk_ids]
+        if not ids:
+            return
+        with self._conn() as con:
+            con.executemany("DELETE FROM article_chunks WHERE namespace = ? AND chunk_id = ?", ids)
+            con.commit()
+
+    def lookup(
+        self,
+        namespace: str,
+        article: str,
+        *,
+        limit: int,
+        tenants: Optional[Sequence[str]] = None,
+        seasons: Optional[Sequence[int]] = None,
+        doc_types: Optional[Sequence[str]] = None,
+        regulation_types: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        Chunk ids for an article, strongest first (section > mention), newest
+        season/issue first, then document order.
+        """
+        where = ["namespace = ?", "article = ?"]
+        params: List[Any] = [namespace, article]
+        for col, vals in (
+            ("tenant", tenants),
+            ("season", seasons),
+            ("doc_type", doc_types),
+            ("regulation_type", regulation_types),
+        ):
+            if vals:
+                where.append(f"{col} IN ({','.join(['?'] * len(vals))})")
+                params.extend(vals)
+
+        sql = (
+            "SELECT chunk_id FROM article_chunks WHERE " + " AND ".join(where) +
+            " ORDER BY rank, season DESC, issue DESC, page, chunk_index LIMIT ?"
+        )
+        params.append(int(limit))
+        with self._conn() as con:
+            return [cid for (cid,) in con.execute(sql, params).fetchall()]
+
+    def sections(self, namespace: str, chunk_ids: Sequence[str]) -> Dict[str, List[str]]:
+        """{chunk_id: articles whose section the chunk sits in} (headings tracked at ingest)."""
+        if not chunk_ids:
+            return {}
+        sql = (
+            "SELECT chunk_id, article FROM article_chunks "
+            f"WHERE namespace = ? AND rank = ? AND chunk_id IN ({','.join(['?'] * len(chunk_ids))}) "
+            "ORDER BY article"
+        )
+        out: Dict[str, List[str]] = {}
+        with self._conn() as con:
+            for cid, art in con.execute(sql, [namespace, RANK_SECTION, *chunk_ids]):
+                out.setdefault(cid, []).append(art)
+        return out
+
+    def section_groups(self, namespace: str) -> List[Tuple[Any, Any, Any, Any]]:
+        """Distinct (tenant, series, doc_type, regulation_type) with section rows."""
+        sql = (
+            "SELECT DISTINCT tenant, series, doc_type, regulation_type FROM article_chunks "
+            "WHERE namespace = ? AND rank = ? AND season IS NOT NULL"
+        )
+        with self._conn() as con:
+            return list(con.execute(sql, (namespace, RANK_SECTION)).fetchall())
+
+    def section_rows(
+        self,
+        namespace: str,
+        *,
+        tenant: Any,
+        doc_type: Any,
+        regulation_type: Any,
+    ) -> List[Tuple[str, str, int, Optional[int], Optional[int], Optional[int]]]:
+        """(article, chunk_id, season, issue, page, chunk_index) of one regulation, document order."""
+        sql = (
+            "SELECT article, chunk_id, season, issue, page, chunk_index FROM article_chunks "
+            "WHERE namespace = ? AND rank = ? AND season IS NOT NULL "
+            "AND tenant IS ? AND doc_type IS ? AND regulation_type IS ? "
+            "ORDER BY season, page, chunk_index"
+        )
+        with self._conn() as con:
+            return list(con.execute(sql, (namespace, RANK_SECTION, tenant, doc_type, regulation_type)).fetchall())
@@ -3,8 +3,10 @@ from __future__ import annotations
 
 import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from config import (
     DATASET_NAME,
@@ -14,24 +16,49 @@ from config import (
     OVERLAP_SENTENCES,
     PDF_DIR,
     DOCSTORE_PATH,
+    LEXICAL_INDEX_ENABLED,
     PINECONE_NAMESPACE,
-    PINECONE_API_KEY,
-    PINECONE_INDEX,
-    PINECONE_HOST,
-    PINECONE_CLOUD,
-    PINECONE_REGION,
     EMBED_DIM,
-    METRIC,
+    INDEX_DIM,
+    UPSERT_BATCH_SIZE,
+    EMBED_MAX_BATCH_TOKENS,
+    EMBED_MAX_BATCH_ITEMS,
+    INGEST_PAGE_QUEUE,
+    INGEST_BATCH_QUEUE,
+    MANIFEST_PATH,
+    MANIFEST_TARGET,
+    INCREMENTAL_INDEX,
+    EMBEDDING_MODEL,
+    EMBED_BACKEND,
+    EMBED_STORE_ENABLED,
+    EMBED_STORE_PATH,
+    EMBED_CONCURRENCY,
+    UPSERT_CONCURRENCY,
+    ARTICLE_INDEX_ENABLED,
+    ARTICLE_INDEX_PATH,
+    DEDUP_ENABLED,
+    ARTICLE_DIFF_ENABLED,
+    ARTICLE_DIFF_PATH,
+    NAMESPACE_PARTITION,
 )
 
-from index.pdf_loader import load_pdf_pages
-from index.metadata_infer import infer_metadata
-from embeddings.embedder import embed_texts
+from index.pdf_loader import iter_pdf_pages, list_pdfs
+from index.ingest_pipeline import bounded, batched_by_budget, EmbedUpsertExecutor, StageTimings
+from index.metadata_infer import infer_metadata, file_version_hash
+from embeddings.embedder import embed_texts_batched, count_tokens, embed_stats, shorten
+from embeddings.embedding_store import EmbeddingStore
 
 from index.docstore_sqlite import SQLiteDocStore
+from index.manifest import IndexManifest
+from index.article_index import ArticleIndex, ArticleRow, RANK_SECTION, RANK_MENTION
+from index.article_diffs import ArticleDiffIndex, DiffGroup, build_article_diffs, diff_group
+from index.dedup import ChunkDeduper, member_tags
 from index.pinecone_store import PineconeStore
+from index.bulk_upsert import UpsertReport
+from index.namespace_router import group_by_partition, invalidate_partitions, partition_namespace, partition_values
+from index.vector_store import make_vector_store
 
-from chunking.sentence_aware import chunk as sentence_chunk
+from chunking.sentence_spans import chunk as sentence_chunk
 from chunking.overlap import chunk as overlap_chunk
 
 
@@ -41,6 +68,13 @@ ARTICLE_EXPLICIT_RE = re.compile(
 )
 ARTICLE_DOTTED_RE = re.compile(r"\b(\d{1,3}\.\d{1,3})\b")
 
+# Headings open an article section that continues until the next heading,
+# possibly several chunks/pages later: "ARTICLE 12 ..." / "12.3 Parc ferme ..."
+ARTICLE_HEADING_RE = re.compile(
+    r"\bARTICLE\s+(\d{1,3})\b"
+    r"|(?:^|(?<=[.:;]\s))(\d{1,3}\.\d{1,3})\s+(?=[A-Z])"
+)
+
 
 def extract_article_refs(text: str) -> List[str]:
     if not text:
@@ -63,14 +97,13 @@ def extract_article_refs(text: str) -> List[str]:
     return refs[:20]
 
 
-def stable_doc_id(source: str) -> str:
-    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+def article_headings(text: str) -> List[str]:
+    """Article headings in reading order (e.g. ["12", "12.1", "12.2"])."""
+    return [m.group(1) or m.group(2) for m in ARTICLE_HEADING_RE.finditer(text or "")]
 
 
-def file_version_hash(pdf_path: Path) -> str:
-    st = pdf_path.stat()
-    key = f"{pdf_path.name}|{st.st_size}|{int(st.st_mtime)}"
-    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+def stable_doc_id(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
 
 
 def drop_none(d: Dict[str, Any]) -> Dict[str, Any]:
@@ -86,47 +119,71 @@ def chunk_text(page_text: str) -> List[str]:
         raise ValueError(f"Unknown CHUNKER={CHUNKER}. Use 'sentence' or 'overlap'.")
 
 
-def build_index_from_pdfs(pdf_dir: str):
-    pdf_dir_path = Path(pdf_dir)
-    pages = load_pdf_pages(pdf_dir)
-
-    docstore = SQLiteDocStore(DOCSTORE_PATH)
-
-    store = PineconeStore(
-        api_key=PINECONE_API_KEY,
-        index_name=PINECONE_INDEX,
-        dimension=EMBED_DIM,
-        metric=METRIC,
-        cloud=PINECONE_CLOUD,
-        region=PINECONE_REGION,
-        host=PINECONE_HOST,
-    )
-    store.ensure_index()
-
-    all_ids: List[str] = []
-    all_texts: List[str] = []
-    all_metas: List[Dict[str, Any]] = []
-    doc_rows: List[Tuple[str, str, Dict[str, Any]]] = []
-
-    docs_seen = set()
+@dataclass
+class ChunkRecord:
+    chunk_id: str
+    text: str
+    meta: Dict[str, Any]
+    # set when the chunk duplicates an earlier one (dedup builds): no vector of its own
+    canonical_id: Optional[str] = None
+    # count_tokens(text), filled in by tokens() (batching) and reused by the embed stage
+    n_tokens: Optional[int] = None
+
+    def tokens(self) -> int:
+        if self.n_tokens is None:
+            self.n_tokens = count_tokens(self.text)
+        return self.n_tokens
+
+
+@dataclass
+class IngestStats:
+    chunks: int = 0
+    docs: Set[str] = field(default_factory=set)
+    skipped: int = 0
+    deleted: int = 0
+    duplicates: int = 0
+    upserts: UpsertReport = field(default_factory=UpsertReport)
+
+
+def doc_metadata(pdf_path: Path) -> Dict[str, Any]:
+    """
+    Doc-level metadata (series + doc_type + regulation_type + version etc.).
+    Computed once per PDF, shared by all of its chunks.
+    """
+    doc_meta = dict(infer_metadata(pdf_path, dataset_name=DATASET_NAME))
+    doc_meta["doc_title"] = pdf_path.name
+    doc_meta["version_hash"] = file_version_hash(pdf_path)
+    return doc_meta
+
+
+def chunk_pages(
+    pages: Iterable[Dict[str, Any]],
+    pdf_dir_path: Path,
+    stats: IngestStats,
+    timings: Optional[StageTimings] = None,
+) -> Iterator[ChunkRecord]:
+    """Stage: page -> chunk records (doc metadata resolved once per source)."""
+    timings = timings or StageTimings()
+    current_source: Optional[str] = None
+    doc_meta: Optional[Dict[str, Any]] = None
 
     for p in pages:
         source = p["source"]
-        doc_id = stable_doc_id(source)
-
-        pdf_path = pdf_dir_path / source
-        if not pdf_path.exists():
+        if source != current_source:
+            current_source = source
+            pdf_path = pdf_dir_path / source
+            with timings.time("metadata"):
+                doc_meta = doc_metadata(pdf_path) if pdf_path.exists() else None
+            if doc_meta is not None:
+                stats.docs.add(source)
+
+        if doc_meta is None:
             continue
 
-        docs_seen.add(source)
-
-        # doc-level metadata (now includes series + doc_type + regulation_type etc.)
-        doc_meta = infer_metadata(pdf_path, dataset_name=DATASET_NAME)
-        doc_meta = dict(doc_meta)
-        doc_meta["doc_title"] = pdf_path.name
-        doc_meta["version_hash"] = file_version_hash(pdf_path)
+        doc_id = stable_doc_id(source)
 
-        chunks = chunk_text(p["text"])
+        with timings.time("chunk"):
+            chunks = chunk_text(p["text"])
 
         for ci, chunk in enumerate(chunks):
             chunk_id = f"{doc_id}-p{p['page']}-c{ci}"
@@ -143,46 +200,423 @@ def build_index_from_pdfs(pdf_dir: str):
                 "chunk_id": chunk_id,
             }
 
-            meta = {**doc_meta, **base_meta}
-
-            # add article refs (Pinecone-safe: list of strings)
-            refs = extract_article_refs(chunk)
-            if refs:
-                meta["article_refs"] = refs
-                meta["article_primary"] = refs[0]
-
-            meta = drop_none(meta)  # remove nulls (Pinecone rejects)
+            yield ChunkRecord(chunk_id=chunk_id, text=chunk, meta={**doc_meta, **base_meta})
 
-            # DocStore gets the text
-            doc_rows.append((chunk_id, chunk, meta))
 
-            # Pinecone gets vectors + metadata (no text)
-            all_ids.append(chunk_id)
-            all_texts.append(chunk)
-            all_metas.append(meta)
+def attach_article_refs(
+    records: Iterable[ChunkRecord],
+    timings: Optional[StageTimings] = None,
+) -> Iterator[ChunkRecord]:
+    """Stage: add article refs (Pinecone-safe: list of strings) and drop nulls."""
+    timings = timings or StageTimings()
+    for rec in records:
+        with timings.time("article_refs"):
+            refs = extract_article_refs(rec.text)
+            if refs:
+                rec.meta["article_refs"] = refs
+                rec.meta["article_primary"] = refs[0]
+
+            rec.meta = drop_none(rec.meta)  # remove nulls (Pinecone rejects)
+        yield rec
+
+
+def dedupe_chunks(
+    records: Iterable[ChunkRecord],
+    deduper: ChunkDeduper,
+    timings: Optional[StageTimings] = None,
+) -> Iterator[ChunkRecord]:
+    """
+    Stage (DEDUP_ENABLED): mark exact / near duplicates of chunks from other
+    seasons and issues. Every record still reaches the docstore and article index;
+    only canonicals are embedded and upserted.
+    """
+    timings = timings or StageTimings()
+    for rec in records:
+        with timings.time("dedup"):
+            rec.canonical_id = deduper.assign(rec.chunk_id, rec.text, rec.meta)
+            rec.meta.update(member_tags(rec.meta))
+        yield rec
+
+
+def _update_memberships(
+    deduper: ChunkDeduper,
+    *,
+    store: PineconeStore,
+    namespace: str,
+) -> int:
+    """Push season/issue tags gathered after a canonical was upserted."""
+    grown = list(deduper.grown())
+    with ThreadPoolExecutor(max_workers=max(1, UPSERT_CONCURRENCY)) as pool:
+        list(pool.map(
+            lambda item: store.update_metadata(id=item[0], metadata=item[1], namespace=namespace),
+            grown,
+        ))
+    return len(grown)
+
+
+class ArticleSectionTracker:
+    """
+    Stage (ArticleIndex): one row per (article, chunk) for records in document order.
+    Section membership carries across chunks, pages and batches of the same document.
+    """
+
+    def __init__(self):
+        self.source: Optional[str] = None
+        self.section: Optional[str] = None
+
+    def rows(self, rec: ChunkRecord) -> List[ArticleRow]:
+        source = rec.meta.get("source")
+        if source != self.source:
+            self.source, self.section = source, None
+
+        sections: List[str] = [self.section] if self.section else []
+        heads = article_headings(rec.text)
+        sections.extend(heads)
+        if heads:
+            self.section = heads[-1]
+
+        out: List[ArticleRow] = []
+        for art in dict.fromkeys(sections):
+            out.append(ArticleRow(chunk_id=rec.chunk_id, article=art, rank=RANK_SECTION, meta=rec.meta))
+            # "Article 12" should also reach chunks under 12.x
+            if "." in art:
+                parent = art.split(".", 1)[0]
+                out.append(ArticleRow(chunk_id=rec.chunk_id, article=parent, rank=RANK_SECTION, meta=rec.meta))
+
+        for art in rec.meta.get("article_refs", []):
+            out.append(ArticleRow(chunk_id=rec.chunk_id, article=art, rank=RANK_MENTION, meta=rec.meta))
+        return out
+
+
+EmbedFn = Callable[[Sequence[str]], List[List[float]]]
+
+
+def embed_batch(
+    batch: List[ChunkRecord],
+    *,
+    emb_store: Optional[EmbeddingStore] = None,
+    embed_fn: Optional[EmbedFn] = None,
+) -> List[List[float]]:
+    """
+    Stage: embed one batch (only embedding-store misses hit the API).
+    embed_fn replaces the per-request OpenAI call (default: embed_texts).
+    """
+    texts = [r.text for r in batch]
+    counts = {r.text: r.tokens() for r in batch}
+
+    def embed_misses(ts: Sequence[str]) -> List[List[float]]:
+        return embed_texts_batched(ts, embed_fn=embed_fn, token_counts=[counts[t] for t in ts])
+
+    if emb_store is not None:
+        return emb_store.embed(texts, embed_misses)
+    return embed_misses(texts)
+
+
+def upsert_batch(
+    batch: List[ChunkRecord],
+    embeds: List[List[float]],
+    *,
+    store: PineconeStore,
+    namespace: str,
+) -> UpsertReport:
+    """
+    Stage: Pinecone gets vectors + metadata (no text).
+    Two-stage retrieval (FIRST_STAGE_DIM): only the shortened vector is upserted,
+    the full one stays in the embedding store for rescoring.
+
+    Stores with upsert_bulk split by size, send in parallel and retry transient
+    errors; a part that still fails aborts the build (its document is not recorded
+    in the manifest, so the next build picks it up again).
+
+    NAMESPACE_PARTITION: each vector goes to its season (x series) namespace.
+    """
+    if INDEX_DIM < EMBED_DIM:
+        embeds = [shorten(vec, INDEX_DIM) for vec in embeds]
+    parts: Dict[str, List[Dict[str, Any]]] = {}
+    for r, vec in zip(batch, embeds):
+        parts.setdefault(partition_namespace(namespace, r.meta, NAMESPACE_PARTITION), []).append(
+            {"id": r.chunk_id, "values": vec, "metadata": r.meta}
+        )
+
+    bulk = getattr(store, "upsert_bulk", None)
+    report = UpsertReport()
+    for ns, vectors in parts.items():
+        if bulk is None:
+            # local stores: no request limits / transient errors
+            for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+                store.upsert(vectors=vectors[i:i + UPSERT_BATCH_SIZE], namespace=ns)
+        else:
+            report.extend(bulk(vectors=vectors, namespace=ns))
+    if report.failed:
+        failed = report.failed
+        raise RuntimeError(
+            f"Upsert failed for {sum(b.vectors for b in failed)} vectors "
+            f"({len(failed)}/{len(report.batches)} requests) after retries: {failed[0].error}"
+        )
+    return report
+
+
+def _purge_chunks(
+    chunk_ids: Iterable[str],
+    *,
+    docstore: SQLiteDocStore,
+    store: PineconeStore,
+    namespace: str,
+    article_index: Optional[ArticleIndex] = None,
+    diff_groups: Optional[Set[DiffGroup]] = None,
+) -> int:
+    """Delete chunks everywhere; diff_groups collects the regulations they belonged to."""
+    ids = sorted(set(chunk_ids))
+    if ids:
+        metas: Dict[str, Dict[str, Any]] = {}
+        if NAMESPACE_PARTITION != "none" or diff_groups is not None:
+            # from the stored metadata (deleted from the docstore below)
+            metas = {cid: meta for cid, (_, meta) in docstore.get_many_with_meta(ids).items()}
+        if diff_groups is not None:
+            diff_groups.update(diff_group(meta) for meta in metas.values())
+        if NAMESPACE_PARTITION == "none":
+            store.delete(ids=ids, namespace=namespace)
+        else:
+            for ns, part in group_by_partition(namespace, metas, layout=NAMESPACE_PARTITION).items():
+                store.delete(ids=part, namespace=ns)
+        docstore.delete_many(ids)
+        if article_index is not None:
+            article_index.delete_chunks(namespace, ids)
+    return len(ids)
+
+
+def build_index_from_pdfs(
+    pdf_dir: str,
+    *,
+    incremental: Optional[bool] = None,
+    store: Optional[PineconeStore] = None,
+    embed_fn: Optional[EmbedFn] = None,
+    timings: Optional[StageTimings] = None,
+) -> IngestStats:
+    """
+    Streaming ingestion:
+      load page -> chunk -> article refs -> [batch] -> docstore -> embed -> upsert
+
+    Stages are generators joined by bounded queues, so peak memory depends on
+    the embedding batch budget / queue sizes rather than on corpus size. Embedding and
+    upserts run concurrently (EMBED_CONCURRENCY / UPSERT_CONCURRENCY in flight).
+
+    Every build records (source, version_hash, chunk_ids) in the manifest and
+    deletes vectors/rows of removed or replaced documents. With incremental=True
+    (default: INCREMENTAL_INDEX) PDFs whose version_hash is unchanged are skipped.
+
+    store / embed_fn override the Pinecone store and the OpenAI request (offline
+    benchmarks, see scripts/bench_ingest.py). timings collects per-stage busy time.
+    """
+    if incremental is None:
+        incremental = INCREMENTAL_INDEX
+    if DEDUP_ENABLED and incremental:
+        # canonicals span documents, so a partial rebuild cannot keep membership right
+        print("DEDUP_ENABLED: incremental builds are not supported, doing a full build")
+        incremental = False
+    timings = timings or StageTimings()
 
-    # write docstore first
-    docstore.put_many(doc_rows)
+    pdf_dir_path = Path(pdf_dir)
+    namespace = PINECONE_NAMESPACE
+
+    docstore = SQLiteDocStore(DOCSTORE_PATH, lexical_index=LEXICAL_INDEX_ENABLED)
+    manifest = IndexManifest(MANIFEST_PATH, target=MANIFEST_TARGET)
+    emb_store = (
+        EmbeddingStore(EMBED_STORE_PATH, model=EMBEDDING_MODEL, dimension=EMBED_DIM)
+        if EMBED_STORE_ENABLED
+        else None
+    )
+    article_index = ArticleIndex(ARTICLE_INDEX_PATH) if ARTICLE_INDEX_ENABLED else None
+    deduper = ChunkDeduper() if DEDUP_ENABLED else None
 
-    # embed + upsert
-    batch_size = 96
-    for i in range(0, len(all_texts), batch_size):
-        texts_b = all_texts[i:i + batch_size]
-        ids_b = all_ids[i:i + batch_size]
-        metas_b = all_metas[i:i + batch_size]
+    if store is None:
+        store = make_vector_store()
+    store.ensure_index()
 
-        embeds_b = embed_texts(texts_b)
+    stats = IngestStats()
+
+    # -----------------------
+    # Plan: what changed since the last build?
+    # -----------------------
+    with timings.time("plan"):
+        indexed = manifest.get_all(namespace)
+        pdf_paths = list_pdfs(pdf_dir)
+        versions = {p.name: file_version_hash(p) for p in pdf_paths}
+
+    to_process = [
+        p for p in pdf_paths
+        if not incremental
+        or p.name not in indexed
+        or indexed[p.name].version_hash != versions[p.name]
+    ]
+    stats.skipped = len(pdf_paths) - len(to_process)
+
+    # regulations whose article diffs are stale (documents written or deleted)
+    diff_groups: Optional[Set[DiffGroup]] = (
+        set() if ARTICLE_DIFF_ENABLED and article_index is not None else None
+    )
 
-        vectors = [
-            {"id": cid, "values": vec, "metadata": meta}
-            for cid, vec, meta in zip(ids_b, embeds_b, metas_b)
-        ]
-        store.upsert(vectors=vectors, namespace=PINECONE_NAMESPACE)
+    # Documents that disappeared from PDF_DIR
+    for source in sorted(set(indexed) - set(versions)):
+        stats.deleted += _purge_chunks(
+            indexed[source].chunk_ids,
+            docstore=docstore, store=store, namespace=namespace, article_index=article_index,
+            diff_groups=diff_groups,
+        )
+        manifest.delete(namespace, source)
+
+    def finalize(source: str, chunk_ids: List[str], partitions: Set[Tuple[Any, ...]]) -> None:
+        # Replaced document: drop chunk ids the new version no longer produces
+        old = indexed.get(source)
+        if old is not None:
+            stats.deleted += _purge_chunks(
+                set(old.chunk_ids) - set(chunk_ids),
+                docstore=docstore, store=store, namespace=namespace, article_index=article_index,
+                diff_groups=diff_groups,
+            )
+        manifest.put(namespace, source, versions[source], chunk_ids, partitions)
+
+    # -----------------------
+    # Ingest
+    # -----------------------
+    pages = bounded(iter_pdf_pages(pdf_dir, pdf_paths=to_process, timings=timings), INGEST_PAGE_QUEUE)
+    records = attach_article_refs(chunk_pages(pages, pdf_dir_path, stats, timings), timings)
+    if deduper is not None:
+        records = dedupe_chunks(records, deduper, timings)
+    # one ingest batch ~= one embeddings request (token + item budget); duplicates are not embedded
+    batches = bounded(
+        batched_by_budget(
+            records,
+            weight=lambda r: 0 if r.canonical_id else r.tokens(),
+            max_weight=EMBED_MAX_BATCH_TOKENS,
+            max_items=EMBED_MAX_BATCH_ITEMS,
+        ),
+        INGEST_BATCH_QUEUE,
+    )
 
-    print(f"Indexed {len(all_texts)} chunks from {len(docs_seen)} PDFs")
-    print(f"namespace={PINECONE_NAMESPACE} | docstore={DOCSTORE_PATH}")
+    in_flight: Dict[str, List[str]] = {}  # source -> chunk ids written so far
+    in_partitions: Dict[str, Set[Tuple[Any, ...]]] = {}  # source -> partitions written so far
+    finalized: Set[str] = set()
+    duplicate_ids: List[str] = []
+
+    def on_batch_written(batch: List[ChunkRecord]) -> None:
+        stats.chunks += len(batch)
+
+        for r in batch:
+            in_flight.setdefault(r.meta["source"], []).append(r.chunk_id)
+            if NAMESPACE_PARTITION != "none":
+                in_partitions.setdefault(r.meta["source"], set()).add(partition_values(r.meta, NAMESPACE_PARTITION))
+
+        # Acks arrive in document order: everything before the last source is complete
+        last_source = batch[-1].meta["source"]
+        for source in [s for s in in_flight if s != last_source]:
+            finalize(source, in_flight.pop(source), in_partitions.pop(source, set()))
+            finalized.add(source)
+
+    # embed + upsert overlap across batches; docstore writes stay on this thread
+    # (first, so every vector can always be hydrated)
+    section_tracker = ArticleSectionTracker()
+
+    def embed_stage(batch: List[ChunkRecord]) -> List[List[float]]:
+        with timings.time("embed"):
+            todo = [r for r in batch if r.canonical_id is None]
+            return embed_batch(todo, emb_store=emb_store, embed_fn=embed_fn)
+
+    def upsert_stage(batch: List[ChunkRecord], embeds: List[List[float]]) -> None:
+        with timings.time("upsert"):
+            todo = [r for r in batch if r.canonical_id is None]
+            report = upsert_batch(todo, embeds, store=store, namespace=namespace)
+            stats.upserts.extend(report)
+
+    with EmbedUpsertExecutor(
+        embed_fn=embed_stage,
+        upsert_fn=upsert_stage,
+        embed_concurrency=EMBED_CONCURRENCY,
+        upsert_concurrency=UPSERT_CONCURRENCY,
+        on_done=on_batch_written,
+    ) as writer:
+        for batch in batches:
+            with timings.time("docstore"):
+                docstore.put_many((r.chunk_id, r.text, r.meta) for r in batch)
+                if deduper is not None:
+                    docstore.put_members(
+                        (r.chunk_id, r.canonical_id or r.chunk_id, r.meta.get("season"), r.meta.get("issue"))
+                        for r in batch
+                    )
+                    duplicate_ids.extend(r.chunk_id for r in batch if r.canonical_id)
+            if article_index is not None:
+                with timings.time("article_index"):
+                    article_index.put_many(namespace, (row for r in batch for row in section_tracker.rows(r)))
+            if diff_groups is not None:
+                diff_groups.update(diff_group(r.meta) for r in batch)
+            writer.submit(batch)
+
+    for p in to_process:
+        if p.name not in finalized:
+            finalize(p.name, in_flight.pop(p.name, []), in_partitions.pop(p.name, set()))
+
+    updated = 0
+    if deduper is not None:
+        with timings.time("dedup_update"):
+            updated = _update_memberships(deduper, store=store, namespace=namespace)
+            # chunks that were canonical in an earlier build may be members now
+            if duplicate_ids:
+                store.delete(ids=duplicate_ids, namespace=namespace)
+        stats.duplicates = len(duplicate_ids)
+
+    # Season-to-season article diffs (local; rebuilt from the article index for the
+    # regulations this build touched, nothing to do when every PDF was skipped)
+    n_diffs = None
+    if diff_groups is not None and (to_process or stats.deleted):
+        with timings.time("article_diffs"):
+            n_diffs = build_article_diffs(
+                namespace,
+                article_index=article_index,
+                docstore=docstore,
+                diff_index=ArticleDiffIndex(ARTICLE_DIFF_PATH),
+                groups=diff_groups,
+            )
+
+    invalidate_partitions()
+
+    print(f"Indexed {stats.chunks} chunks from {len(stats.docs)} PDFs")
+    if stats.skipped or stats.deleted:
+        print(f"Skipped {stats.skipped} unchanged PDFs | deleted {stats.deleted} stale chunks")
+    if deduper is not None:
+        print(
+            f"Dedup: {stats.chunks} chunks -> {deduper.canonicals} vectors "
+            f"({deduper.exact} exact, {deduper.near} near duplicates) | "
+            f"{updated} memberships updated"
+        )
+    if n_diffs is not None:
+        print(f"Article diffs: {n_diffs} (article, season pair) rows rebuilt for {len(diff_groups)} regulations")
+    us = stats.upserts.snapshot()
+    if us["requests"]:
+        print(
+            f"Upserts: {us['requests']} requests | {us['vectors']} vectors | {us['retries']} retries | "
+            f"p50 {us['p50_ms']:.0f} ms | p99 {us['p99_ms']:.0f} ms"
+        )
+    if emb_store is not None:
+        print(f"Embedding store: {emb_store.hits} hits | {emb_store.misses} embedded")
+    es = embed_stats.snapshot()
+    if es["requests"]:
+        print(
+            f"Embeddings: {es['requests']} requests | {es['tokens']} tokens | "
+            f"{es['tokens_per_sec']:.0f} tok/s | {es['requests_per_sec']:.2f} req/s"
+        )
+    if EMBED_BACKEND == "local" and embed_fn is None:
+        from embeddings.local_embedder import get_local_embedder
+
+        ls = get_local_embedder().stats.snapshot()
+        if ls["requests"]:
+            print(
+                f"Local model ({EMBEDDING_MODEL}): {ls['requests']} batches | "
+                f"{ls['mean_request_ms']:.1f} ms/batch | {ls['texts'] / (ls['wall_seconds'] or 1e-9):.0f} texts/s"
+            )
+    print(f"namespace={namespace} | docstore={DOCSTORE_PATH}")
     if store.host:
         print(f"PINECONE_HOST={store.host}")
+    return stats
 
 
 if __name__ == "__main__":
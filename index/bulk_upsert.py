@@ -0,0 +1,171 @@
+# index/bulk_upsert.py
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config import (
+    UPSERT_BATCH_SIZE,
+    UPSERT_MAX_REQUEST_BYTES,
+    UPSERT_PARALLEL,
+    UPSERT_MAX_RETRIES,
+    UPSERT_BACKOFF_S,
+    UPSERT_BACKOFF_MAX_S,
+)
+from index.ingest_pipeline import percentile
+
+UpsertFn = Callable[..., Any]  # upsert(vectors=..., namespace=...)
+
+# gRPC status codes worth another attempt
+_RETRYABLE_GRPC = {"UNAVAILABLE", "RESOURCE_EXHAUSTED", "DEADLINE_EXCEEDED", "ABORTED", "INTERNAL"}
+
+
+@dataclass
+class UpsertBatchStats:
+    vectors: int
+    bytes: int
+    attempts: int = 0
+    seconds: float = 0.0  # first send -> done, backoff included
+    error: Optional[str] = None  # last error if the part failed for good
+    ids: List[str] = field(default_factory=list, repr=False)
+
+
+@dataclass
+class UpsertReport:
+    """Per-request results of one (or several merged) bulk upserts."""
+
+    batches: List[UpsertBatchStats] = field(default_factory=list)
+
+    def extend(self, other: "UpsertReport") -> None:
+        self.batches.extend(other.batches)
+
+    @property
+    def failed(self) -> List[UpsertBatchStats]:
+        return [b for b in self.batches if b.error is not None]
+
+    @property
+    def failed_ids(self) -> List[str]:
+        return [i for b in self.failed for i in b.ids]
+
+    def snapshot(self) -> Dict[str, float]:
+        ms = [b.seconds * 1000.0 for b in self.batches]
+        return {
+            "requests": len(self.batches),
+            "vectors": sum(b.vectors for b in self.batches),
+            "bytes": sum(b.bytes for b in self.batches),
+            "retries": sum(max(0, b.attempts - 1) for b in self.batches),
+            "failed_requests": len(self.failed),
+            "failed_vectors": sum(b.vectors for b in self.failed),
+            "p50_ms": percentile(ms, 0.50),
+            "p99_ms": percentile(ms, 0.99),
+            "max_ms": max(ms, default=0.0),
+        }
+
+
+def split_vectors(
+    vectors: List[Dict[str, Any]],
+    *,
+    max_vectors: int = UPSERT_BATCH_SIZE,
+    max_bytes: int = UPSERT_MAX_REQUEST_BYTES,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Consecutive parts of at most `max_vectors` vectors and ~`max_bytes` of JSON payload
+    (a vector larger than max_bytes on its own still gets its own request).
+    """
+    parts: List[List[Dict[str, Any]]] = []
+    cur: List[Dict[str, Any]] = []
+    cur_bytes = 0
+    for v in vectors:
+        size = len(json.dumps(v, separators=(",", ":"))) + 1
+        if cur and (len(cur) >= max_vectors or cur_bytes + size > max_bytes):
+            parts.append(cur)
+            cur, cur_bytes = [], 0
+        cur.append(v)
+        cur_bytes += size
+    if cur:
+        parts.append(cur)
+    return parts
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429 / 5xx, timeouts and connection errors (HTTP or gRPC transport)."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    code = getattr(exc, "code", None)
+    if callable(code):
+        try:
+            return getattr(code(), "name", "") in _RETRYABLE_GRPC
+        except Exception:
+            return False
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = type(exc).__name__
+    return "Timeout" in name or "Connection" in name or name == "ProtocolError"
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    value = getattr(exc, "retry_after", None)
+    return float(value) if isinstance(value, (int, float)) and value > 0 else None
+
+
+def bulk_upsert(
+    upsert: UpsertFn,
+    vectors: List[Dict[str, Any]],
+    *,
+    namespace: str,
+    max_vectors: int = UPSERT_BATCH_SIZE,
+    max_bytes: int = UPSERT_MAX_REQUEST_BYTES,
+    parallel: int = UPSERT_PARALLEL,
+    max_retries: int = UPSERT_MAX_RETRIES,
+    backoff_s: float = UPSERT_BACKOFF_S,
+    backoff_max_s: float = UPSERT_BACKOFF_MAX_S,
+    sleep: Callable[[float], None] = time.sleep,
+) -> UpsertReport:
+    """
+    Split `vectors` into size-bounded requests, send up to `parallel` at a time and
+    retry transient failures (is_retryable) with full-jitter exponential backoff
+    (a server Retry-After wins when longer).
+
+    Never raises for a failed part: the report lists every request with its attempts,
+    duration and final error, so the caller decides whether to abort.
+    """
+    parts = split_vectors(vectors, max_vectors=max_vectors, max_bytes=max_bytes)
+    report = UpsertReport()
+    rnd = random.Random()
+    rnd_lock = threading.Lock()
+
+    def send(part: List[Dict[str, Any]]) -> UpsertBatchStats:
+        st = UpsertBatchStats(
+            vectors=len(part),
+            bytes=sum(len(json.dumps(v, separators=(",", ":"))) for v in part),
+            ids=[v["id"] for v in part],
+        )
+        t0 = time.perf_counter()
+        while True:
+            st.attempts += 1
+            try:
+                upsert(vectors=part, namespace=namespace)
+                st.error = None
+                break
+            except Exception as e:
+                st.error = f"{type(e).__name__}: {e}"
+                if st.attempts > max_retries or not is_retryable(e):
+                    break
+                with rnd_lock:
+                    delay = rnd.uniform(0.0, min(backoff_max_s, backoff_s * 2 ** (st.attempts - 1)))
+                sleep(max(delay, _retry_after(e) or 0.0))
+        st.seconds = time.perf_counter() - t0
+        return st
+
+    if len(parts) <= 1 or parallel <= 1:
+        report.batches = [send(p) for p in parts]
+    else:
+        with ThreadPoolExecutor(max_workers=min(parallel, len(parts)), thread_name_prefix="upsert") as pool:
+            report.batches = list(pool.map(send, parts))
+    return report
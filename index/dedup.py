@@ -0,0 +1,187 @@
+# index/dedup.py
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from config import DEDUP_MAX_DISTANCE
+
+_TOKEN_RE = re.compile(r"\w+")
+_SHINGLE = 3         # word n-grams
+_MIN_SHINGLES = 8    # shorter chunks are only merged when exactly equal
+_MASK64 = (1 << 64) - 1
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def content_hash(text: str) -> str:
+    """Exact-duplicate key (case + whitespace insensitive)."""
+    return hashlib.sha1(_normalize(text).encode("utf-8")).hexdigest()
+
+
+def simhash64(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over word 3-gram shingles (None for very short texts).
+
+    Per-bit counts are kept bit-sliced (slices[k] holds bit k of every counter),
+    so adding a shingle hash is a few big-int ops instead of a 64-step loop.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    shingles = {" ".join(tokens[i:i + _SHINGLE]) for i in range(len(tokens) - _SHINGLE + 1)}
+    if len(shingles) < _MIN_SHINGLES:
+        return None
+
+    slices: List[int] = []
+    for sh in shingles:
+        carry = int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "little")
+        k = 0
+        while carry:
+            if k == len(slices):
+                slices.append(carry)
+                break
+            s = slices[k]
+            slices[k] = s ^ carry
+            carry &= s
+            k += 1
+
+    # bit i is set where count_i > n // 2 (i.e. a strict majority of shingles):
+    # bit-sliced "greater than a constant", most significant slice first
+    threshold = len(shingles) // 2
+    gt, eq = 0, _MASK64
+    for k in range(max(len(slices), threshold.bit_length()) - 1, -1, -1):
+        c = slices[k] if k < len(slices) else 0
+        if (threshold >> k) & 1:
+            eq &= c
+        else:
+            gt |= eq & c
+            eq &= ~c & _MASK64
+    return gt
+
+
+def member_tags(meta: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Membership tags of one chunk (Pinecone-safe string lists):
+    season_tags ["2024"], issue_tags ["2024-3"] (season-issue).
+    """
+    season, issue = meta.get("season"), meta.get("issue")
+    tags: Dict[str, List[str]] = {}
+    if season is not None:
+        tags["season_tags"] = [str(season)]
+        if issue is not None:
+            tags["issue_tags"] = [f"{season}-{issue}"]
+    return tags
+
+
+@dataclass
+class _Canonical:
+    chunk_id: str
+    simhash: Optional[int]
+    sources: Set[str]
+    season_tags: Set[str] = field(default_factory=set)
+    issue_tags: Set[str] = field(default_factory=set)
+    grown: bool = False
+
+
+class ChunkDeduper:
+    """
+    Streaming exact + near-duplicate detection for chunk records.
+
+    The first chunk seen with a given text becomes the canonical (the only one
+    embedded + upserted); later chunks from *other* documents that are identical
+    (content hash) or within `max_distance` SimHash bits join it as members.
+    Candidates are limited to the same tenant / doc_type / regulation_type.
+
+    Near-duplicate lookup is LSH over max_distance + 1 bands of the SimHash:
+    by pigeonhole, two hashes within max_distance bits agree on at least one band.
+    """
+
+    def __init__(self, *, max_distance: int = DEDUP_MAX_DISTANCE):
+        if not 0 <= max_distance <= 7:
+            raise ValueError("DEDUP_MAX_DISTANCE must be between 0 and 7")
+        self.max_distance = max_distance
+        self.n_bands = max_distance + 1
+        self.band_bits = 64 // self.n_bands
+
+        self._exact: Dict[Tuple[Any, str], _Canonical] = {}
+        self._bands: Dict[Tuple[Any, int, int], List[_Canonical]] = {}
+        self._canonicals: List[_Canonical] = []
+
+        self.exact = 0
+        self.near = 0
+
+    def _band_keys(self, scope: Any, h: int) -> Iterator[Tuple[Any, int, int]]:
+        mask = (1 << self.band_bits) - 1
+        for b in range(self.n_bands):
+            yield scope, b, (h >> (b * self.band_bits)) & mask
+
+    def _near(self, scope: Any, h: int, source: str) -> Optional[_Canonical]:
+        best: Optional[_Canonical] = None
+        best_d = self.max_distance + 1
+        for key in self._band_keys(scope, h):
+            for cand in self._bands.get(key, ()):
+                if source in cand.sources or cand.simhash is None:
+                    continue
+                d = (cand.simhash ^ h).bit_count()
+                if d < best_d:
+                    best, best_d = cand, d
+        return best
+
+    def assign(self, chunk_id: str, text: str, meta: Dict[str, Any]) -> Optional[str]:
+        """
+        Returns the canonical chunk id if this chunk duplicates an earlier one,
+        else None (the chunk is registered as a new canonical).
+        """
+        source = meta.get("source") or ""
+        scope = (meta.get("tenant"), meta.get("doc_type"), meta.get("regulation_type"))
+        key = (scope, content_hash(text))
+
+        canon = self._exact.get(key)
+        if canon is not None and source not in canon.sources:
+            self.exact += 1
+        else:
+            canon = None
+            h = simhash64(text) if self.max_distance > 0 else None
+            if h is not None:
+                canon = self._near(scope, h, source)
+                if canon is not None:
+                    self.near += 1
+
+            if canon is None:
+                canon = _Canonical(chunk_id=chunk_id, simhash=h, sources={source})
+                self._canonicals.append(canon)
+                self._exact.setdefault(key, canon)
+                if h is not None:
+                    for bk in self._band_keys(scope, h):
+                        self._bands.setdefault(bk, []).append(canon)
+                self._tag(canon, meta)
+                return None
+
+        canon.sources.add(source)
+        canon.grown |= self._tag(canon, meta)
+        return canon.chunk_id
+
+    @staticmethod
+    def _tag(canon: _Canonical, meta: Dict[str, Any]) -> bool:
+        before = (len(canon.season_tags), len(canon.issue_tags))
+        tags = member_tags(meta)
+        canon.season_tags.update(tags.get("season_tags", ()))
+        canon.issue_tags.update(tags.get("issue_tags", ()))
+        return before != (len(canon.season_tags), len(canon.issue_tags))
+
+    def grown(self) -> Iterator[Tuple[str, Dict[str, List[str]]]]:
+        """Canonicals that gained seasons/issues after they were first written."""
+        for canon in self._canonicals:
+            if canon.grown:
+                yield canon.chunk_id, _tags_meta(canon)
+
+    @property
+    def canonicals(self) -> int:
+        return len(self._canonicals)
+
+
+def _tags_meta(canon: _Canonical) -> Dict[str, List[str]]:
+    return {"season_tags": sorted(canon.season_tags), "issue_tags": sorted(canon.issue_tags)}
@@ -1,9 +1,44 @@
 # index/docstore_sqlite.py
 from __future__ import annotations
 
+import re
 import sqlite3
 import json
-from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+from contextlib import closing, contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from config import DOCSTORE_WAL, DOCSTORE_MMAP_BYTES, DOCSTORE_CACHE_KB, DOCSTORE_MAX_VARS
+from index.filters import filter_scope
+from index.sqlite_batches import in_batches
+from index.memory_store import matches_filter
+
+# Metadata copied into the full-text index, filterable in SQL (everything else is
+# checked on the chunk metadata after the match)
+LEXICAL_FIELDS = ("tenant", "season", "series", "regulation_type", "doc_type")
+
+_TOKEN_RE = re.compile(r"\w+(?:[.\-]\w+)*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "between", "by", "does", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "say", "that", "the", "to", "was", "what", "when",
+    "which", "with", "about", "after", "before", "compare", "did", "do",
+}
+
+
+def fts_query(text: str) -> str:
+    """
+    Free text -> FTS5 MATCH expression: every token quoted (no FTS syntax from user
+    input; "12.3" stays one phrase), stopwords dropped, OR-joined so BM25 ranks.
+    """
+    terms: List[str] = []
+    for tok in _TOKEN_RE.findall(text or ""):
+        low = tok.lower()
+        if low in _STOPWORDS or (len(low) == 1 and not low.isdigit()):
+            continue
+        term = '"' + tok.replace('"', '""') + '"'
+        if term not in terms:
+            terms.append(term)
+    return " OR ".join(terms)
 
 
 class SQLiteDocStore:
@@ -16,18 +51,70 @@ class SQLiteDocStore:
     - persistent
     - fast enough for dev + single-node prod
     - easy to swap to Postgres later
+
+    lexical_index=True keeps an FTS5 (BM25) index over chunk text (chunks_fts) in
+    step with put_many / delete_many, built from existing rows on first use. Once
+    the index exists every writer maintains it.
+
+    Connections are opened once: writes go through a single writer connection
+    (serialized by a lock), reads through a persistent read-only connection per
+    thread (mmap + page cache pragmas), with the file in WAL mode so reads never
+    wait for an ingest in progress. Id lookups are split into batches of at most
+    max_vars bound parameters.
     """
 
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        *,
+        lexical_index: bool = False,
+        wal: bool = DOCSTORE_WAL,
+        mmap_bytes: int = DOCSTORE_MMAP_BYTES,
+        cache_kb: int = DOCSTORE_CACHE_KB,
+        max_vars: int = DOCSTORE_MAX_VARS,
+    ):
         self.path = path
+        self.lexical = lexical_index
+        self.max_vars = max_vars
+        self._mmap_bytes = mmap_bytes
+        self._cache_kb = cache_kb
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # shared by all threads, always used under _write_lock
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        if wal:
+            self._writer.execute("PRAGMA journal_mode = WAL")
+            self._writer.execute("PRAGMA synchronous = NORMAL")
         self._init_db()
 
-    def _conn(self) -> sqlite3.Connection:
-        # check_same_thread=False lets you reuse in threaded apps (FastAPI)
-        return sqlite3.connect(self.path, check_same_thread=False)
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection (autocommit: each query sees the latest commit)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, isolation_level=None)
+            con.execute(f"PRAGMA mmap_size = {int(self._mmap_bytes)}")
+            con.execute(f"PRAGMA cache_size = {-int(self._cache_kb)}")
+            con.execute("PRAGMA query_only = 1")
+            self._local.con = con
+        return con
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """The writer connection, one transaction (committed, or rolled back on error)."""
+        with self._write_lock, self._writer as con:
+            yield con
+
+    def close(self) -> None:
+        """Close the writer and the calling thread's reader (other readers close with their thread)."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+        with self._write_lock:
+            self._writer.close()
 
     def _init_db(self) -> None:
-        with self._conn() as con:
+        with self._write() as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS chunks (
@@ -38,8 +125,48 @@ class SQLiteDocStore:
                 """
             )
             con.execute("CREATE INDEX IF NOT EXISTS idx_chunks_chunk_id ON chunks(chunk_id)")
+            # Dedup builds: which chunks (season/issue copies) a stored vector stands for
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunk_members (
+                    member_id TEXT PRIMARY KEY,
+                    canonical_id TEXT NOT NULL,
+                    season INTEGER,
+                    issue INTEGER
+                )
+                """
+            )
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chunk_members_canonical ON chunk_members(canonical_id)"
+            )
+            has_fts = con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunks_fts'"
+            ).fetchone() is not None
+            if self.lexical and not has_fts:
+                # FTS rowid = chunks rowid; filter fields are stored, not tokenized
+                con.execute(
+                    f"""
+                    CREATE VIRTUAL TABLE chunks_fts USING fts5(
+                        text,
+                        chunk_id UNINDEXED,
+                        {", ".join(f"{f} UNINDEXED" for f in LEXICAL_FIELDS)},
+                        tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                    """
+                )
+                con.execute(self._fts_insert_sql(""))
+            self.lexical = self.lexical or has_fts
             con.commit()
 
+    @staticmethod
+    def _fts_insert_sql(where: str) -> str:
+        cols = ", ".join(LEXICAL_FIELDS)
+        vals = ", ".join(f"json_extract(meta_json, '$.{f}')" for f in LEXICAL_FIELDS)
+        return (
+            f"INSERT INTO chunks_fts(rowid, text, chunk_id, {cols}) "
+            f"SELECT rowid, text, chunk_id, {vals} FROM chunks {where}"
+        )
+
     def put_many(self, rows: Iterable[Tuple[str, str, Optional[dict]]]) -> None:
         """
         rows: iterable of (chunk_id, text, meta_dict_or_none)
@@ -48,11 +175,31 @@ class SQLiteDocStore:
             (cid, txt, json.dumps(meta or {}, ensure_ascii=False))
             for cid, txt, meta in rows
         ]
-        with self._conn() as con:
+        with self._write() as con:
+            if self.lexical:
+                con.executemany(
+                    "DELETE FROM chunks_fts WHERE rowid IN (SELECT rowid FROM chunks WHERE chunk_id = ?)",
+                    [(p[0],) for p in payload],
+                )
             con.executemany(
                 "INSERT OR REPLACE INTO chunks(chunk_id, text, meta_json) VALUES (?, ?, ?)",
                 payload,
             )
+            if self.lexical:
+                con.executemany(self._fts_insert_sql("WHERE chunk_id = ?"), [(p[0],) for p in payload])
+            con.commit()
+
+    def delete_many(self, chunk_ids: Iterable[str]) -> None:
+        ids = [(cid,) for cid in chunk_ids]
+        if not ids:
+            return
+        with self._write() as con:
+            if self.lexical:
+                con.executemany(
+                    "DELETE FROM chunks_fts WHERE rowid IN (SELECT rowid FROM chunks WHERE chunk_id = ?)", ids
+                )
+            con.executemany("DELETE FROM chunks WHERE chunk_id = ?", ids)
+            con.executemany("DELETE FROM chunk_members WHERE member_id = ?", ids)
             con.commit()
 
     def get_many(self, chunk_ids: List[str]) -> Dict[str, str]:
@@ -60,15 +207,119 @@ class SQLiteDocStore:
         Returns a dict {chunk_id: text} for the requested ids.
         Missing ids are simply absent in the returned dict.
         """
-        if not chunk_ids:
-            return {}
+        out: Dict[str, str] = {}
+        con = self._reader()
+        for placeholders, params in in_batches(chunk_ids, self.max_vars):
+            query = f"SELECT chunk_id, text FROM chunks WHERE chunk_id IN ({placeholders})"
+            out.update(con.execute(query, params).fetchall())
+        return out
+
+    def get_many_with_meta(self, chunk_ids: List[str]) -> Dict[str, Tuple[str, dict]]:
+        """
+        Returns {chunk_id: (text, meta)} for the requested ids.
+        Used when there is no vector-store match to take metadata from.
+        """
+        out: Dict[str, Tuple[str, dict]] = {}
+        con = self._reader()
+        for placeholders, params in in_batches(chunk_ids, self.max_vars):
+            query = f"SELECT chunk_id, text, meta_json FROM chunks WHERE chunk_id IN ({placeholders})"
+            for cid, txt, mj in con.execute(query, params).fetchall():
+                out[cid] = (txt, json.loads(mj or "{}"))
+        return out
+
+    def search_lexical(
+        self,
+        query: str,
+        *,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        collapse_members: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 search over chunk text: [(chunk_id, score)], best first (score = -bm25,
+        higher = better). filters is a Pinecone-style metadata filter: LEXICAL_FIELDS
+        constraints are applied in SQL, the rest (or filters filter_scope cannot
+        flatten) on the chunk metadata.
+
+        collapse_members (dedup builds): one hit per canonical, the newest season /
+        issue copy on ties, like the vector side.
+        """
+        match = fts_query(query)
+        if not self.lexical or not match or limit <= 0:
+            return []
+
+        scope = filter_scope(filters or {})
+        where = ["chunks_fts MATCH ?"]
+        params: List[Any] = [match]
+        for field, allowed in (scope or {}).items():
+            if field not in LEXICAL_FIELDS:
+                continue
+            if not allowed:
+                return []
+            where.append(f"f.{field} IN ({','.join('?' * len(allowed))})")
+            params.extend(allowed)
+        post_filter = bool(filters) and (scope is None or bool(set(scope) - set(LEXICAL_FIELDS)))
+
+        sql = "SELECT f.chunk_id, bm25(chunks_fts) AS rank, c.meta_json"
+        if collapse_members:
+            sql += ", COALESCE(m.canonical_id, f.chunk_id)"
+        sql += " FROM chunks_fts f JOIN chunks c ON c.rowid = f.rowid"
+        if collapse_members:
+            sql += " LEFT JOIN chunk_members m ON m.member_id = f.chunk_id"
+        sql += " WHERE " + " AND ".join(where) + " ORDER BY rank"
+        if collapse_members:
+            sql += ", m.season IS NULL, m.season DESC, m.issue IS NULL, m.issue DESC"
+        if not (post_filter or collapse_members):
+            sql += f" LIMIT {int(limit)}"
 
-        placeholders = ",".join(["?"] * len(chunk_ids))
-        query = f"SELECT chunk_id, text FROM chunks WHERE chunk_id IN ({placeholders})"
+        out: List[Tuple[str, float]] = []
+        seen = set()
+        with closing(self._reader().execute(sql, params)) as cur:
+            for row in cur:
+                cid, rank, mj = row[0], row[1], row[2]
+                if collapse_members:
+                    if row[3] in seen:
+                        continue
+                if post_filter and not matches_filter(json.loads(mj or "{}"), filters):
+                    continue
+                if collapse_members:
+                    seen.add(row[3])
+                out.append((cid, -float(rank)))
+                if len(out) >= limit:
+                    break
+        return out
 
-        with self._conn() as con:
-            cur = con.execute(query, chunk_ids)
-            return {cid: txt for cid, txt in cur.fetchall()}
+    def put_members(self, rows: Iterable[Tuple[str, str, Optional[int], Optional[int]]]) -> None:
+        """
+        rows: iterable of (member_id, canonical_id, season, issue).
+        A canonical is listed as its own member.
+        """
+        payload = list(rows)
+        if not payload:
+            return
+        with self._write() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO chunk_members(member_id, canonical_id, season, issue) VALUES (?, ?, ?, ?)",
+                payload,
+            )
+            con.commit()
+
+    def get_members(self, canonical_ids: List[str]) -> Dict[str, List[Tuple[str, Optional[int], Optional[int]]]]:
+        """
+        Returns {canonical_id: [(member_id, season, issue), ...]}, newest season/issue first.
+        Canonicals without member rows are absent.
+        """
+        out: Dict[str, List[Tuple[str, Optional[int], Optional[int]]]] = {}
+        con = self._reader()
+        for placeholders, params in in_batches(canonical_ids, self.max_vars):
+            query = (
+                "SELECT canonical_id, member_id, season, issue FROM chunk_members "
+                f"WHERE canonical_id IN ({placeholders}) "
+                "ORDER BY season IS NULL, season DESC, issue IS NULL, issue DESC, member_id"
+            )
+            for canon, member, season, issue in con.execute(query, params).fetchall():
+                out.setdefault(canon, []).append((member, season, issue))
+        return out
 
     def get_one(self, chunk_id: str) -> Optional[str]:
         res = self.get_many([chunk_id])
@@ -21,6 +21,9 @@ SERIES_KEYWORDS = {
     "f3": ["f3", "formula 3", "formula_3"],
 }
 
+# doc_type is derived from the series: fia_<series>_regulations (metadata_infer)
+DOC_TYPE_RE = re.compile(r"^fia_(\w+)_regulations$")
+
 # ✅ Explicit-only article mention in the USER QUERY
 # This prevents accidental capture of years/page numbers/etc.
 ARTICLE_EXPLICIT_RE = re.compile(
@@ -56,7 +59,13 @@ def _detect_series(q: str) -> Optional[str]:
     return None
 
 
-def _detect_article_explicit(q: str) -> Optional[str]:
+def doc_type_series(doc_type: Any) -> Optional[str]:
+    """Series a doc_type belongs to ("fia_f2_regulations" -> "f2"), None if it has none."""
+    m = DOC_TYPE_RE.match(doc_type) if isinstance(doc_type, str) else None
+    return m.group(1) if m else None
+
+
+def detect_article_explicit(q: str) -> Optional[str]:
     m = ARTICLE_EXPLICIT_RE.search(q)
     return m.group(1) if m else None
 
@@ -85,10 +94,113 @@ def build_filters(query: str, *, tenant: str = "fia") -> Dict[str, Any]:
         clauses.append({"regulation_type": {"$eq": reg_type}})
 
     # ✅ Only apply article filter when explicitly mentioned
-    article = _detect_article_explicit(query)
+    article = detect_article_explicit(query)
     if article:
         clauses.append({"article_refs": {"$in": [article]}})
 
     if len(clauses) == 1:
         return clauses[0]
     return {"$and": clauses}
+
+
+def filter_scope(flt: Dict[str, Any]) -> Optional[Dict[str, List[Any]]]:
+    """
+    Flatten a build_filters-style filter ($and of $eq / $in clauses) into
+    {field: allowed values}. Repeated fields are intersected.
+
+    Returns None if the filter uses anything else ($or, $gt, ...), so callers
+    that cannot evaluate it can fall back to the vector store.
+    """
+    scope: Dict[str, List[Any]] = {}
+
+    def visit(f: Any) -> bool:
+        if not isinstance(f, dict):
+            return False
+        for key, val in f.items():
+            if key == "$and":
+                if not isinstance(val, list) or not all(visit(x) for x in val):
+                    return False
+                continue
+            if key.startswith("$"):
+                return False
+
+            if isinstance(val, dict):
+                if len(val) != 1:
+                    return False
+                op, arg = next(iter(val.items()))
+                if op == "$eq":
+                    allowed = [arg]
+                elif op == "$in" and isinstance(arg, list):
+                    allowed = list(arg)
+                else:
+                    return False
+            else:
+                allowed = [val]  # implicit $eq
+
+            if key in scope:
+                allowed = [x for x in scope[key] if x in allowed]
+            scope[key] = allowed
+        return True
+
+    return scope if visit(flt or {}) else None
+
+
+def season_filter_to_tags(flt: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rewrite "season" clauses for a deduplicated namespace, where one vector
+    stands for several seasons listed in "season_tags" (strings):
+
+      {"season": {"$eq": 2024}}  ->  {"season_tags": {"$in": ["2024"]}}
+
+    Range operators are expanded over MIN_SEASON..MAX_SEASON.
+    """
+    def tags(values: List[Any]) -> List[str]:
+        return [str(v) for v in values]
+
+    def seasons_matching(op: str, arg: Any) -> List[int]:
+        cmp = {
+            "$gt": lambda s: s > arg,
+            "$gte": lambda s: s >= arg,
+            "$lt": lambda s: s < arg,
+            "$lte": lambda s: s <= arg,
+        }[op]
+        return [s for s in range(MIN_SEASON, MAX_SEASON + 1) if cmp(s)]
+
+    def season_clause(cond: Any) -> Dict[str, Any]:
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        parts: List[Dict[str, Any]] = []
+        for op, arg in cond.items():
+            if op == "$eq":
+                parts.append({"season_tags": {"$in": tags([arg])}})
+            elif op == "$in":
+                parts.append({"season_tags": {"$in": tags(arg)}})
+            elif op == "$ne":
+                parts.append({"season_tags": {"$nin": tags([arg])}})
+            elif op == "$nin":
+                parts.append({"season_tags": {"$nin": tags(arg)}})
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                parts.append({"season_tags": {"$in": tags(seasons_matching(op, arg))}})
+            else:
+                raise ValueError(f"Unsupported season filter operator: {op}")
+        return parts[0] if len(parts) == 1 else {"$and": parts}
+
+    def visit(f: Any) -> Any:
+        if not isinstance(f, dict):
+            return f
+        out: Dict[str, Any] = {}
+        extra: List[Dict[str, Any]] = []
+        for key, val in f.items():
+            if key in ("$and", "$or") and isinstance(val, list):
+                out[key] = [visit(x) for x in val]
+            elif key == "season":
+                extra.append(season_clause(val))
+            else:
+                out[key] = val
+        if not extra:
+            return out
+        if not out:
+            return extra[0]
+        return {"$and": [out, *extra]}
+
+    return visit(flt or {})
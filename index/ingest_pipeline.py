@@ -0,0 +1,256 @@
+# index/ingest_pipeline.py
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+B = TypeVar("B")
+V = TypeVar("V")
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def bounded(source: Iterable[T], maxsize: int) -> Iterator[T]:
+    """
+    Run `source` in a background thread and hand items over through a bounded queue.
+
+    The producer blocks when the queue is full (backpressure), so the upstream stage
+    can work ahead by at most `maxsize` items while the consumer is busy.
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    q: "queue.Queue[object]" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in source:
+                if not put(item):
+                    return
+        except BaseException as e:  # surfaced to the consumer
+            put(_StageError(e))
+            return
+        put(_DONE)
+
+    t = threading.Thread(target=produce, name="ingest-stage", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.exc
+            yield item  # type: ignore[misc]
+    finally:
+        # consumer finished early (or failed): unblock and release the producer
+        stop.set()
+        t.join(timeout=1.0)
+
+
+class StageTimings:
+    """
+    Busy time + call count per ingest stage (thread-safe).
+
+    Stages overlap (extraction processes, embed/upsert threads), so the
+    per-stage seconds are summed work and may add up to more than wall time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                k: {"seconds": self.seconds[k], "calls": self.calls[k]}
+                for k in self.seconds
+            }
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Nearest-rank q-quantile (q in 0..1) of values; 0.0 when there are none."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def batched(items: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    """Group a stream into lists of at most batch_size items."""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def batched_by_budget(
+    items: Iterable[T],
+    *,
+    weight: Callable[[T], int],
+    max_weight: int,
+    max_items: int,
+) -> Iterator[List[T]]:
+    """
+    Group a stream into lists bounded by total weight (e.g. tokens) and item count.
+    An item heavier than max_weight is emitted on its own.
+    """
+    batch: List[T] = []
+    total = 0
+    for item in items:
+        w = weight(item)
+        if batch and (total + w > max_weight or len(batch) >= max_items):
+            yield batch
+            batch, total = [], 0
+        batch.append(item)
+        total += w
+    if batch:
+        yield batch
+
+
+class EmbedUpsertExecutor(Generic[B, V]):
+    """
+    Two overlapped network stages with per-stage in-flight limits:
+
+        submit(batch) -> [embed pool] -> [upsert pool] -> on_done(batch)
+
+    - at most `embed_concurrency` embed calls and `upsert_concurrency` upserts run at once
+    - backpressure: an embed worker waits for an upsert slot before handing off, and
+      submit() blocks while all embed slots are taken
+    - on_done runs in the caller's thread, in submission order (so bookkeeping like
+      the index manifest sees batches exactly as the sequential loop did)
+    - the first failure is re-raised from submit()/drain()
+    """
+
+    def __init__(
+        self,
+        *,
+        embed_fn: Callable[[B], V],
+        upsert_fn: Callable[[B, V], None],
+        embed_concurrency: int,
+        upsert_concurrency: int,
+        on_done: Optional[Callable[[B], None]] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.upsert_fn = upsert_fn
+        self.on_done = on_done
+
+        embed_n = max(1, embed_concurrency)
+        upsert_n = max(1, upsert_concurrency)
+        self._embed_pool = ThreadPoolExecutor(max_workers=embed_n, thread_name_prefix="embed")
+        self._upsert_pool = ThreadPoolExecutor(max_workers=upsert_n, thread_name_prefix="upsert")
+        self._embed_slots = threading.BoundedSemaphore(embed_n)
+        self._upsert_slots = threading.BoundedSemaphore(upsert_n)
+
+        # finished-but-unacknowledged batches are bounded too
+        self._max_pending = 2 * (embed_n + upsert_n)
+        self._pending: Deque[Tuple[B, Future]] = deque()
+
+    def __enter__(self) -> "EmbedUpsertExecutor[B, V]":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(wait=exc_type is None)
+
+    def _run_upsert(self, batch: B, vectors: V, done: Future) -> None:
+        try:
+            self.upsert_fn(batch, vectors)
+            done.set_result(None)
+        except BaseException as e:
+            done.set_exception(e)
+        finally:
+            self._upsert_slots.release()
+
+    def _run_embed(self, batch: B, done: Future) -> None:
+        try:
+            vectors = self.embed_fn(batch)
+        except BaseException as e:
+            done.set_exception(e)
+            self._embed_slots.release()
+            return
+
+        # hand off; waiting here is what propagates upsert backpressure to embedding
+        self._upsert_slots.acquire()
+        self._embed_slots.release()
+        try:
+            self._upsert_pool.submit(self._run_upsert, batch, vectors, done)
+        except BaseException as e:
+            self._upsert_slots.release()
+            done.set_exception(e)
+
+    def _ack(self, *, block: bool) -> None:
+        while self._pending:
+            batch, done = self._pending[0]
+            if not block and not done.done():
+                return
+            done.result()  # re-raises stage failures
+            self._pending.popleft()
+            if self.on_done is not None:
+                self.on_done(batch)
+            block = block and len(self._pending) >= self._max_pending
+
+    def submit(self, batch: B) -> None:
+        while len(self._pending) >= self._max_pending:
+            self._ack(block=True)
+
+        self._embed_slots.acquire()
+        done: Future = Future()
+        self._pending.append((batch, done))
+        try:
+            self._embed_pool.submit(self._run_embed, batch, done)
+        except BaseException:
+            self._embed_slots.release()
+            raise
+
+        self._ack(block=False)
+
+    def drain(self) -> None:
+        """Wait for every submitted batch and run the remaining on_done callbacks."""
+        while self._pending:
+            batch, done = self._pending.popleft()
+            done.result()
+            if self.on_done is not None:
+                self.on_done(batch)
+
+    def close(self, *, wait: bool = True) -> None:
+        if wait:
+            self.drain()
+        self._embed_pool.shutdown(wait=wait, cancel_futures=not wait)
+        self._upsert_pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,313 @@
+# index/local_store.py
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from index.memory_store import matches_filter
+
+_RANGE_OPS = {"$gt", "$gte", "$lt", "$lte"}
+
+
+@dataclass
+class _Namespace:
+    """Read-side snapshot of one namespace (rebuilt lazily after writes)."""
+
+    ids: List[Optional[str]]                 # row -> id (None = free row)
+    metas: List[Optional[Dict[str, Any]]]
+    alive: np.ndarray                        # bool per row
+    bitmaps: Dict[str, Dict[Any, np.ndarray]] = field(default_factory=dict)
+
+    def bitmap(self, key: str) -> Dict[Any, np.ndarray]:
+        """{value: rows whose `key` equals / contains value}, built on first use of the field."""
+        bm = self.bitmaps.get(key)
+        if bm is None:
+            bm = {}
+            n = len(self.ids)
+            for row, meta in enumerate(self.metas):
+                if meta is None or key not in meta:
+                    continue
+                value = meta[key]
+                for v in value if isinstance(value, list) else [value]:
+                    if v not in bm:
+                        bm[v] = np.zeros(n, dtype=bool)
+                    bm[v][row] = True
+            self.bitmaps[key] = bm
+        return bm
+
+
+class LocalVectorStore:
+    """
+    On-disk vector store with the PineconeStore surface (ensure_index, upsert,
+    delete, update_metadata, count, query), for offline use and small corpora.
+
+    Vectors live in one memory-mapped float32 matrix per namespace
+    (<path>/<namespace>.f32, rows reused after deletes), ids + metadata in SQLite
+    (<path>/index.sqlite). Queries are exact dot products over the rows the filter
+    selects; the Pinecone-style filters ($and/$or, $eq/$in/$ne/$nin) are evaluated
+    on per-field value bitmaps, range operators per row.
+    With metric="cosine" vectors are normalized on write.
+    """
+
+    def __init__(self, *, path: str, dimension: int, metric: str = "cosine"):
+        if metric not in ("cosine", "dotproduct"):
+            raise ValueError(f"LocalVectorStore supports metric cosine / dotproduct, not {metric!r}")
+        self.path = path
+        self.dimension = dimension
+        self.metric = metric
+        os.makedirs(path, exist_ok=True)
+        self._db_path = os.path.join(path, "index.sqlite")
+        self._lock = threading.RLock()
+        self._matrices: Dict[str, np.memmap] = {}
+        self._states: Dict[str, _Namespace] = {}
+        self._init_db()
+
+    # -------------------------
+    # Storage
+    # -------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        with self._conn() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS vectors (
+                    namespace TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    meta_json TEXT,
+                    PRIMARY KEY (namespace, id)
+                )
+                """
+            )
+            con.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+            con.commit()
+
+    def ensure_index(self) -> None:
+        with self._conn() as con:
+            row = con.execute("SELECT value FROM settings WHERE key = 'dimension'").fetchone()
+            if row is None:
+                con.execute("INSERT INTO settings(key, value) VALUES ('dimension', ?)", (str(self.dimension),))
+                con.commit()
+            elif int(row[0]) != int(self.dimension):
+                raise RuntimeError(
+                    f"Local store '{self.path}' dimension={row[0]} but code expects {self.dimension}. "
+                    f"Use a different LOCAL_STORE_DIR or rebuild the store."
+                )
+
+    @property
+    def host(self) -> Optional[str]:
+        return None
+
+    def _file(self, namespace: str) -> str:
+        return os.path.join(self.path, f"{namespace}.f32")
+
+    def _matrix(self, namespace: str, min_rows: int = 0) -> Optional[np.memmap]:
+        """float32 [capacity, dim] memmap; grown (doubling) when min_rows does not fit."""
+        mat = self._matrices.get(namespace)
+        path = self._file(namespace)
+        row_bytes = 4 * self.dimension
+        if mat is None and os.path.exists(path) and os.path.getsize(path) >= row_bytes:
+            mat = np.memmap(path, dtype=np.float32, mode="r+", shape=(os.path.getsize(path) // row_bytes, self.dimension))
+        capacity = 0 if mat is None else mat.shape[0]
+        if min_rows > capacity:
+            new_cap = max(min_rows, 2 * capacity, 1024)
+            if mat is not None:
+                mat.flush()
+                del mat
+            with open(path, "ab") as f:
+                f.truncate(new_cap * row_bytes)
+            mat = np.memmap(path, dtype=np.float32, mode="r+", shape=(new_cap, self.dimension))
+        if mat is not None:
+            self._matrices[namespace] = mat
+        return mat
+
+    def _rows(self, con: sqlite3.Connection, namespace: str) -> Dict[str, int]:
+        return dict(con.execute("SELECT id, row FROM vectors WHERE namespace = ?", (namespace,)).fetchall())
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def upsert(self, *, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        if not vectors:
+            return
+        vals = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        if vals.ndim != 2 or vals.shape[1] != self.dimension:
+            raise RuntimeError(f"Vector dim {vals.shape[-1]} != index dim {self.dimension}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vals, axis=1, keepdims=True)
+            vals = vals / np.where(norms == 0, 1.0, norms)
+
+        with self._lock, self._conn() as con:
+            rows = self._rows(con, namespace)
+            used = set(rows.values())
+            free = (r for r in range(len(used) + len(vectors)) if r not in used)
+            assigned = []
+            for v in vectors:
+                row = rows.get(v["id"])
+                if row is None:
+                    row = next(free)
+                    rows[v["id"]] = row
+                assigned.append(row)
+
+            mat = self._matrix(namespace, min_rows=max(assigned) + 1)
+            mat[assigned] = vals
+            mat.flush()
+            con.executemany(
+                "INSERT OR REPLACE INTO vectors(namespace, id, row, meta_json) VALUES (?, ?, ?, ?)",
+                [
+                    (namespace, v["id"], row, json.dumps(v.get("metadata") or {}, ensure_ascii=False))
+                    for v, row in zip(vectors, assigned)
+                ],
+            )
+            con.commit()
+            self._states.pop(namespace, None)
+
+    def delete(self, *, ids: List[str], namespace: str, batch_size: int = 1000) -> None:
+        with self._lock, self._conn() as con:
+            con.executemany(
+                "DELETE FROM vectors WHERE namespace = ? AND id = ?", [(namespace, i) for i in ids]
+            )
+            con.commit()
+            self._states.pop(namespace, None)
+
+    def update_metadata(self, *, id: str, metadata: Dict[str, Any], namespace: str) -> None:
+        with self._lock, self._conn() as con:
+            hit = con.execute(
+                "SELECT meta_json FROM vectors WHERE namespace = ? AND id = ?", (namespace, id)
+            ).fetchone()
+            if hit is None:
+                return
+            meta = json.loads(hit[0] or "{}")
+            meta.update(metadata)
+            con.execute(
+                "UPDATE vectors SET meta_json = ? WHERE namespace = ? AND id = ?",
+                (json.dumps(meta, ensure_ascii=False), namespace, id),
+            )
+            con.commit()
+            self._states.pop(namespace, None)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+
+    def count(self, namespace: str) -> int:
+        with self._conn() as con:
+            return con.execute("SELECT COUNT(*) FROM vectors WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def _state(self, namespace: str) -> Optional[_Namespace]:
+        with self._lock:
+            state = self._states.get(namespace)
+            if state is not None:
+                return state
+            mat = self._matrix(namespace)
+            if mat is None:
+                return None
+            n = mat.shape[0]
+            ids: List[Optional[str]] = [None] * n
+            metas: List[Optional[Dict[str, Any]]] = [None] * n
+            alive = np.zeros(n, dtype=bool)
+            with self._conn() as con:
+                for vid, row, mj in con.execute(
+                    "SELECT id, row, meta_json FROM vectors WHERE namespace = ?", (namespace,)
+                ):
+                    ids[row], metas[row], alive[row] = vid, json.loads(mj or "{}"), True
+            state = _Namespace(ids=ids, metas=metas, alive=alive)
+            self._states[namespace] = state
+            return state
+
+    def _mask(self, state: _Namespace, flt: Dict[str, Any]) -> np.ndarray:
+        """Rows matching a Pinecone metadata filter (matches_filter semantics)."""
+        n = len(state.ids)
+        mask = np.ones(n, dtype=bool)
+        for key, cond in flt.items():
+            if key == "$and":
+                for c in cond:
+                    mask &= self._mask(state, c)
+            elif key == "$or":
+                any_ = np.zeros(n, dtype=bool)
+                for c in cond:
+                    any_ |= self._mask(state, c)
+                mask &= any_
+            else:
+                mask &= self._field_mask(state, key, cond if isinstance(cond, dict) else {"$eq": cond})
+        return mask
+
+    def _field_mask(self, state: _Namespace, key: str, cond: Dict[str, Any]) -> np.ndarray:
+        n = len(state.ids)
+        if set(cond) & _RANGE_OPS:
+            # range operators are rare in our filters: evaluate per row
+            return np.fromiter(
+                (m is not None and matches_filter(m, {key: cond}) for m in state.metas), dtype=bool, count=n
+            )
+
+        bm = state.bitmap(key)
+        none = np.zeros(n, dtype=bool)
+
+        def any_of(values: List[Any]) -> np.ndarray:
+            out = np.zeros(n, dtype=bool)
+            for v in values:
+                out |= bm.get(v, none)
+            return out
+
+        mask = np.ones(n, dtype=bool)
+        for op, arg in cond.items():
+            if op == "$eq":
+                mask &= bm.get(arg, none)
+            elif op == "$in":
+                mask &= any_of(arg)
+            elif op == "$ne":
+                mask &= ~bm.get(arg, none)
+            elif op == "$nin":
+                mask &= ~any_of(arg)
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    def query(
+        self,
+        *,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        flt: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> Dict[str, Any]:
+        state = self._state(namespace)
+        if state is None or top_k <= 0:
+            return {"matches": [], "namespace": namespace}
+
+        q = np.asarray(vector, dtype=np.float32)
+        if self.metric == "cosine":
+            q = q / (np.linalg.norm(q) or 1.0)
+
+        mask = state.alive & self._mask(state, flt) if flt else state.alive
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return {"matches": [], "namespace": namespace}
+
+        scores = self._matrices[namespace][rows] @ q
+        k = min(top_k, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return {
+            "matches": [
+                {
+                    "id": state.ids[rows[i]],
+                    "score": float(scores[i]),
+                    "metadata": state.metas[rows[i]] if include_metadata else None,
+                }
+                for i in top
+            ],
+            "namespace": namespace,
+        }
@@ -0,0 +1,118 @@
+# index/manifest.py
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    source: str
+    version_hash: str
+    chunk_ids: List[str]
+    # NAMESPACE_PARTITION field values its chunks were written under (empty when unpartitioned)
+    partitions: Tuple[Tuple[Any, ...], ...] = ()
+
+
+class IndexManifest:
+    """
+    What is currently indexed, per namespace:
+      (namespace, source) -> version_hash + chunk_ids
+
+    Used by incremental builds to skip unchanged PDFs and to delete
+    stale vectors/docstore rows for removed or replaced documents.
+
+    target (MANIFEST_TARGET) names the backend + index the vectors went to;
+    rows are kept per (namespace, target), so a build against another index
+    starts empty instead of skipping documents that index has never seen.
+    """
+
+    def __init__(self, path: str, *, target: str = ""):
+        self.path = path
+        self.target = target
+        self._init_db()
+
+    def _key(self, namespace: str) -> str:
+        return f"{namespace}@{self.target}" if self.target else namespace
+
+    def _conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        with self._conn() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS index_manifest (
+                    namespace TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    version_hash TEXT NOT NULL,
+                    chunk_ids_json TEXT NOT NULL,
+                    indexed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, source)
+                )
+                """
+            )
+            cols = {row[1] for row in con.execute("PRAGMA table_info(index_manifest)")}
+            if "partitions_json" not in cols:
+                con.execute("ALTER TABLE index_manifest ADD COLUMN partitions_json TEXT")
+            con.commit()
+
+    def get_all(self, namespace: str) -> Dict[str, ManifestEntry]:
+        with self._conn() as con:
+            cur = con.execute(
+                "SELECT source, version_hash, chunk_ids_json, partitions_json FROM index_manifest WHERE namespace = ?",
+                (self._key(namespace),),
+            )
+            return {
+                src: ManifestEntry(
+                    source=src,
+                    version_hash=vh,
+                    chunk_ids=json.loads(ids),
+                    partitions=tuple(tuple(p) for p in json.loads(parts or "[]")),
+                )
+                for src, vh, ids, parts in cur.fetchall()
+            }
+
+    def put(
+        self,
+        namespace: str,
+        source: str,
+        version_hash: str,
+        chunk_ids: List[str],
+        partitions: Iterable[Sequence[Any]] = (),
+    ) -> None:
+        with self._conn() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO index_manifest"
+                "(namespace, source, version_hash, chunk_ids_json, partitions_json, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self._key(namespace),
+                    source,
+                    version_hash,
+                    json.dumps(chunk_ids),
+                    json.dumps([list(p) for p in partitions]),
+                    time.time(),
+                ),
+            )
+            con.commit()
+
+    def partitions(self, namespace: str) -> List[Tuple[Any, ...]]:
+        """Distinct partition values over all indexed documents of the namespace."""
+        with self._conn() as con:
+            rows = con.execute(
+                "SELECT partitions_json FROM index_manifest WHERE namespace = ?",
+                (self._key(namespace),),
+            ).fetchall()
+        return list(dict.fromkeys(tuple(p) for (parts,) in rows for p in json.loads(parts or "[]")))
+
+    def delete(self, namespace: str, source: str) -> None:
+        with self._conn() as con:
+            con.execute(
+                "DELETE FROM index_manifest WHERE namespace = ? AND source = ?",
+                (self._key(namespace), source),
+            )
+            con.commit()
@@ -0,0 +1,145 @@
+# index/memory_store.py
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _match_value(value: Any, cond: Any) -> bool:
+    if not isinstance(cond, dict):
+        cond = {"$eq": cond}
+
+    values = value if isinstance(value, list) else [value]
+    for op, arg in cond.items():
+        if op == "$eq":
+            ok = arg in values
+        elif op == "$ne":
+            ok = arg not in values
+        elif op == "$in":
+            ok = any(v in arg for v in values)
+        elif op == "$nin":
+            ok = not any(v in arg for v in values)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            if value is None or isinstance(value, list):
+                return False
+            ok = {
+                "$gt": value > arg,
+                "$gte": value >= arg,
+                "$lt": value < arg,
+                "$lte": value <= arg,
+            }[op]
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches_filter(meta: Dict[str, Any], flt: Optional[Dict[str, Any]]) -> bool:
+    """Pinecone metadata filter semantics ($and/$or + field operators)."""
+    if not flt:
+        return True
+    for key, cond in flt.items():
+        if key == "$and":
+            if not all(matches_filter(meta, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(meta, c) for c in cond):
+                return False
+        elif key not in meta:
+            if not (isinstance(cond, dict) and set(cond) <= {"$ne", "$nin"}):
+                return False
+        elif not _match_value(meta[key], cond):
+            return False
+    return True
+
+
+class InMemoryStore:
+    """
+    Offline stand-in for PineconeStore (same methods, vectors kept in process).
+
+    Used by benchmarks to measure the ingest pipeline without a Pinecone account.
+    latency_ms simulates the per-request round trip of upsert/delete/query.
+    """
+
+    def __init__(self, *, dimension: int, latency_ms: float = 0.0):
+        self.dimension = dimension
+        self.latency_s = max(0.0, latency_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Tuple[List[float], Dict[str, Any]]]] = {}
+        self.requests = 0
+
+    def _request(self) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        with self._lock:
+            self.requests += 1
+
+    def ensure_index(self) -> None:
+        return None
+
+    @property
+    def host(self) -> Optional[str]:
+        return None
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._data.get(namespace, {}))
+
+    def upsert(self, *, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        self._request()
+        for v in vectors:
+            if len(v["values"]) != self.dimension:
+                raise RuntimeError(f"Vector dim {len(v['values'])} != index dim {self.dimension}")
+        with self._lock:
+            ns = self._data.setdefault(namespace, {})
+            for v in vectors:
+                ns[v["id"]] = (list(v["values"]), dict(v.get("metadata") or {}))
+
+    def delete(self, *, ids: List[str], namespace: str, batch_size: int = 1000) -> None:
+        for i in range(0, len(ids), batch_size):
+            self._request()
+            with self._lock:
+                ns = self._data.get(namespace, {})
+                for vid in ids[i:i + batch_size]:
+                    ns.pop(vid, None)
+
+    def update_metadata(self, *, id: str, metadata: Dict[str, Any], namespace: str) -> None:
+        self._request()
+        with self._lock:
+            hit = self._data.get(namespace, {}).get(id)
+            if hit is not None:
+                hit[1].update(metadata)
+
+    def query(
+        self,
+        *,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        flt: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> Dict[str, Any]:
+        self._request()
+        qn = math.sqrt(sum(x * x for x in vector)) or 1.0
+        with self._lock:
+            items = list(self._data.get(namespace, {}).items())
+
+        scored = []
+        for vid, (vals, meta) in items:
+            if not matches_filter(meta, flt):
+                continue
+            vn = math.sqrt(sum(x * x for x in vals)) or 1.0
+            score = sum(a * b for a, b in zip(vector, vals)) / (qn * vn)
+            scored.append((score, vid, meta))
+        scored.sort(key=lambda t: t[0], reverse=True)
+
+        return {
+            "matches": [
+                {"id": vid, "score": score, "metadata": meta if include_metadata else None}
+                for score, vid, meta in scored[:top_k]
+            ],
+            "namespace": namespace,
+        }
@@ -1,6 +1,7 @@
 # index/metadata_infer.py
 from __future__ import annotations
 
+import hashlib
 import re
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -27,6 +28,13 @@ def _infer_series(name_lower: str, parts_lower: list[str]) -> str:
     return "f1"
 
 
+def file_version_hash(pdf_path: Path) -> str:
+    """Cheap per-file version: name + size + mtime (one stat, no read)."""
+    st = pdf_path.stat()
+    key = f"{pdf_path.name}|{st.st_size}|{int(st.st_mtime)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
 def infer_metadata(pdf_path: Path, dataset_name: str = "fia") -> Dict[str, Any]:
     """
     Infer doc-level metadata from filename + folder structure.
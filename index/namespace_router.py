@@ -0,0 +1,112 @@
+# index/namespace_router.py
+from __future__ import annotations
+
+from itertools import product
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from index.filters import doc_type_series, filter_scope
+
+# Metadata fields that pick a vector's namespace, per NAMESPACE_PARTITION layout
+PARTITION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "none": (),
+    "season": ("season",),
+    "season_series": ("season", "series"),
+}
+
+# Bumped after every build so retrievers in the same process reload their known
+# partitions right away (other processes pick new ones up within PARTITION_REFRESH_S)
+_epoch = 0
+
+
+def invalidate_partitions() -> None:
+    global _epoch
+    _epoch += 1
+
+
+def partitions_epoch() -> int:
+    return _epoch
+
+
+def partition_values(meta: Mapping[str, Any], layout: str) -> Tuple[Any, ...]:
+    """A chunk's values of the PARTITION_FIELDS of `layout` (the `known` tuples of route)."""
+    return tuple(meta.get(f) for f in PARTITION_FIELDS[layout])
+
+
+def partition_namespace(base: str, meta: Mapping[str, Any], layout: str) -> str:
+    """
+    Namespace a chunk is written to: <base>__<season>[_<series>] ("x" for a missing
+    value), or base itself with layout "none".
+    """
+    fields = PARTITION_FIELDS[layout]
+    if not fields:
+        return base
+    return base + "__" + "_".join("x" if meta.get(f) is None else str(meta.get(f)) for f in fields)
+
+
+def _filter_from_scope(scope: Mapping[str, List[Any]]) -> Dict[str, Any]:
+    clauses = [
+        {field: {"$eq": vals[0]} if len(vals) == 1 else {"$in": list(vals)}}
+        for field, vals in scope.items()
+    ]
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def route(
+    base: str,
+    flt: Dict[str, Any],
+    *,
+    layout: str,
+    known: Iterable[Sequence[Any]],
+) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    (namespaces to search, filter to send to each) for a Pinecone-style filter.
+
+    Partition fields the filter constrains are taken from the filter itself; the
+    others fan out over `known` partition values (one tuple per existing partition,
+    in PARTITION_FIELDS order). Their clauses are dropped from the filter, since the
+    namespace already implies them. build_filters scopes series through doc_type, so
+    an unconstrained series is narrowed to the known series of the doc_type clause
+    (which stays in the filter). A filter filter_scope cannot flatten ($or, ranges)
+    is sent unchanged to every known partition.
+    """
+    fields = PARTITION_FIELDS[layout]
+    if not fields:
+        return [base], flt
+
+    known = [tuple(k) for k in known]
+    scope = filter_scope(flt)
+    if scope is None:
+        return sorted({partition_namespace(base, dict(zip(fields, k)), layout) for k in known}), flt
+
+    choices: List[List[Any]] = []
+    for i, field in enumerate(fields):
+        if field in scope:
+            choices.append(list(scope[field]))
+            continue
+        values = list(dict.fromkeys(k[i] for k in known))
+        if field == "series" and "doc_type" in scope:
+            implied = {doc_type_series(d) for d in scope["doc_type"]}
+            if None not in implied:
+                values = [v for v in values if v in implied]
+        choices.append(values)
+
+    namespaces = [
+        partition_namespace(base, dict(zip(fields, combo)), layout) for combo in product(*choices)
+    ]
+    rest = {field: vals for field, vals in scope.items() if field not in fields}
+    return list(dict.fromkeys(namespaces)), _filter_from_scope(rest)
+
+
+def group_by_partition(
+    base: str,
+    metas: Mapping[str, Optional[Mapping[str, Any]]],
+    *,
+    layout: str,
+) -> Dict[str, List[str]]:
+    """{namespace: ids} for chunk ids with known metadata (writes / deletes at ingest)."""
+    out: Dict[str, List[str]] = {}
+    for cid, meta in metas.items():
+        out.setdefault(partition_namespace(base, meta or {}, layout), []).append(cid)
+    return out
@@ -0,0 +1,88 @@
+# index/page_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from typing import Dict, List, Optional
+
+from config import (
+    CLEAN_HEADERS_FOOTERS,
+    HF_MIN_PAGE_FRACTION,
+    HF_MIN_LINE_LEN,
+    HF_MAX_LINE_LEN,
+    HF_MAX_REMOVE_PER_PAGE,
+)
+
+# Bump when extraction/cleaning code changes in a way that alters output.
+CLEANER_VERSION = 1
+
+
+def cleaning_fingerprint(extractor: str) -> str:
+    """Everything (besides the PDF itself) that determines cleaned page text."""
+    parts = [
+        f"v={CLEANER_VERSION}",
+        f"extractor={extractor}",
+        f"clean={int(CLEAN_HEADERS_FOOTERS)}",
+        f"frac={HF_MIN_PAGE_FRACTION}",
+        f"min={HF_MIN_LINE_LEN}",
+        f"max={HF_MAX_LINE_LEN}",
+        f"cap={HF_MAX_REMOVE_PER_PAGE}",
+    ]
+    return "|".join(parts)
+
+
+class PageCache:
+    """
+    Cleaned page text per PDF, keyed by (file_version_hash, extractor, cleaning settings).
+
+    A warm cache lets load_pdf_pages skip pypdf parsing and header/footer
+    cleaning entirely; stale entries are simply never looked up again.
+    """
+
+    def __init__(self, path: str, *, extractor: str):
+        self.path = path
+        self.fingerprint = cleaning_fingerprint(extractor)
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        with self._conn() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS page_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    pages BLOB NOT NULL
+                )
+                """
+            )
+            con.commit()
+
+    def key(self, version_hash: str) -> str:
+        base = f"{version_hash}|{self.fingerprint}"
+        return hashlib.sha1(base.encode("utf-8")).hexdigest()
+
+    def get(self, version_hash: str) -> Optional[List[Dict]]:
+        with self._conn() as con:
+            row = con.execute(
+                "SELECT pages FROM page_cache WHERE cache_key = ?",
+                (self.key(version_hash),),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, version_hash: str, source: str, pages: List[Dict]) -> None:
+        blob = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"))
+        with self._conn() as con:
+            # one entry per source: replacing a PDF drops its old cached pages
+            con.execute("DELETE FROM page_cache WHERE source = ?", (source,))
+            con.execute(
+                "INSERT OR REPLACE INTO page_cache(cache_key, source, pages) VALUES (?, ?, ?)",
+                (self.key(version_hash), source, blob),
+            )
+            con.commit()
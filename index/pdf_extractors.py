@@ -0,0 +1,121 @@
+# index/pdf_extractors.py
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Type
+
+from config import PDF_EXTRACTOR
+
+
+class PdfExtractor:
+    """
+    Raw page-text backend. Implementations return one string per page with
+    line breaks preserved; line normalization and header/footer cleaning stay
+    in pdf_loader and are backend-agnostic.
+    """
+
+    name = "base"
+
+    def page_count(self, pdf_path: str) -> int:
+        raise NotImplementedError
+
+    def extract_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Raw text of pages [start, end); end=None reads to the last page (one open of the file)."""
+        raise NotImplementedError
+
+
+class PypdfExtractor(PdfExtractor):
+    """Pure Python (default, always available)."""
+
+    name = "pypdf"
+
+    def page_count(self, pdf_path: str) -> int:
+        from pypdf import PdfReader
+
+        return len(PdfReader(pdf_path).pages)
+
+    def extract_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+        from pypdf import PdfReader
+
+        reader = PdfReader(pdf_path)
+        end = len(reader.pages) if end is None else end
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class PyMuPdfExtractor(PdfExtractor):
+    """MuPDF (C) via `pip install pymupdf`; much faster on large, table-heavy documents."""
+
+    name = "pymupdf"
+
+    def page_count(self, pdf_path: str) -> int:
+        import pymupdf
+
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+
+    def extract_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+        import pymupdf
+
+        with pymupdf.open(pdf_path) as doc:
+            end = doc.page_count if end is None else end
+            return [doc[i].get_text("text") or "" for i in range(start, end)]
+
+
+class PdfiumExtractor(PdfExtractor):
+    """PDFium (C++) via `pip install pypdfium2`."""
+
+    name = "pdfium"
+
+    def page_count(self, pdf_path: str) -> int:
+        import pypdfium2 as pdfium
+
+        doc = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def extract_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+        import pypdfium2 as pdfium
+
+        doc = pdfium.PdfDocument(pdf_path)
+        try:
+            out: List[str] = []
+            for i in range(start, len(doc) if end is None else end):
+                page = doc[i]
+                textpage = page.get_textpage()
+                out.append(textpage.get_text_range() or "")
+                textpage.close()
+                page.close()
+            return out
+        finally:
+            doc.close()
+
+
+EXTRACTORS: Dict[str, Type[PdfExtractor]] = {
+    cls.name: cls for cls in (PypdfExtractor, PyMuPdfExtractor, PdfiumExtractor)
+}
+
+_instances: Dict[str, PdfExtractor] = {}
+
+
+def get_extractor(name: Optional[str] = None) -> PdfExtractor:
+    """Extractor by name (default: PDF_EXTRACTOR)."""
+    name = (name or PDF_EXTRACTOR).lower()
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF_EXTRACTOR={name}. Use one of: {', '.join(EXTRACTORS)}.")
+    if name not in _instances:
+        _instances[name] = EXTRACTORS[name]()
+    return _instances[name]
+
+
+def available_extractors() -> List[str]:
+    """Backends whose library is importable in this environment."""
+    out: List[str] = []
+    modules = {"pypdf": "pypdf", "pymupdf": "pymupdf", "pdfium": "pypdfium2"}
+    for name in EXTRACTORS:
+        try:
+            __import__(modules[name])
+        except ImportError:
+            continue
+        out.append(name)
+    return out
@@ -1,12 +1,13 @@
 # index/pdf_loader.py
 from __future__ import annotations
 
+import os
+import time
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 import re
-from collections import Counter
-
-from pypdf import PdfReader
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 
 from config import (
     CLEAN_HEADERS_FOOTERS,
@@ -14,7 +15,16 @@ from config import (
     HF_MIN_LINE_LEN,
     HF_MAX_LINE_LEN,
     HF_MAX_REMOVE_PER_PAGE,
+    PDF_EXTRACT_WORKERS,
+    PDF_PAGES_PER_TASK,
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_PATH,
+    PDF_EXTRACTOR,
 )
+from index.ingest_pipeline import StageTimings
+from index.metadata_infer import file_version_hash
+from index.page_cache import PageCache
+from index.pdf_extractors import get_extractor
 
 # Common footer/header patterns (helpful for FIA-style docs)
 _RE_PAGE_X_OF_Y = re.compile(r"\bpage\s*\d+\s*(of|/)\s*\d+\b", re.IGNORECASE)
@@ -116,44 +126,211 @@ def _remove_boilerplate_from_lines(lines: List[str], repeated: set[str]) -> Tupl
     return cleaned, removed
 
 
-def load_pdf_pages(pdf_dir: str) -> List[Dict]:
+def _extract_page_range(pdf_path: str, start: int, end: Optional[int], extractor: str) -> List[List[str]]:
     """
-    Returns list of dicts: {"text": str, "source": filename, "page": int}
+    Pass 1 for pages [start, end) of one PDF (end=None: to the last page): extract + normalize lines.
+    Top-level so it can run inside a process pool worker.
+    """
+    texts = get_extractor(extractor).extract_pages(pdf_path, start, end)
+    return [_extract_lines(txt) for txt in texts]
 
-    If CLEAN_HEADERS_FOOTERS is enabled:
-      - detects repeated header/footer lines per PDF and removes them.
+
+def _extract_page_range_timed(
+    pdf_path: str, start: int, end: int, extractor: str
+) -> Tuple[float, List[List[str]]]:
+    """_extract_page_range + its busy time (measured inside the worker process)."""
+    t0 = time.perf_counter()
+    lines = _extract_page_range(pdf_path, start, end, extractor)
+    return time.perf_counter() - t0, lines
+
+
+def _page_count(pdf_path: str, extractor: str) -> int:
+    return get_extractor(extractor).page_count(pdf_path)
+
+
+def _clean_document(source: str, pages_lines: List[List[str]]) -> List[Dict]:
+    """
+    Pass 2 for one PDF: header/footer detection over ALL its pages, then cleaning.
+    Must see the whole document so _find_repeated_lines keeps per-document semantics.
     """
-    pdf_dir_path = Path(pdf_dir)
+    repeated: set[str] = set()
+    if CLEAN_HEADERS_FOOTERS:
+        repeated = _find_repeated_lines(pages_lines, min_fraction=HF_MIN_PAGE_FRACTION)
+
     out_pages: List[Dict] = []
+    for i, lines in enumerate(pages_lines):
+        if CLEAN_HEADERS_FOOTERS:
+            cleaned_text, _removed = _remove_boilerplate_from_lines(lines, repeated)
+        else:
+            cleaned_text = re.sub(r"\s+", " ", " ".join(lines)).strip()
+
+        if cleaned_text:
+            out_pages.append(
+                {
+                    "text": cleaned_text,
+                    "source": source,
+                    "page": i + 1,  # 1-indexed
+                }
+            )
+    return out_pages
 
-    for pdf_path in sorted(pdf_dir_path.glob("*.pdf")):
-        reader = PdfReader(str(pdf_path))
 
-        # Pass 1: extract per-page lines
-        pages_lines: List[List[str]] = []
-        for page in reader.pages:
-            txt = page.extract_text() or ""
-            lines = _extract_lines(txt)
-            pages_lines.append(lines)
+def _resolve_workers(workers: Optional[int]) -> int:
+    n = PDF_EXTRACT_WORKERS if workers is None else workers
+    if n < 0:
+        n = os.cpu_count() or 1
+    return max(1, n)
 
-        repeated: set[str] = set()
-        if CLEAN_HEADERS_FOOTERS:
-            repeated = _find_repeated_lines(pages_lines, min_fraction=HF_MIN_PAGE_FRACTION)
-
-        # Pass 2: build final cleaned page records
-        for i, lines in enumerate(pages_lines):
-            if CLEAN_HEADERS_FOOTERS:
-                cleaned_text, _removed = _remove_boilerplate_from_lines(lines, repeated)
-            else:
-                cleaned_text = re.sub(r"\s+", " ", " ".join(lines)).strip()
-
-            if cleaned_text:
-                out_pages.append(
-                    {
-                        "text": cleaned_text,
-                        "source": pdf_path.name,
-                        "page": i + 1,  # 1-indexed
-                    }
-                )
 
-    return out_pages
+def list_pdfs(pdf_dir: str) -> List[Path]:
+    """Deterministic processing order (sorted by filename)."""
+    return sorted(Path(pdf_dir).glob("*.pdf"))
+
+
+# Document iterators yield (pdf_path, pages_lines, extract_seconds)
+_Extracted = Tuple[Path, List[List[str]], float]
+
+
+def _iter_documents_serial(
+    pdf_paths: List[Path],
+    extractor: str,
+) -> Iterator[_Extracted]:
+    for pdf_path in pdf_paths:
+        t0 = time.perf_counter()
+        pages_lines = _extract_page_range(str(pdf_path), 0, None, extractor)
+        yield pdf_path, pages_lines, time.perf_counter() - t0
+
+
+def _iter_documents_parallel(
+    pdf_paths: List[Path],
+    workers: int,
+    extractor: str,
+) -> Iterator[_Extracted]:
+    """
+    Fan PDFs (and page ranges of large PDFs) out across a process pool.
+
+    Documents are yielded in input order; at most ~2x workers documents are
+    in flight so memory stays bounded on large corpora.
+    """
+    step = max(1, PDF_PAGES_PER_TASK)
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Tuple[Path, List[Future], float]] = deque()
+        it = iter(pdf_paths)
+
+        def submit_next() -> bool:
+            pdf_path = next(it, None)
+            if pdf_path is None:
+                return False
+            path_s = str(pdf_path)
+            t0 = time.perf_counter()
+            n = _page_count(path_s, extractor)
+            count_s = time.perf_counter() - t0
+            futs = [
+                pool.submit(_extract_page_range_timed, path_s, start, min(start + step, n), extractor)
+                for start in range(0, n, step)
+            ]
+            pending.append((pdf_path, futs, count_s))
+            return True
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+
+        while pending:
+            pdf_path, futs, busy_s = pending.popleft()
+            pages_lines: List[List[str]] = []
+            for f in futs:
+                secs, lines = f.result()
+                busy_s += secs
+                pages_lines.extend(lines)
+            submit_next()
+            yield pdf_path, pages_lines, busy_s
+
+
+def iter_pdf_pages(
+    pdf_dir: str,
+    *,
+    pdf_paths: Optional[List[Path]] = None,
+    workers: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+    extractor: Optional[str] = None,
+    timings: Optional[StageTimings] = None,
+) -> Iterator[Dict]:
+    """
+    Streaming variant of load_pdf_pages: yields page dicts document by document,
+    in the same deterministic order.
+
+    workers: overrides PDF_EXTRACT_WORKERS (<=1 means serial).
+    pdf_paths: optional explicit subset of PDFs (defaults to every *.pdf in pdf_dir).
+    use_cache: overrides PAGE_CACHE_ENABLED; cached documents skip PDF parsing entirely.
+    extractor: overrides PDF_EXTRACTOR (see index/pdf_extractors.py).
+    timings: optional StageTimings; records "page_cache", "extract" (summed worker
+    time) and "clean".
+    """
+    paths = list_pdfs(pdf_dir) if pdf_paths is None else list(pdf_paths)
+    n_workers = _resolve_workers(workers)
+    extractor = get_extractor(extractor or PDF_EXTRACTOR).name  # fail fast on unknown names
+
+    if PAGE_CACHE_ENABLED if use_cache is None else use_cache:
+        cache: Optional[PageCache] = PageCache(PAGE_CACHE_PATH, extractor=extractor)
+    else:
+        cache = None
+
+    cached: Dict[str, List[Dict]] = {}
+    versions: Dict[str, str] = {}
+    if cache is not None:
+        t0 = time.perf_counter()
+        for p in paths:
+            versions[p.name] = file_version_hash(p)
+            hit = cache.get(versions[p.name])
+            if hit is not None:
+                cached[p.name] = hit
+        if timings is not None:
+            timings.add("page_cache", time.perf_counter() - t0, calls=len(paths))
+
+    misses = [p for p in paths if p.name not in cached]
+    if n_workers <= 1 or len(misses) == 0:
+        docs = _iter_documents_serial(misses, extractor)
+    else:
+        docs = _iter_documents_parallel(misses, n_workers, extractor)
+
+    # Walk in the original order; misses come out of `docs` in that same order
+    for pdf_path in paths:
+        hit = cached.pop(pdf_path.name, None)
+        if hit is not None:
+            for page in hit:
+                yield {"text": page["text"], "source": pdf_path.name, "page": page["page"]}
+            continue
+
+        _, pages_lines, extract_s = next(docs)
+        t0 = time.perf_counter()
+        pages = _clean_document(pdf_path.name, pages_lines)
+        if cache is not None:
+            cache.put(
+                versions[pdf_path.name],
+                pdf_path.name,
+                [{"text": pg["text"], "page": pg["page"]} for pg in pages],
+            )
+        if timings is not None:
+            timings.add("extract", extract_s)
+            timings.add("clean", time.perf_counter() - t0)
+        yield from pages
+
+
+def load_pdf_pages(
+    pdf_dir: str,
+    *,
+    workers: Optional[int] = None,
+    extractor: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Returns list of dicts: {"text": str, "source": filename, "page": int}
+
+    If CLEAN_HEADERS_FOOTERS is enabled:
+      - detects repeated header/footer lines per PDF and removes them.
+
+    With PDF_EXTRACT_WORKERS > 1 (or workers=...), extraction runs in a process pool;
+    output order is identical to the serial path.
+    """
+    return list(iter_pdf_pages(pdf_dir, workers=workers, extractor=extractor))
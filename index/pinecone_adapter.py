@@ -1,18 +1,29 @@
 # index/pinecone_adapter.py
 from __future__ import annotations
 
-import hashlib
 import json
+import math
+import threading
 import time
-from typing import Any, Dict, List
-
-from retriever_interface import Retriever, Chunk
-from embeddings.embedder import embed_query
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from retriever_interface import Retriever, Chunk, RetrievalRequest
+from embeddings.embedder import embed_query, embed_texts, shorten
+from embeddings.embedding_store import EmbeddingStore
 from index.pinecone_store import PineconeStore
 from index.docstore_sqlite import SQLiteDocStore
+from index.article_index import ArticleIndex
+from index.article_diffs import ArticleDiffIndex, render_diff
+from index.filters import filter_scope, season_filter_to_tags
+from index.manifest import IndexManifest
+from index.namespace_router import partitions_epoch, route
 
 from cache.client import get_redis
 from cache.keys import embedding_key, retrieval_key
+from cache.codec import decode_matches, decode_vector, encode_matches, encode_vector, vector_digest
 
 from config import (
     CACHE_ENABLED,
@@ -21,15 +32,31 @@ from config import (
     EMBEDDING_MODEL,
     PINECONE_NAMESPACE,
     DOCSTORE_PATH,
+    ARTICLE_INDEX_ENABLED,
+    ARTICLE_INDEX_PATH,
+    DEDUP_ENABLED,
+    ARTICLE_DIFF_ENABLED,
+    ARTICLE_DIFF_PATH,
+    EMBED_DIM,
+    INDEX_DIM,
+    EMBED_STORE_PATH,
+    RESCORE_OVERSAMPLE,
+    RETRIEVE_CONCURRENCY,
+    RETRIEVAL_MODE,
+    RRF_K,
+    HYBRID_VECTOR_TIMEOUT_S,
+    NAMESPACE_PARTITION,
+    PARTITION_REFRESH_S,
+    MANIFEST_PATH,
+    MANIFEST_TARGET,
 )
 
+# Filter fields the article index can evaluate locally
+_ARTICLE_SCOPE_FIELDS = {"tenant", "doc_type", "season", "regulation_type", "article_refs"}
 
-def _hash_embedding(vec: List[float]) -> str:
-    """
-    Compact stable representation for cache key usage.
-    """
-    b = ",".join(f"{v:.6f}" for v in vec).encode("utf-8")
-    return hashlib.sha1(b).hexdigest()
+# Match metadata kept in the retrieval cache: chunk metadata comes from the docstore,
+# only dedup membership tags live solely on the vector
+_CACHED_META_FIELDS = ("season_tags", "issue_tags") if DEDUP_ENABLED else ()
 
 
 def _to_jsonable(obj: Any) -> Any:
@@ -72,92 +99,302 @@ def _to_jsonable(obj: Any) -> Any:
         return str(obj)
 
 
+def _rrf(lists: Sequence[List[Chunk]], k: int = RRF_K) -> List[Chunk]:
+    """Reciprocal-rank fusion: score = sum of 1 / (k + rank) over the lists a chunk is in."""
+    fused: Dict[str, float] = {}
+    first: Dict[str, Chunk] = {}
+    for chunks in lists:
+        for rank, c in enumerate(chunks, start=1):
+            fused[c.id] = fused.get(c.id, 0.0) + 1.0 / (k + rank)
+            first.setdefault(c.id, c)
+    # stable sort: ties keep the order of the first list
+    order = sorted(fused, key=lambda cid: fused[cid], reverse=True)
+    return [replace(first[cid], score=fused[cid]) for cid in order]
+
+
 class PineconeRetriever(Retriever):
     """
     Retriever adapter that:
       - embeds query (optional Redis cache)
       - queries Pinecone (optional Redis cache)
+      - (FIRST_STAGE_DIM) recalls with shortened vectors, rescores with full ones
+      - (NAMESPACE_PARTITION) searches only the season (x series) namespaces a filter
+        selects, concurrently, and merges them by score
       - hydrates text from SQLite DocStore
+      - (RETRIEVAL_MODE) BM25 over the docstore: fused with the vector results
+        (hybrid) or on its own (lexical); hybrid falls back to BM25 alone when
+        the vector side fails or exceeds HYBRID_VECTOR_TIMEOUT_S
+      - (dedup namespace) maps each vector back to the season/issue copy the filter asked for
+      - answers explicit-article lookups from the local ArticleIndex (no embedding / Pinecone)
+      - serves precomputed season-to-season article diffs for compare queries
       - exposes per-call cache metrics via self.last_debug
     """
 
-    def __init__(self, *, pinecone_store: PineconeStore):
+    def __init__(self, *, pinecone_store: PineconeStore, mode: str = RETRIEVAL_MODE):
         self.store = pinecone_store
-        self.docstore = SQLiteDocStore(DOCSTORE_PATH)
+        if mode not in ("vector", "hybrid", "lexical"):
+            raise ValueError(f"Unknown retrieval mode {mode!r} (expected vector, hybrid or lexical)")
+        self.mode = mode  # RETRIEVAL_MODE unless overridden (scripts/eval_retrieval_modes.py)
+        self.docstore = SQLiteDocStore(DOCSTORE_PATH, lexical_index=mode != "vector")
 
         self.cache_enabled = CACHE_ENABLED
         self.cache_embeddings = CACHE_EMBEDDINGS
         self.cache_retrieval = CACHE_RETRIEVAL
 
         self.redis = get_redis() if self.cache_enabled else None
+        self.article_index = ArticleIndex(ARTICLE_INDEX_PATH) if ARTICLE_INDEX_ENABLED else None
+        self.diff_index = (
+            ArticleDiffIndex(ARTICLE_DIFF_PATH) if ARTICLE_DIFF_ENABLED and ARTICLE_INDEX_ENABLED else None
+        )
+        # two-stage retrieval: full-dimension vectors of indexed chunks (keyed by text)
+        self.full_vectors = (
+            EmbeddingStore(EMBED_STORE_PATH, model=EMBEDDING_MODEL, dimension=EMBED_DIM)
+            if INDEX_DIM < EMBED_DIM
+            else None
+        )
+
+        # hybrid: the dense side runs here while BM25 runs on the caller's thread
+        self._dense_pool = (
+            ThreadPoolExecutor(max_workers=4, thread_name_prefix="dense") if mode == "hybrid" else None
+        )
+
+        # partition values present in the index (NAMESPACE_PARTITION), from the manifest
+        self.manifest = IndexManifest(MANIFEST_PATH, target=MANIFEST_TARGET) if NAMESPACE_PARTITION != "none" else None
+        self._partitions: Optional[List[Tuple[Any, ...]]] = None
+        self._partitions_read = (0.0, -1)  # (monotonic time, partitions_epoch) of the last read
+        self._partitions_lock = threading.Lock()
 
         # Last call metrics
-        self._last_embed_cache_hit = False
-        self._last_retrieval_cache_hit = False
         self.last_debug: Dict[str, Any] = {}
 
     # -------------------------
     # Internal helpers
     # -------------------------
 
-    def _embed_with_cache(self, query: str) -> List[float]:
-        self._last_embed_cache_hit = False
-
-        if not self.cache_enabled or not self.cache_embeddings:
-            return embed_query(query)
-
-        key = embedding_key(query, EMBEDDING_MODEL)
-        cached = self.redis.get(key)
-        if cached:
-            self._last_embed_cache_hit = True
-            return json.loads(cached)
-
-        vec = embed_query(query)
-        self.redis.set(key, json.dumps(vec).encode("utf-8"), ex=7 * 24 * 3600)
-        return vec
-
-    def _retrieve_with_cache(
+    def _embed_many_with_cache(self, queries: List[str]) -> Tuple[List[List[float]], int]:
+        """
+        Query vectors (input order) + number of embedding-cache hits.
+        One MGET for the cache, one embeddings request for all misses.
+        """
+        unique = list(dict.fromkeys(queries))
+        use_cache = self.cache_enabled and self.cache_embeddings
+        vecs: Dict[str, List[float]] = {}
+
+        if use_cache:
+            keys = [embedding_key(q, EMBEDDING_MODEL) for q in unique]
+            for q, blob in zip(unique, self.redis.mget(keys)):
+                vec = decode_vector(blob)
+                if vec is not None:
+                    vecs[q] = vec
+        hits = len(vecs)
+
+        misses = [q for q in unique if q not in vecs]
+        if misses:
+            # a lone miss goes through embed_query (micro-batched with other callers)
+            new = [embed_query(misses[0])] if len(misses) == 1 else embed_texts(misses)
+            if use_cache:
+                pipe = self.redis.pipeline(transaction=False)
+                for q, vec in zip(misses, new):
+                    blob = encode_vector(vec)
+                    pipe.set(embedding_key(q, EMBEDDING_MODEL), blob, ex=7 * 24 * 3600)
+                    # return the cached precision, so a miss and later hits share one retrieval cache key
+                    vecs[q] = decode_vector(blob)
+                pipe.execute()
+            else:
+                vecs.update(zip(misses, new))
+
+        return [vecs[q] for q in queries], hits
+
+    def _route(self, filters: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
+        """(namespaces, filter per namespace) for a request's filter."""
+        if NAMESPACE_PARTITION == "none":
+            return [PINECONE_NAMESPACE], filters
+        return route(PINECONE_NAMESPACE, filters, layout=NAMESPACE_PARTITION, known=self._known_partitions())
+
+    def _known_partitions(self) -> List[Tuple[Any, ...]]:
+        """
+        Partitions of PINECONE_NAMESPACE in this index, as recorded by builds; re-read
+        every PARTITION_REFRESH_S and after a build in this process, so long-running
+        workers also search seasons / series ingested after they started.
+        """
+        with self._partitions_lock:
+            read_at, epoch = self._partitions_read
+            now = time.monotonic()
+            if self._partitions is None or epoch != partitions_epoch() or now - read_at >= PARTITION_REFRESH_S:
+                self._partitions_read = (now, partitions_epoch())
+                self._partitions = self.manifest.partitions(PINECONE_NAMESPACE)
+            return self._partitions
+
+    def _retrieve_many_with_cache(
+        self,
+        searches: List[Tuple[List[float], int, Dict[str, Any]]],
+    ) -> Tuple[List[List[Dict[str, Any]]], int, int]:
+        """
+        Query matches as plain dicts ({id, score, metadata}) per (embedding, top_k, filters)
+        + number of retrieval-cache hits + namespaces queried. One MGET for the cache;
+        misses are queried concurrently, one query per routed namespace.
+        """
+        use_cache = self.cache_enabled and self.cache_retrieval
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(searches)
+
+        keys: List[str] = []
+        if use_cache:
+            keys = [
+                retrieval_key(
+                    embedding=vector_digest(emb),
+                    namespace=PINECONE_NAMESPACE
+                    if NAMESPACE_PARTITION == "none"
+                    else f"{PINECONE_NAMESPACE}|{NAMESPACE_PARTITION}",
+                    filters=flt,
+                    recall_k=k,
+                )
+                for emb, k, flt in searches
+            ]
+            for i, blob in enumerate(self.redis.mget(keys)):
+                results[i] = decode_matches(blob)
+        hits = sum(r is not None for r in results)
+
+        todo = [i for i, r in enumerate(results) if r is None]
+        jobs: List[Tuple[int, str, Dict[str, Any]]] = []
+        for i in todo:
+            namespaces, flt = self._route(searches[i][2])
+            jobs.extend((i, ns, flt) for ns in namespaces)
+
+        def run(job: Tuple[int, str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+            i, ns, flt = job
+            return self._query_matches(searches[i][0], searches[i][1], flt, namespace=ns)
+
+        found: List[List[Dict[str, Any]]] = []
+        if len(jobs) == 1:
+            found = [run(jobs[0])]
+        elif jobs:
+            with ThreadPoolExecutor(max_workers=min(len(jobs), RETRIEVE_CONCURRENCY)) as pool:
+                found = list(pool.map(run, jobs))
+        for i in todo:
+            results[i] = []
+        for (i, _, _), matches in zip(jobs, found):
+            results[i].extend(matches)
+        for i, n in Counter(i for i, _, _ in jobs).items():
+            if n > 1:
+                # same index + metric in every namespace: scores are comparable
+                results[i].sort(key=lambda m: float(m.get("score", 0.0) or 0.0), reverse=True)
+                del results[i][searches[i][1]:]
+
+        if use_cache and todo:
+            pipe = self.redis.pipeline(transaction=False)
+            for i in todo:
+                pipe.set(keys[i], encode_matches(results[i], meta_fields=_CACHED_META_FIELDS), ex=30 * 60)
+            pipe.execute()
+
+        return results, hits, len(jobs)
+
+    def _query_matches(
         self,
-        *,
         embedding: List[float],
         recall_k: int,
         filters: Dict[str, Any],
-    ) -> Dict[str, Any]:
-        self._last_retrieval_cache_hit = False
-
-        if not self.cache_enabled or not self.cache_retrieval:
-            # Convert to dict for downstream consistency
-            res = self.store.query(
+        *,
+        namespace: str = PINECONE_NAMESPACE,
+    ) -> List[Dict[str, Any]]:
+        res = _to_jsonable(
+            self.store.query(
                 vector=embedding,
                 top_k=recall_k,
-                namespace=PINECONE_NAMESPACE,
+                namespace=namespace,
                 flt=filters,
             )
-            return _to_jsonable(res)
-
-        emb_hash = _hash_embedding(embedding)
-        key = retrieval_key(
-            embedding=emb_hash,          # if your retrieval_key expects list, swap to `embedding=embedding`
-            namespace=PINECONE_NAMESPACE,
-            filters=filters,
-            recall_k=recall_k,
-        )
-
-        cached = self.redis.get(key)
-        if cached:
-            self._last_retrieval_cache_hit = True
-            return json.loads(cached)
-
-        res = self.store.query(
-            vector=embedding,
-            top_k=recall_k,
-            namespace=PINECONE_NAMESPACE,
-            flt=filters,
         )
+        matches = res.get("matches", []) if isinstance(res, dict) else []
+        return [m for m in matches if isinstance(m, dict) and m.get("id")]
 
-        res_json = _to_jsonable(res)
-        self.redis.set(key, json.dumps(res_json).encode("utf-8"), ex=30 * 60)
-        return res_json
+    def _rescore(
+        self,
+        match_lists: List[List[Dict[str, Any]]],
+        query_vecs: List[List[float]],
+    ) -> Tuple[List[List[Dict[str, Any]]], Dict[str, Tuple[str, dict]]]:
+        """
+        Second stage: cosine between the full query vector and each candidate's full
+        vector (embedding store). Candidates without a stored vector keep their
+        first-stage score.
+
+        Also returns the docstore rows it read ({chunk_id: (text, meta)}), for _hydrate.
+        """
+        docs = self.docstore.get_many_with_meta(list({m["id"] for ms in match_lists for m in ms}))
+        keys = {cid: self.full_vectors.key(text) for cid, (text, _meta) in docs.items()}
+        full = self.full_vectors.get_many(list(set(keys.values())))
+
+        out_lists: List[List[Dict[str, Any]]] = []
+        for matches, query_vec in zip(match_lists, query_vecs):
+            qn = math.sqrt(sum(x * x for x in query_vec)) or 1.0
+            out: List[Dict[str, Any]] = []
+            for m in matches:
+                vec = full.get(keys.get(m["id"], ""))
+                if vec is None:
+                    out.append(m)
+                    continue
+                vn = math.sqrt(sum(x * x for x in vec)) or 1.0
+                out.append({**m, "score": sum(a * b for a, b in zip(query_vec, vec)) / (qn * vn)})
+            out.sort(key=lambda m: float(m.get("score", 0.0) or 0.0), reverse=True)
+            out_lists.append(out)
+        return out_lists, docs
+
+    def _hydrate(
+        self,
+        match_lists: List[List[Dict[str, Any]]],
+        filter_list: List[Dict[str, Any]],
+        docs: Optional[Dict[str, Tuple[str, dict]]] = None,
+    ) -> List[List[Chunk]]:
+        """
+        Text + metadata from the docstore (same metadata that was upserted, so cached
+        match lists only need ids + scores), one lookup for all lists. `docs` are rows
+        already read (rescoring); only the other ids are looked up.
+
+        Dedup namespace: one vector stands for identical / near-identical chunks of
+        several seasons and issues. Each match becomes the copy its request's season
+        filter asks for (newest when unconstrained), with its own text, source and page.
+        """
+        pick: List[Dict[str, str]] = [{m["id"]: m["id"] for m in ms} for ms in match_lists]
+        if DEDUP_ENABLED:
+            members = self.docstore.get_members(list({m["id"] for ms in match_lists for m in ms}))
+            for picks, filters in zip(pick, filter_list):
+                seasons = (filter_scope(filters) or {}).get("season")
+                for cid in picks:
+                    rows = members.get(cid)
+                    if rows:
+                        picks[cid] = next((r for r in rows if seasons is None or r[1] in seasons), rows[0])[0]
+
+        docs = dict(docs or {})
+        missing = {mid for picks in pick for mid in picks.values()} - docs.keys()
+        if missing:
+            docs.update(self.docstore.get_many_with_meta(list(missing)))
+
+        out: List[List[Chunk]] = []
+        for matches, picks in zip(match_lists, pick):
+            chunks: List[Chunk] = []
+            for m in matches:
+                member_id = picks[m["id"]]
+                if member_id not in docs:
+                    continue
+                text, meta = docs[member_id]
+                if not text:
+                    continue
+                meta = dict(meta)
+                if DEDUP_ENABLED:
+                    vec_meta = m.get("metadata", {}) or {}
+                    # membership tags are only complete on the vector
+                    for key in ("season_tags", "issue_tags"):
+                        if key in vec_meta:
+                            meta[key] = vec_meta[key]
+                chunks.append(
+                    Chunk(
+                        id=member_id,
+                        text=text,
+                        metadata=meta,
+                        score=float(m.get("score", 0.0) or 0.0),
+                    )
+                )
+            out.append(chunks)
+        return out
 
     # -------------------------
     # Public API
@@ -170,43 +407,233 @@ class PineconeRetriever(Retriever):
         recall_k: int,
         filters: Dict[str, Any],
     ) -> List[Chunk]:
+        return self.retrieve_many([RetrievalRequest(query=query, filters=filters, recall_k=recall_k)])[0]
+
+    def retrieve_many(self, requests: Sequence[RetrievalRequest]) -> List[List[Chunk]]:
+        """
+        Several retrievals, one round trip per layer: one embedding-cache MGET + one
+        embeddings request for the misses, one retrieval-cache MGET + concurrent
+        vector queries for the misses, one docstore hydration.
+        """
+        if not requests:
+            return []
         t0 = time.time()
 
-        embedding = self._embed_with_cache(query)
-        res = self._retrieve_with_cache(
-            embedding=embedding,
-            recall_k=recall_k,
-            filters=filters,
-        )
+        if self.mode == "vector":
+            results, debug = self._dense_many(requests)
+        elif self.mode == "lexical":
+            results = self._lexical_many(requests)
+            debug = {"mode": "lexical", "embed_cache_hit": False, "retrieval_cache_hit": False}
+        else:
+            dense_future = self._dense_pool.submit(self._dense_many, requests)
+            lexical = self._lexical_many(requests)
+            try:
+                dense, debug = dense_future.result(timeout=HYBRID_VECTOR_TIMEOUT_S or None)
+            except Exception as e:
+                # vector side down / too slow: answer from BM25 alone
+                dense = [[] for _ in requests]
+                debug = {"embed_cache_hit": False, "retrieval_cache_hit": False, "vector_fallback": repr(e)}
+            results = [_rrf([d, lx])[:r.recall_k] for d, lx, r in zip(dense, lexical, requests)]
+            debug.update(mode="hybrid", lexical_returned=sum(len(lx) for lx in lexical))
+
+        debug["retrieval_ms"] = (time.time() - t0) * 1000.0
+        debug["returned"] = sum(len(c) for c in results)
+        self.last_debug = debug
+        return results
+
+    def _lexical_many(self, requests: Sequence[RetrievalRequest]) -> List[List[Chunk]]:
+        """BM25 hits per request (docstore FTS5), hydrated with one docstore read."""
+        hits = [
+            self.docstore.search_lexical(r.query, limit=r.recall_k, filters=r.filters, collapse_members=DEDUP_ENABLED)
+            for r in requests
+        ]
+        docs = self.docstore.get_many_with_meta(list({cid for h in hits for cid, _ in h}))
+        return [
+            [
+                Chunk(id=cid, text=docs[cid][0], metadata=docs[cid][1], score=score)
+                for cid, score in h
+                if cid in docs and docs[cid][0]
+            ]
+            for h in hits
+        ]
+
+    def _dense_many(self, requests: Sequence[RetrievalRequest]) -> Tuple[List[List[Chunk]], Dict[str, Any]]:
+        """Embedding + vector search + hydration for every request; (results, debug)."""
+        t0 = time.time()
 
-        matches = res.get("matches", []) if isinstance(res, dict) else []
-        chunk_ids = [m.get("id") for m in matches if isinstance(m, dict) and m.get("id")]
+        embeddings, embed_hits = self._embed_many_with_cache([r.query for r in requests])
+        t_embed = time.time()
+
+        two_stage = self.full_vectors is not None
+        docs: Optional[Dict[str, Tuple[str, dict]]] = None
+        searches = [
+            (
+                shorten(emb, INDEX_DIM) if two_stage else emb,
+                math.ceil(r.recall_k * RESCORE_OVERSAMPLE) if two_stage else r.recall_k,
+                season_filter_to_tags(r.filters) if DEDUP_ENABLED else r.filters,
+            )
+            for r, emb in zip(requests, embeddings)
+        ]
+        match_lists, retrieval_hits, n_namespaces = self._retrieve_many_with_cache(searches)
+        if two_stage:
+            rescored, docs = self._rescore(match_lists, embeddings)
+            match_lists = [ms[:r.recall_k] for ms, r in zip(rescored, requests)]
+
+        results = self._hydrate(match_lists, [r.filters for r in requests], docs)
+
+        n_queries = len(set(r.query for r in requests))
+        debug: Dict[str, Any] = {
+            "embed_cache_hit": embed_hits == n_queries,
+            "retrieval_cache_hit": retrieval_hits == len(requests),
+            "embed_ms": (t_embed - t0) * 1000.0,
+        }
+        if NAMESPACE_PARTITION != "none":
+            debug["namespaces_queried"] = n_namespaces
+        if len(requests) > 1:
+            debug.update(
+                requests=len(requests),
+                embed_cache_hits=embed_hits,
+                retrieval_cache_hits=retrieval_hits,
+            )
+        return results, debug
+
+    def retrieve_article(
+        self,
+        article: str,
+        *,
+        limit: int,
+        filters: Dict[str, Any],
+    ) -> List[Chunk]:
+        if self.article_index is None:
+            return []
 
-        texts = self.docstore.get_many(chunk_ids)
+        scope = filter_scope(filters)
+        if scope is None or set(scope) - _ARTICLE_SCOPE_FIELDS:
+            return []  # filter we cannot evaluate locally -> vector search
+        if any(not vals for vals in scope.values()):
+            return []
+
+        t0 = time.time()
+        ids = self.article_index.lookup(
+            PINECONE_NAMESPACE,
+            article,
+            limit=limit,
+            tenants=scope.get("tenant"),
+            seasons=scope.get("season"),
+            doc_types=scope.get("doc_type"),
+            regulation_types=scope.get("regulation_type"),
+        )
+        rows = self.docstore.get_many_with_meta(ids)
 
         chunks: List[Chunk] = []
-        for m in matches:
-            cid = m.get("id")
-            if not cid:
-                continue
-            text = texts.get(cid)
-            if not text:
+        for i, cid in enumerate(ids):
+            if cid not in rows:
                 continue
-
-            chunks.append(
-                Chunk(
-                    id=cid,
-                    text=text,
-                    metadata=m.get("metadata", {}) or {},
-                    score=float(m.get("score", 0.0) or 0.0),
-                )
-            )
+            text, meta = rows[cid]
+            # keep lookup order (section before mention, newest first) as the score
+            chunks.append(Chunk(id=cid, text=text, metadata=meta, score=1.0 - i / max(1, len(ids))))
 
         self.last_debug = {
-            "embed_cache_hit": bool(self._last_embed_cache_hit),
-            "retrieval_cache_hit": bool(self._last_retrieval_cache_hit),
+            "article_index_hit": bool(chunks),
+            "embed_cache_hit": False,
+            "retrieval_cache_hit": False,
             "retrieval_ms": (time.time() - t0) * 1000.0,
             "returned": len(chunks),
         }
+        return chunks
+
+    def _diff_scope(self, filters: Dict[str, Any]) -> Optional[Dict[str, List[Any]]]:
+        if self.diff_index is None:
+            return None
+        scope = filter_scope(filters)
+        if scope is None or set(scope) - _ARTICLE_SCOPE_FIELDS:
+            return None
+        if any(not vals for vals in scope.values()):
+            return None
+        return scope
+
+    def has_diffs(self, seasons: Sequence[int], *, filters: Dict[str, Any]) -> bool:
+        scope = self._diff_scope(filters)
+        if scope is None or len(set(seasons)) < 2:
+            return False
+        return self.diff_index.has_range(
+            PINECONE_NAMESPACE,
+            min(seasons),
+            max(seasons),
+            tenants=scope.get("tenant"),
+            doc_types=scope.get("doc_type"),
+            regulation_types=scope.get("regulation_type"),
+        )
 
+    def retrieve_diffs(
+        self,
+        seasons: Sequence[int],
+        *,
+        articles: Optional[List[str]] = None,
+        anchors: Optional[List[Chunk]] = None,
+        limit: int,
+        filters: Dict[str, Any],
+    ) -> List[Chunk]:
+        scope = self._diff_scope(filters)
+        if scope is None or len(set(seasons)) < 2:
+            return []
+
+        if articles:
+            # "Article 12.3": its own diff if it has a heading, else the enclosing article
+            candidates = [[a, a.split(".", 1)[0]] if "." in a else [a] for a in articles]
+        else:
+            # topic query: the articles whose sections the retrieved chunks sit in
+            ids = [c.id for c in anchors or []]
+            sections = self.article_index.sections(PINECONE_NAMESPACE, ids) if self.article_index else {}
+            tops: List[str] = []
+            for cid in ids:
+                for art in sections.get(cid, []):
+                    top = art.split(".", 1)[0]
+                    if top not in tops:
+                        tops.append(top)
+            candidates = [[a] for a in tops]
+
+        diffs = []
+        for options in candidates:
+            found = self.diff_index.lookup(
+                PINECONE_NAMESPACE,
+                options,
+                min(seasons),
+                max(seasons),
+                tenants=scope.get("tenant"),
+                doc_types=scope.get("doc_type"),
+                regulation_types=scope.get("regulation_type"),
+            )
+            if found:
+                first = found[0].article
+                diffs.extend(d for d in found if d.article == first)
+            if len(diffs) >= limit:
+                break
+        diffs = diffs[:limit]
+
+        chunks: List[Chunk] = []
+        for i, d in enumerate(diffs):
+            source = d.source_to or d.source_from
+            meta = {
+                "tenant": d.tenant,
+                "series": d.series,
+                "doc_type": d.doc_type,
+                "regulation_type": d.regulation_type,
+                "season": d.season_to,
+                "season_from": d.season_from,
+                "season_to": d.season_to,
+                "source": source,
+                "doc_title": source,
+                "page": d.page_to if d.page_to is not None else d.page_from,
+                "article_primary": d.article,
+                "article_diff": d.status,
+            }
+            chunks.append(
+                Chunk(
+                    id=f"diff:{d.doc_type}:{d.regulation_type}:{d.article}:{d.season_from}-{d.season_to}",
+                    text=render_diff(d),
+                    metadata={k: v for k, v in meta.items() if v is not None},
+                    score=1.0 - i / max(1, len(diffs)),
+                )
+            )
         return chunks
@@ -1,22 +1,45 @@
 # index/pinecone_store.py
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import threading
 import time
 from typing import Any, Dict, List, Optional
 
 from pinecone import Pinecone, ServerlessSpec
 
+from config import (
+    PINECONE_POOL_THREADS,
+    PINECONE_POOL_MAXSIZE,
+    PINECONE_GRPC,
+    PINECONE_INDEX_CHECK_TTL_S,
+    PINECONE_INDEX_CHECK_PATH,
+)
+from index.bulk_upsert import UpsertReport, bulk_upsert
+
 
 class PineconeStore:
     """
     Thin wrapper around Pinecone operations:
     - ensure_index
     - get_host
-    - upsert
-    - query
+    - upsert (+ upsert_bulk: split, parallel, retried)
+    - delete
+    - update_metadata
+    - query (+ async aquery / aupsert)
 
     Note: Use Index(host=...) (recommended in production).
     If host is not provided, we fallback to describe_index() to find it.
+
+    The data-plane client is built once and reused by every call (pooled
+    keep-alive connections: PINECONE_POOL_THREADS / PINECONE_POOL_MAXSIZE;
+    PINECONE_GRPC=1 uses the gRPC transport, `pip install "pinecone[grpc]"`).
+
+    A successful ensure_index is remembered on disk with the index host
+    (PINECONE_INDEX_CHECK_PATH, PINECONE_INDEX_CHECK_TTL_S), so process start
+    does not pay list_indexes + describe_index every time.
     """
 
     def __init__(
@@ -30,15 +53,65 @@ class PineconeStore:
         region: str,
         host: Optional[str] = None,
     ):
-        self.pc = Pinecone(api_key=api_key)
+        if PINECONE_GRPC:
+            from pinecone.grpc import PineconeGRPC
+
+            client_cls = PineconeGRPC
+        else:
+            client_cls = Pinecone
+        pool = {"connection_pool_maxsize": PINECONE_POOL_MAXSIZE} if PINECONE_POOL_MAXSIZE else {}
+        self.pc = client_cls(api_key=api_key, **pool)
         self.index_name = index_name
         self.dimension = dimension
         self.metric = metric
         self.cloud = cloud
         self.region = region
         self._host = host
+        self._index: Any = None
+        self._async_index: Any = None
+        self._index_lock = threading.Lock()
+        # check-cache entry: one per project (api key) + index name
+        self._check_key = f"{hashlib.sha1((api_key or '').encode()).hexdigest()[:12]}:{index_name}"
+
+    def _read_checks(self) -> Dict[str, Any]:
+        try:
+            with open(PINECONE_INDEX_CHECK_PATH, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _cached_check(self) -> Optional[Dict[str, Any]]:
+        if PINECONE_INDEX_CHECK_TTL_S <= 0:
+            return None
+        entry = self._read_checks().get(self._check_key)
+        if (
+            not isinstance(entry, dict)
+            or entry.get("dimension") != self.dimension
+            or time.time() - float(entry.get("checked_at", 0)) > PINECONE_INDEX_CHECK_TTL_S
+        ):
+            return None
+        return entry
+
+    def _remember_check(self, host: Optional[str]) -> None:
+        if PINECONE_INDEX_CHECK_TTL_S <= 0:
+            return
+        checks = self._read_checks()
+        checks[self._check_key] = {"dimension": self.dimension, "host": host, "checked_at": time.time()}
+        tmp = f"{PINECONE_INDEX_CHECK_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(checks, f, indent=2)
+            os.replace(tmp, PINECONE_INDEX_CHECK_PATH)
+        except OSError:
+            pass  # best effort: next start checks again
+
+    def ensure_index(self, *, force: bool = False) -> None:
+        """Create the index if missing, else verify its dimension. force=True skips the check cache."""
+        cached = None if force else self._cached_check()
+        if cached is not None:
+            self._host = self._host or cached.get("host")
+            return
 
-    def ensure_index(self) -> None:
         existing = [i["name"] for i in self.pc.list_indexes().get("indexes", [])]
         if self.index_name in existing:
             # Optional sanity check: dimension mismatch is a common mistake
@@ -49,6 +122,8 @@ class PineconeStore:
                     f"Index '{self.index_name}' dimension={idx_dim} but code expects {self.dimension}. "
                     f"Use a different index name or recreate the index with correct dimension."
                 )
+            self._host = self._host or desc.get("host")
+            self._remember_check(desc.get("host"))
             return
 
         self.pc.create_index(
@@ -64,6 +139,8 @@ class PineconeStore:
             if desc.get("status", {}).get("state") == "Ready":
                 break
             time.sleep(2)
+        self._host = self._host or desc.get("host")
+        self._remember_check(desc.get("host"))
 
     def get_host(self) -> str:
         desc = self.pc.describe_index(self.index_name)
@@ -73,9 +150,26 @@ class PineconeStore:
         return host
 
     def index(self):
-        if not self._host:
-            self._host = self.get_host()
-        return self.pc.Index(host=self._host)
+        """Long-lived data-plane client (built on first use; one describe_index if no host)."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    if not self._host:
+                        self._host = self.get_host()
+                    kwargs = {} if PINECONE_GRPC else {"pool_threads": PINECONE_POOL_THREADS}
+                    self._index = self.pc.Index(host=self._host, **kwargs)
+        return self._index
+
+    def async_index(self):
+        """
+        asyncio data-plane client (HTTP; built on first use). It holds an aiohttp
+        session, so use it from one event loop and call aclose() when done.
+        """
+        if self._async_index is None:
+            if not self._host:
+                self._host = self.get_host()
+            self._async_index = self.pc.IndexAsyncio(host=self._host)
+        return self._async_index
 
     @property
     def host(self) -> Optional[str]:
@@ -84,6 +178,23 @@ class PineconeStore:
     def upsert(self, *, vectors: List[Dict[str, Any]], namespace: str) -> None:
         self.index().upsert(vectors=vectors, namespace=namespace)
 
+    def upsert_bulk(self, *, vectors: List[Dict[str, Any]], namespace: str, **kwargs: Any) -> UpsertReport:
+        """
+        Any number of vectors: split by count + payload bytes, sent concurrently,
+        transient failures retried (see bulk_upsert for kwargs). Check report.failed.
+        """
+        return bulk_upsert(self.upsert, vectors, namespace=namespace, **kwargs)
+
+    def delete(self, *, ids: List[str], namespace: str, batch_size: int = 1000) -> None:
+        # Pinecone caps ids per delete request
+        idx = self.index()
+        for i in range(0, len(ids), batch_size):
+            idx.delete(ids=ids[i:i + batch_size], namespace=namespace)
+
+    def update_metadata(self, *, id: str, metadata: Dict[str, Any], namespace: str) -> None:
+        # Merges into the stored metadata (fields not listed are kept)
+        self.index().update(id=id, set_metadata=metadata, namespace=namespace)
+
     def query(
         self,
         *,
@@ -100,3 +211,28 @@ class PineconeStore:
             include_metadata=include_metadata,
             filter=flt or {},
         )
+
+    async def aquery(
+        self,
+        *,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        flt: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> Dict[str, Any]:
+        return await self.async_index().query(
+            namespace=namespace,
+            vector=vector,
+            top_k=top_k,
+            include_metadata=include_metadata,
+            filter=flt or {},
+        )
+
+    async def aupsert(self, *, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        await self.async_index().upsert(vectors=vectors, namespace=namespace)
+
+    async def aclose(self) -> None:
+        if self._async_index is not None:
+            idx, self._async_index = self._async_index, None
+            await idx.close()
@@ -3,34 +3,85 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Tuple
 
-from retriever_interface import Chunk
+from retriever_interface import Chunk, RetrievalRequest
 from index.query_planner import QueryPlan
-from index.filters import build_filters
+from index.filters import build_filters, detect_article_explicit
 
 
-def _has_season_filter(flt: Dict[str, Any]) -> bool:
+def _with_seasons(flt: Dict[str, Any], seasons: List[int]) -> Dict[str, Any]:
     """
-    Detect if a Pinecone filter already contains a season constraint.
-    Handles nested {"$and": [...]} structures.
+    Replace any season constraint with exactly `seasons`, the plan's. (build_filters
+    picks up the first year in the text, which in compare subqueries is not the
+    subquery's season.)
     """
-    if not flt:
-        return False
-    if "season" in flt:
-        return True
-    if "$and" in flt and isinstance(flt["$and"], list):
-        return any(_has_season_filter(x) for x in flt["$and"])
-    return False
+    def strip(f: Dict[str, Any]) -> Dict[str, Any]:
+        out = {k: v for k, v in f.items() if k != "season"}
+        if isinstance(out.get("$and"), list):
+            out["$and"] = [strip(x) for x in out["$and"] if not (isinstance(x, dict) and set(x) == {"season"})]
+        return out
 
+    season = {"season": {"$eq": seasons[0]}} if len(seasons) == 1 else {"season": {"$in": list(seasons)}}
+    base = strip(flt or {})
+    if not base:
+        return season
+    if isinstance(base.get("$and"), list) and len(base) == 1:
+        return {"$and": [*base["$and"], season]}
+    return {"$and": [base, season]}
 
-def _force_season_filter(flt: Dict[str, Any], season: int) -> Dict[str, Any]:
+
+def _article_lookup(
+    retriever,
+    query: str,
+    *,
+    recall_k: int,
+    filters: Dict[str, Any],
+    debug: Dict[str, Any],
+) -> List[Chunk]:
+    """Explicit article in the query -> the retriever's article lookup (no embedding / vector search)."""
+    article = detect_article_explicit(query)
+    if not article:
+        return []
+    lookup = getattr(retriever, "retrieve_article", None)
+    chunks = lookup(article, limit=recall_k, filters=filters) if lookup else []
+    if chunks:
+        debug["article_bypass"] = True
+    return chunks
+
+
+def _retrieve(
+    retriever,
+    query: str,
+    *,
+    recall_k: int,
+    filters: Dict[str, Any],
+    debug: Dict[str, Any],
+) -> List[Chunk]:
     """
-    Add season filter only if not already present.
+    Explicit article in the query -> try the retriever's article lookup first
+    (skips embedding + vector search); otherwise / on a miss -> normal retrieval.
     """
-    if _has_season_filter(flt):
-        return flt
-    if not flt:
-        return {"season": {"$eq": season}}
-    return {"$and": [flt, {"season": {"$eq": season}}]}
+    chunks = _article_lookup(retriever, query, recall_k=recall_k, filters=filters, debug=debug)
+    if chunks:
+        return chunks
+    return retriever.retrieve(query, recall_k=recall_k, filters=filters)
+
+
+def _retrieve_many(
+    retriever,
+    requests: List[RetrievalRequest],
+    *,
+    debug: Dict[str, Any],
+) -> List[List[Chunk]]:
+    """_retrieve for several requests: article lookups first, the rest in one retrieve_many call."""
+    results = [
+        _article_lookup(retriever, r.query, recall_k=r.recall_k, filters=r.filters, debug=debug)
+        for r in requests
+    ]
+    todo = [i for i, chunks in enumerate(results) if not chunks]
+    if todo:
+        for i, chunks in zip(todo, retriever.retrieve_many([requests[i] for i in todo])):
+            results[i] = chunks
+    return results
 
 
 def _merge_balanced(per_season: Dict[int, List[Chunk]], top_k: int) -> List[Chunk]:
@@ -70,6 +121,54 @@ def _merge_balanced(per_season: Dict[int, List[Chunk]], top_k: int) -> List[Chun
     return out
 
 
+def _group_by_season(chunks: List[Chunk], seasons: List[int]) -> Dict[int, List[Chunk]]:
+    out: Dict[int, List[Chunk]] = {s: [] for s in seasons}
+    for c in chunks:
+        s = (c.metadata or {}).get("season")
+        if s in out:
+            out[s].append(c)
+    return out
+
+
+def _retrieve_diffs(
+    retriever,
+    base_query: str,
+    seasons: List[int],
+    *,
+    recall_k: int,
+    top_k: int,
+    tenant: str,
+    debug: Dict[str, Any],
+) -> List[Chunk]:
+    """
+    Compare via precomputed article diffs: one retrieval across all plan seasons
+    picks the articles (unless the query names one), their season-to-season diffs
+    lead the context, followed by season-balanced supporting chunks.
+    Empty list -> caller runs the per-season retrievals.
+    """
+    has_diffs = getattr(retriever, "has_diffs", None)
+    flt = _with_seasons(build_filters(base_query, tenant=tenant), seasons)
+    if has_diffs is None or not has_diffs(seasons, filters=flt):
+        return []
+
+    anchors = _retrieve(retriever, base_query, recall_k=recall_k, filters=flt, debug=debug)
+    article = detect_article_explicit(base_query)
+    diffs = retriever.retrieve_diffs(
+        seasons,
+        articles=[article] if article else None,
+        anchors=anchors,
+        limit=max(1, top_k // 2),
+        filters=flt,
+    )
+    if not diffs:
+        return []
+
+    support = _merge_balanced(_group_by_season(anchors, seasons), top_k=top_k - len(diffs))
+    debug["filters"] = flt
+    debug["article_diffs"] = len(diffs)
+    return diffs + support
+
+
 def execute_plan(
     *,
     retriever,
@@ -85,7 +184,9 @@ def execute_plan(
     Notes:
     - SINGLE with no seasons: one retrieval call
     - SINGLE with 1 season: one retrieval call, season enforced
-    - COMPARE with N seasons: retrieval per season, balanced merge
+    - COMPARE with N seasons: precomputed article diffs + one retrieval when available,
+      else retrieval per season, balanced merge
+    - explicit "Article X" queries are answered from the article index when possible
     """
     debug: Dict[str, Any] = {
         "mode": plan.mode,
@@ -98,7 +199,7 @@ def execute_plan(
     # -----------------------
     if plan.mode == "single" and not plan.seasons:
         flt = build_filters(base_query, tenant=tenant)
-        chunks = retriever.retrieve(base_query, recall_k=recall_k, filters=flt)
+        chunks = _retrieve(retriever, base_query, recall_k=recall_k, filters=flt, debug=debug)
         debug["filters"] = flt
         debug["total"] = len(chunks)
         return chunks[:top_k], debug
@@ -108,10 +209,9 @@ def execute_plan(
     # -----------------------
     if plan.mode == "single" and plan.subqueries:
         sq = plan.subqueries[0]
-        flt = build_filters(sq.query, tenant=tenant)
-        flt = _force_season_filter(flt, sq.season)
+        flt = _with_seasons(build_filters(sq.query, tenant=tenant), [sq.season])
 
-        chunks = retriever.retrieve(sq.query, recall_k=recall_k, filters=flt)
+        chunks = _retrieve(retriever, sq.query, recall_k=recall_k, filters=flt, debug=debug)
         debug["filters"] = flt
         debug["total"] = len(chunks)
         return chunks[:top_k], debug
@@ -122,25 +222,38 @@ def execute_plan(
     seasons = plan.seasons or []
     if not seasons:
         flt = build_filters(base_query, tenant=tenant)
-        chunks = retriever.retrieve(base_query, recall_k=recall_k, filters=flt)
+        chunks = _retrieve(retriever, base_query, recall_k=recall_k, filters=flt, debug=debug)
         debug["filters"] = flt
         debug["total"] = len(chunks)
         return chunks[:top_k], debug
 
+    diffs = _retrieve_diffs(
+        retriever, base_query, seasons, recall_k=recall_k, top_k=top_k, tenant=tenant, debug=debug
+    )
+    if diffs:
+        debug["total"] = len(diffs)
+        return diffs, debug
+
     # Split recall budget across seasons
     per_season_recall = max(6, recall_k // max(1, len(seasons)))
     debug["per_season_recall"] = per_season_recall
 
-    per_season_chunks: Dict[int, List[Chunk]] = {}
-
-    for sq in plan.subqueries:
-        # Build base filters (series, doc_type, regulation_type, article_refs, tenant, etc.)
-        flt = build_filters(sq.query, tenant=tenant)
+    requests = [
+        RetrievalRequest(
+            query=sq.query,
+            # base filters (series, doc_type, regulation_type, article_refs, tenant, etc.)
+            # with exactly this subquery's season (the text mentions every season of the plan)
+            filters=_with_seasons(build_filters(sq.query, tenant=tenant), [sq.season]),
+            recall_k=per_season_recall,
+        )
+        for sq in plan.subqueries
+    ]
+    # One batched call: shared embedding request, cache round trips and hydration,
+    # concurrent vector queries
+    results = _retrieve_many(retriever, requests, debug=debug)
 
-        # Ensure season filter exists exactly once
-        flt = _force_season_filter(flt, sq.season)
-
-        chunks = retriever.retrieve(sq.query, recall_k=per_season_recall, filters=flt)
+    per_season_chunks: Dict[int, List[Chunk]] = {}
+    for sq, chunks in zip(plan.subqueries, results):
         per_season_chunks[sq.season] = chunks
         debug["per_season_counts"][sq.season] = len(chunks)
 
@@ -0,0 +1,25 @@
+# index/sqlite_batches.py
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List, Tuple
+
+from config import DOCSTORE_MAX_VARS
+
+
+def in_batches(
+    ids: Iterable[str], max_vars: int = DOCSTORE_MAX_VARS, reserved: int = 0
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    (placeholders, params) per IN (...) lookup: ids deduplicated, split so a statement
+    binds at most max_vars parameters (reserved = the statement's other parameters),
+    each batch padded (repeating its last id) to a power of two so a connection only
+    ever sees ~log2(max_vars) distinct statements and its statement cache keeps them
+    prepared.
+    """
+    limit = max(1, max_vars - reserved)
+    uniq = list(dict.fromkeys(ids))
+    for i in range(0, len(uniq), limit):
+        batch = uniq[i:i + limit]
+        size = min(limit, 1 << (len(batch) - 1).bit_length())
+        batch += batch[-1:] * (size - len(batch))
+        yield ",".join("?" * size), batch
@@ -0,0 +1,45 @@
+# index/vector_store.py
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from config import (
+    VECTOR_BACKEND,
+    LOCAL_STORE_DIR,
+    PINECONE_API_KEY,
+    PINECONE_INDEX,
+    PINECONE_HOST,
+    PINECONE_CLOUD,
+    PINECONE_REGION,
+    INDEX_DIM,
+    METRIC,
+)
+
+
+def make_vector_store() -> Any:
+    """
+    Vector store for VECTOR_BACKEND: PineconeStore ("pinecone") or LocalVectorStore
+    ("local", <LOCAL_STORE_DIR>/<PINECONE_INDEX>). Both expose the same methods,
+    so ingestion and PineconeRetriever work with either.
+    """
+    if VECTOR_BACKEND == "local":
+        from index.local_store import LocalVectorStore
+
+        return LocalVectorStore(
+            path=os.path.join(LOCAL_STORE_DIR, PINECONE_INDEX),
+            dimension=INDEX_DIM,
+            metric=METRIC,
+        )
+
+    from index.pinecone_store import PineconeStore
+
+    return PineconeStore(
+        api_key=PINECONE_API_KEY,
+        index_name=PINECONE_INDEX,
+        dimension=INDEX_DIM,
+        metric=METRIC,
+        cloud=PINECONE_CLOUD,
+        region=PINECONE_REGION,
+        host=PINECONE_HOST,
+    )
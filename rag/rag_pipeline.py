@@ -1,17 +1,18 @@
 # rag/rag_pipeline.py
 from __future__ import annotations
 
-from typing import Any, Dict, List
-
-from openai import OpenAI
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from config import (
-    OPENAI_API_KEY,
+    require_openai_key,
     GEN_MODEL,
     RECALL_K,
     TOP_K,
     RERANK_ENABLED,
     RERANK_STRATEGY,
+    EMBED_BACKEND,
+    EMBED_MICROBATCH_ENABLED,
 )
 
 from retriever_interface import Chunk
@@ -21,6 +22,9 @@ from guardrails.guards import input_guard, context_guard, output_guard
 
 from rerank.cross_encoder_reranker import rerank_chunks_cross_encoder
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 
 _client: OpenAI | None = None
 
@@ -28,10 +32,52 @@ _client: OpenAI | None = None
 def _get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        from openai import OpenAI
+
+        _client = OpenAI(api_key=require_openai_key())
     return _client
 
 
+def warmup(*, retriever=None, verbose: bool = True) -> Dict[str, float]:
+    """
+    Pay the one-time costs before the first request: cross-encoder load + one dummy
+    inference, local embedding model, OpenAI client, Redis connection and the vector
+    index client (host lookup). Imports and connections are otherwise lazy.
+    Returns milliseconds per step.
+    """
+    steps: Dict[str, float] = {}
+
+    def step(name: str, fn) -> None:
+        t0 = time.perf_counter()
+        fn()
+        steps[name] = (time.perf_counter() - t0) * 1000.0
+
+    if RERANK_ENABLED and RERANK_STRATEGY == "cross_encoder":
+        from rerank import cross_encoder_reranker
+
+        step("cross_encoder_load", cross_encoder_reranker.load_model)
+        step("cross_encoder_infer", cross_encoder_reranker.warmup)
+
+    from embeddings import embedder
+
+    step("local_embedder" if EMBED_BACKEND == "local" else "openai_embed_client", embedder.warmup)
+    step("openai_client", _get_client)
+
+    redis = getattr(retriever, "redis", None)
+    if redis is not None:
+        step("redis_ping", redis.ping)
+    store = getattr(retriever, "store", None)
+    open_index: Optional[Any] = getattr(store, "index", None)
+    if callable(open_index):
+        step("vector_index", open_index)
+
+    if verbose:
+        for name, ms in steps.items():
+            print(f"warmup {name:<20} {ms:8.1f} ms")
+        print(f"warmup {'total':<20} {sum(steps.values()):8.1f} ms")
+    return steps
+
+
 def _build_context(chunks: List[Chunk]) -> str:
     parts: List[str] = []
     for i, c in enumerate(chunks, start=1):
@@ -112,6 +158,10 @@ def run_rag(*, query: str, retriever, tenant: str = "fia") -> Dict[str, Any]:
     dbg = dict(dbg)
     if retr_dbg:
         dbg["cache"] = retr_dbg
+    if EMBED_MICROBATCH_ENABLED:
+        from embeddings.micro_batcher import get_micro_batcher
+
+        dbg["embed_microbatch"] = get_micro_batcher().stats()
 
     chunks = context_guard(chunks, tenant=tenant)
 
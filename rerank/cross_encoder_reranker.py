@@ -10,25 +10,35 @@ which is why it is used only after vector retrieval on a small candidate set.
 # rerank/cross_encoder_reranker.py
 from __future__ import annotations
 
-from typing import List, Any
+from typing import TYPE_CHECKING, List, Any
 from dataclasses import replace
 
-from sentence_transformers import CrossEncoder
-
 from config import CROSS_ENCODER_MODEL, CROSS_ENCODER_BATCH_SIZE, RERANK_MAX_CHARS
 
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
 
 _ce: CrossEncoder | None = None
 
 
-def _get_model() -> CrossEncoder:
+def load_model() -> CrossEncoder:
+    """The process-wide CrossEncoder, loaded on first use."""
     global _ce
     if _ce is None:
+        # imported here: sentence-transformers pulls in torch (seconds), only pay it when reranking
+        from sentence_transformers import CrossEncoder
+
         # device is auto-selected by sentence-transformers/torch
         _ce = CrossEncoder(CROSS_ENCODER_MODEL)
     return _ce
 
 
+def warmup() -> None:
+    """Load the model and score one pair, so the first real query is not slow."""
+    load_model().predict([("warmup", "warmup")], batch_size=1)
+
+
 def _snippet(text: str, max_chars: int) -> str:
     t = (text or "").strip()
     return t[:max_chars]
@@ -48,7 +58,7 @@ def rerank_chunks_cross_encoder(
     if len(chunks) <= top_k:
         return chunks
 
-    model = _get_model()
+    model = load_model()
 
     pairs = [(query, _snippet(c.text, RERANK_MAX_CHARS)) for c in chunks]
     scores = model.predict(pairs, batch_size=CROSS_ENCODER_BATCH_SIZE)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
 
 @dataclass
@@ -13,6 +13,13 @@ class Chunk:
     score: float  # similarity score (higher = better)
 
 
+@dataclass
+class RetrievalRequest:
+    query: str
+    filters: Dict[str, Any]
+    recall_k: int
+
+
 class Retriever:
     def retrieve(
         self,
@@ -22,3 +29,43 @@ class Retriever:
         filters: Dict[str, Any],
     ) -> List[Chunk]:
         raise NotImplementedError
+
+    def retrieve_many(self, requests: Sequence[RetrievalRequest]) -> List[List[Chunk]]:
+        """
+        One result list per request (same order). Implementations batch the
+        embedding / cache / vector-store / docstore work; this default just loops.
+        """
+        return [self.retrieve(r.query, recall_k=r.recall_k, filters=r.filters) for r in requests]
+
+    def retrieve_article(
+        self,
+        article: str,
+        *,
+        limit: int,
+        filters: Dict[str, Any],
+    ) -> List[Chunk]:
+        """
+        Direct lookup for an explicitly named article (no embedding / vector search).
+        Empty list = not supported or no hit; callers fall back to retrieve().
+        """
+        return []
+
+    def has_diffs(self, seasons: Sequence[int], *, filters: Dict[str, Any]) -> bool:
+        """True if precomputed season-to-season article diffs cover these seasons."""
+        return False
+
+    def retrieve_diffs(
+        self,
+        seasons: Sequence[int],
+        *,
+        articles: Optional[List[str]] = None,
+        anchors: Optional[List[Chunk]] = None,
+        limit: int,
+        filters: Dict[str, Any],
+    ) -> List[Chunk]:
+        """
+        Precomputed article diffs between consecutive seasons in [min(seasons), max(seasons)],
+        for explicit `articles` or the sections the `anchors` chunks sit in.
+        Empty list = not supported or no hit; callers fall back to per-season retrieval.
+        """
+        return []
@@ -0,0 +1,79 @@
+# scripts/bench_chunker.py
+"""
+Throughput: sentence_aware.chunk (reference) vs sentence_spans.chunk (single pass).
+
+    python -m scripts.bench_chunker                  # pages from PDF_DIR (page cache makes this fast)
+    python -m scripts.bench_chunker --synthetic 2000 # no PDFs needed
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from config import PDF_DIR, CHUNK_SIZE, OVERLAP_SENTENCES
+from chunking.sentence_aware import chunk as reference_chunk
+from chunking.sentence_spans import chunk as span_chunk
+
+
+def _synthetic_pages(n: int, seed: int = 7) -> List[str]:
+    rnd = random.Random(seed)
+    words = ("car driver team race lap pit lane safety parc ferme steward penalty tyre fuel "
+             "power unit competitor session qualifying sprint grid formation").split()
+    pages = []
+    for p in range(n):
+        parts = [f"ARTICLE {p % 60 + 1} GENERAL PROVISIONS"]
+        for k in range(rnd.randint(6, 16)):
+            sent = " ".join(rnd.choice(words) for _ in range(rnd.randint(8, 30)))
+            marker = rnd.choice([f"{p % 60 + 1}.{k + 1}", f"{chr(97 + k % 26)})", ""])
+            parts.append(f"{marker} The {sent}. See Art. {p % 60 + 1}.{k + 1} for details.")
+        pages.append(" ".join(parts))
+    return pages
+
+
+def _time(fn: Callable[[str], List[str]], pages: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for txt in pages:
+            fn(txt)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdf-dir", default=PDF_DIR)
+    ap.add_argument("--synthetic", type=int, default=0, help="use N generated pages instead of PDFs")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--overlap-sentences", type=int, default=OVERLAP_SENTENCES)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.synthetic or not any(Path(args.pdf_dir).glob("*.pdf")):
+        pages = _synthetic_pages(args.synthetic or 2000)
+        corpus = f"synthetic ({len(pages)} pages)"
+    else:
+        from index.pdf_loader import load_pdf_pages
+        pages = [p["text"] for p in load_pdf_pages(args.pdf_dir)]
+        corpus = f"{args.pdf_dir} ({len(pages)} pages)"
+
+    cs, ov = args.chunk_size, args.overlap_sentences
+    ref = lambda t: reference_chunk(t, chunk_size=cs, overlap_sentences=ov)
+    new = lambda t: span_chunk(t, chunk_size=cs, overlap_sentences=ov)
+
+    mismatches = sum(1 for t in pages if ref(t) != new(t))
+    mb = sum(len(t) for t in pages) / 1e6
+
+    t_ref = _time(ref, pages, args.repeat)
+    t_new = _time(new, pages, args.repeat)
+
+    print(f"corpus: {corpus} | {mb:.2f} MB | chunk_size={cs} overlap_sentences={ov}")
+    print(f"mismatched pages: {mismatches}")
+    for name, t in (("sentence_aware", t_ref), ("sentence_spans", t_new)):
+        print(f"{name:>15}: {t * 1000:8.1f} ms | {len(pages) / t:9.0f} pages/s | {mb / t:6.2f} MB/s")
+    print(f"speedup: {t_ref / t_new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# scripts/bench_docstore.py
+"""
+Docstore hydration latency (get_many_with_meta, what every retrieval pays):
+p50 / p99 per call for --ids random chunk ids, issued from --threads threads.
+
+Uses DOCSTORE_PATH, or with --rows N a synthetic docstore of N chunks in a temp dir.
+
+    python -m scripts.bench_docstore --ids 24 --calls 2000
+    python -m scripts.bench_docstore --rows 50000 --ids 24 --threads 8 --json docstore_bench.json
+    python -m scripts.bench_docstore --rows 50000 --ids 40000 --calls 20   # > bound-parameter limit
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from config import DOCSTORE_PATH
+from index.docstore_sqlite import SQLiteDocStore
+from index.ingest_pipeline import percentile
+
+
+def _synthetic(path: str, rows: int) -> None:
+    rnd = random.Random(0)
+    words = ("car driver team race lap pit lane safety parc ferme steward penalty tyre fuel "
+             "power unit competitor session qualifying sprint grid formation").split()
+    store = SQLiteDocStore(path)
+    for start in range(0, rows, 5000):
+        store.put_many(
+            (
+                f"doc{i // 40}-p{i % 40}-c0",
+                " ".join(rnd.choice(words) for _ in range(120)),
+                {"season": 2020 + i % 6, "series": "f1", "page": i % 40, "source": f"doc{i // 40}.pdf"},
+            )
+            for i in range(start, min(rows, start + 5000))
+        )
+
+
+def _stats(ms: List[float], wall: float) -> Dict[str, float]:
+    return {"n": len(ms), "p50_ms": percentile(ms, 0.50), "p99_ms": percentile(ms, 0.99), "max_ms": max(ms), "calls_per_sec": len(ms) / wall}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=0, help="build a synthetic docstore with N chunks")
+    ap.add_argument("--ids", type=int, default=24, help="chunk ids per call (RECALL_K-sized by default)")
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--threads", type=int, default=1)
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+
+    path = DOCSTORE_PATH
+    if args.rows:
+        path = os.path.join(tempfile.mkdtemp(prefix="docstore_bench_"), "docstore.sqlite")
+        _synthetic(path, args.rows)
+
+    store = SQLiteDocStore(path)
+    con = sqlite3.connect(path)
+    all_ids = [r[0] for r in con.execute("SELECT chunk_id FROM chunks")]
+    con.close()
+    if not all_ids:
+        raise SystemExit(f"No chunks in {path} (use --rows N for a synthetic docstore)")
+
+    rnd = random.Random(1)
+    batches = [rnd.sample(all_ids, min(args.ids, len(all_ids))) for _ in range(args.calls)]
+
+    def timed(ids: List[str]) -> float:
+        t0 = time.perf_counter()
+        got = store.get_many_with_meta(ids)
+        ms = (time.perf_counter() - t0) * 1000
+        assert len(got) == len(ids)
+        return ms
+
+    timed(batches[0])  # first call: connection + schema setup
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.threads)) as pool:
+        ms = list(pool.map(timed, batches))
+    result = _stats(ms, time.perf_counter() - t0)
+
+    print(
+        f"{len(all_ids)} chunks | {args.ids} ids/call | {args.threads} threads | "
+        f"p50={result['p50_ms']:.3f} ms  p99={result['p99_ms']:.3f} ms  max={result['max_ms']:.3f} ms  "
+        f"{result['calls_per_sec']:.0f} calls/s"
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "chunks": len(all_ids), "ids": args.ids, "threads": args.threads, **result}, f, indent=2)
@@ -0,0 +1,72 @@
+# scripts/bench_embed.py
+"""
+Per-batch embedding latency of the configured backend (EMBED_BACKEND):
+single-query requests (what retrieval pays on a cache miss) and ingest-size batches.
+--threads N issues the queries from N threads and prints the micro-batcher histograms.
+
+    python -m scripts.bench_embed
+    python -m scripts.bench_embed --threads 16 --queries 400
+    EMBED_BACKEND=local python -m scripts.bench_embed --queries 200 --batch 64
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from config import EMBED_BACKEND, EMBEDDING_MODEL, EMBED_DIM, EMBED_MICROBATCH_ENABLED
+from embeddings.embedder import embed_texts, embed_query
+
+
+def _texts(n: int, words: int, seed: int) -> List[str]:
+    rnd = random.Random(seed)
+    vocab = ("car driver team race lap pit lane safety parc ferme steward penalty tyre fuel "
+             "power unit competitor session qualifying sprint grid formation").split()
+    return [" ".join(rnd.choice(vocab) for _ in range(words)) for _ in range(n)]
+
+
+def _report(label: str, ms: List[float]) -> None:
+    ms = sorted(ms)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{label:<22} n={len(ms):<5} p50={statistics.median(ms):8.2f} ms  p95={p95:8.2f} ms  max={ms[-1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=50, help="single-query requests")
+    ap.add_argument("--batch", type=int, default=32, help="texts per ingest-size request")
+    ap.add_argument("--batches", type=int, default=10)
+    ap.add_argument("--threads", type=int, default=1, help="concurrent query callers")
+    args = ap.parse_args()
+
+    print(f"backend={EMBED_BACKEND} model={EMBEDDING_MODEL} dim={EMBED_DIM}")
+
+    t0 = time.perf_counter()
+    embed_query("warmup")  # model load / connection setup
+    print(f"{'first request':<22} {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    def timed_query(q: str) -> float:
+        t0 = time.perf_counter()
+        embed_query(q)
+        return (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.threads)) as pool:
+        query_ms = list(pool.map(timed_query, _texts(args.queries, 12, seed=1)))
+    wall = time.perf_counter() - t0
+    _report(f"query (1 text, x{args.threads})", query_ms)
+    print(f"{'':<22} {args.queries / wall:.1f} queries/s")
+    if EMBED_MICROBATCH_ENABLED:
+        from embeddings.micro_batcher import get_micro_batcher
+
+        print("micro-batcher:", json.dumps(get_micro_batcher().stats()))
+
+    batch_ms = []
+    for b in range(args.batches):
+        texts = _texts(args.batch, 150, seed=100 + b)
+        t0 = time.perf_counter()
+        embed_texts(texts)
+        batch_ms.append((time.perf_counter() - t0) * 1000)
+    _report(f"batch ({args.batch} texts)", batch_ms)
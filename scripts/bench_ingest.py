@@ -0,0 +1,289 @@
+# scripts/bench_ingest.py
+"""
+Offline end-to-end ingestion benchmark: the real build_index_from_pdfs pipeline
+with a deterministic stand-in embedder and an in-memory vector store, so it runs
+without OpenAI / Pinecone credentials.
+
+    python -m scripts.bench_ingest                                  # generated PDFs
+    python -m scripts.bench_ingest --docs 20 --pages 120 --json bench_ingest.json
+    python -m scripts.bench_ingest --pdf-dir data/fia_pdfs --embed-latency-ms 300
+    python -m scripts.bench_ingest --baseline bench_ingest.json     # compare to an earlier run
+
+Reports per-stage busy time, peak RSS and chunks/sec. Docstore, manifest and caches
+live in a scratch directory (--workdir), never in the real stores.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_WORDS = (
+    "car driver team competitor race lap pit lane safety parc ferme steward penalty tyre "
+    "fuel power unit session qualifying sprint grid formation marshal signal track limits "
+    "clerk course starting procedure chassis survival cell bodywork homologation"
+).split()
+
+_KINDS = ["sporting", "technical", "financial"]
+
+
+def _write_pdf(path: Path, pages: List[List[str]]) -> None:
+    """Minimal single-font PDF (one text line per entry)."""
+    objs: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    font_id = 3 + 2 * len(pages)
+
+    for i, lines in enumerate(pages):
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        ops = ["BT /F1 9 Tf 40 760 Td 11 TL"]
+        for ln in lines:
+            ln = ln.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({ln}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def _body_lines(rnd: random.Random, article: int, new_article: bool) -> List[str]:
+    lines: List[str] = []
+    if new_article:
+        lines.append(f"ARTICLE {article} {rnd.choice(_WORDS).upper()} {rnd.choice(_WORDS).upper()}")
+    for k in range(rnd.randint(10, 16)):
+        sent = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(8, 22)))
+        if k % 4 == 0:
+            lines.append(f"{article}.{k + 1} The {sent}.")
+        elif k % 4 == 1:
+            lines.append(f"{chr(97 + k % 26)}) {sent.capitalize()}, see Article {rnd.randint(1, 60)}.")
+        else:
+            lines.append(f"The {sent} in accordance with Art. {article}.{rnd.randint(1, 9)}.")
+    return lines
+
+
+def generate_corpus(
+    out_dir: Path,
+    *,
+    docs: int,
+    pages: int,
+    carry_over: float = 0.0,
+    seed: int = 11,
+) -> List[Path]:
+    """
+    Regulation-like PDFs: repeated header/footer lines, ARTICLE headings,
+    numbered clauses, lettered sub-clauses and cross references.
+
+    carry_over: fraction of pages whose body is identical across every season /
+    issue of the same regulation type (real regulations change little per year).
+    """
+    rnd = random.Random(seed)
+    carry = random.Random(seed + 1)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+
+    for d in range(docs):
+        season = 2022 + d % 4
+        kind = _KINDS[d % len(_KINDS)]
+        issue = d // 4 + 1
+        title = f"{season} FORMULA 1 {kind.upper()} REGULATIONS"
+        article = 1
+        doc_pages: List[List[str]] = []
+
+        for p in range(pages):
+            if p % 3 == 0:
+                article += 1
+            if carry_over > 0 and carry.random() < carry_over:
+                body = _body_lines(random.Random(f"{seed}-{kind}-{p}"), article, p % 3 == 0)
+            else:
+                body = _body_lines(rnd, article, p % 3 == 0)
+            lines = [title, f"Issue {issue}", *body]
+            lines.append(f"Page {p + 1} of {pages}")
+            lines.append(f"(c) {season} Federation Internationale de l'Automobile")
+            doc_pages.append(lines)
+
+        path = out_dir / f"{season}_formula_1_{kind}_regulations_issue_{issue}.pdf"
+        _write_pdf(path, doc_pages)
+        paths.append(path)
+    return paths
+
+
+def _git_commit() -> Dict[str, Optional[str]]:
+    root = Path(__file__).resolve().parent.parent
+
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=root, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def _peak_rss_mb(who: int) -> float:
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _print_baseline_diff(result: Dict, baseline_path: str) -> None:
+    base = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+
+    def pct(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nvs baseline {base.get('git', {}).get('commit', '?')[:12]}:")
+    print(f"  chunks/sec   {base['chunks_per_sec']:10.1f} -> {result['chunks_per_sec']:10.1f}  "
+          f"{pct(result['chunks_per_sec'], base['chunks_per_sec'])}")
+    print(f"  peak_rss_mb  {base['peak_rss_mb']:10.1f} -> {result['peak_rss_mb']:10.1f}  "
+          f"{pct(result['peak_rss_mb'], base['peak_rss_mb'])}")
+    for stage, cur in result["stages"].items():
+        old = base.get("stages", {}).get(stage)
+        if old:
+            print(f"  {stage:<13}{old['seconds']:10.3f} -> {cur['seconds']:10.3f}s "
+                  f"{pct(cur['seconds'], old['seconds'])}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdf-dir", default=None, help="benchmark these PDFs instead of generated ones")
+    ap.add_argument("--docs", type=int, default=8, help="generated PDFs")
+    ap.add_argument("--pages", type=int, default=60, help="pages per generated PDF")
+    ap.add_argument("--carry-over", type=float, default=0.0,
+                    help="fraction of generated pages repeated verbatim across seasons (dedup benchmarks)")
+    ap.add_argument("--workdir", default=None, help="scratch dir for docstore/caches (default: temp dir)")
+    ap.add_argument("--workers", type=int, default=None, help="PDF_EXTRACT_WORKERS override")
+    ap.add_argument("--page-cache", action="store_true", help="keep the page cache on (warm runs)")
+    ap.add_argument("--embed-store", action="store_true", help="keep the embedding store on (warm runs)")
+    ap.add_argument("--embed-latency-ms", type=float, default=0.0, help="simulated latency per embed request")
+    ap.add_argument("--upsert-latency-ms", type=float, default=0.0, help="simulated latency per upsert request")
+    ap.add_argument("--json", default=None, help="write the result as JSON to this path")
+    ap.add_argument("--baseline", default=None, help="earlier --json result to compare against")
+    args = ap.parse_args()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="bench_ingest_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # Must be set before config is imported: keep every store out of the real paths
+    os.environ["DOCSTORE_PATH"] = str(workdir / "docstore.sqlite")
+    os.environ["MANIFEST_PATH"] = str(workdir / "docstore.sqlite")
+    os.environ["ARTICLE_INDEX_PATH"] = str(workdir / "docstore.sqlite")
+    os.environ["PAGE_CACHE_PATH"] = str(workdir / "page_cache.sqlite")
+    os.environ["EMBED_STORE_PATH"] = str(workdir / "embeddings.sqlite")
+    os.environ["PAGE_CACHE_ENABLED"] = "1" if args.page_cache else "0"
+    os.environ["EMBED_STORE_ENABLED"] = "1" if args.embed_store else "0"
+    os.environ["PINECONE_NAMESPACE"] = "bench"
+    if args.workers is not None:
+        os.environ["PDF_EXTRACT_WORKERS"] = str(args.workers)
+
+    import config
+    from embeddings.embedder import embed_stats
+    from embeddings.fake_embedder import FakeEmbedder
+    from index.build_index import build_index_from_pdfs
+    from index.ingest_pipeline import StageTimings
+    from index.manifest import IndexManifest
+    from index.memory_store import InMemoryStore
+    from index.namespace_router import route
+    from index.pdf_loader import list_pdfs
+
+    if args.pdf_dir:
+        pdf_dir = Path(args.pdf_dir)
+        corpus = {"kind": "dir", "path": str(pdf_dir)}
+    else:
+        pdf_dir = workdir / "pdfs"
+        generate_corpus(pdf_dir, docs=args.docs, pages=args.pages, carry_over=args.carry_over)
+        corpus = {"kind": "generated", "docs": args.docs, "pages_per_doc": args.pages,
+                  "carry_over": args.carry_over}
+    pdfs = list_pdfs(str(pdf_dir))
+    corpus["pdfs"] = len(pdfs)
+    corpus["bytes"] = sum(p.stat().st_size for p in pdfs)
+
+    store = InMemoryStore(dimension=config.INDEX_DIM, latency_ms=args.upsert_latency_ms)
+    embedder = FakeEmbedder(config.EMBED_DIM, latency_ms=args.embed_latency_ms)
+    timings = StageTimings()
+
+    t0 = time.perf_counter()
+    stats = build_index_from_pdfs(
+        str(pdf_dir), incremental=False, store=store, embed_fn=embedder, timings=timings
+    )
+    wall = time.perf_counter() - t0
+    namespaces, _ = route(
+        config.PINECONE_NAMESPACE,
+        {},
+        layout=config.NAMESPACE_PARTITION,
+        known=IndexManifest(config.MANIFEST_PATH, target=config.MANIFEST_TARGET).partitions(config.PINECONE_NAMESPACE),
+    )
+
+    result = {
+        "git": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "corpus": corpus,
+        "settings": {
+            "chunker": config.CHUNKER,
+            "chunk_size": config.CHUNK_SIZE,
+            "pdf_extractor": config.PDF_EXTRACTOR,
+            "pdf_extract_workers": config.PDF_EXTRACT_WORKERS,
+            "page_cache": config.PAGE_CACHE_ENABLED,
+            "embed_store": config.EMBED_STORE_ENABLED,
+            "embed_concurrency": config.EMBED_CONCURRENCY,
+            "upsert_concurrency": config.UPSERT_CONCURRENCY,
+            "embed_max_batch_tokens": config.EMBED_MAX_BATCH_TOKENS,
+            "embed_max_batch_items": config.EMBED_MAX_BATCH_ITEMS,
+            "upsert_batch_size": config.UPSERT_BATCH_SIZE,
+            "dedup": config.DEDUP_ENABLED,
+            "namespace_partition": config.NAMESPACE_PARTITION,
+            "embed_latency_ms": args.embed_latency_ms,
+            "upsert_latency_ms": args.upsert_latency_ms,
+        },
+        "chunks": stats.chunks,
+        "docs": len(stats.docs),
+        "vectors": sum(store.count(ns) for ns in namespaces),
+        "wall_seconds": wall,
+        "chunks_per_sec": stats.chunks / wall if wall else 0.0,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_rss_children_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "stages": timings.snapshot(),
+        "embed_requests": embed_stats.snapshot()["requests"],
+        "upsert_requests": store.requests,
+    }
+
+    print(f"\n{result['chunks']} chunks / {result['docs']} PDFs in {wall:.2f}s "
+          f"-> {result['chunks_per_sec']:.1f} chunks/s | peak RSS {result['peak_rss_mb']:.1f} MB")
+    print("stage busy time (overlapping stages can exceed wall time):")
+    for stage, s in sorted(result["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+        print(f"  {stage:<13}{s['seconds']:9.3f}s  {s['calls']:7d} calls")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"\nwrote {args.json}")
+    if args.baseline:
+        _print_baseline_diff(result, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
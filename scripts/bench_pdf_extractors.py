@@ -0,0 +1,96 @@
+# scripts/bench_pdf_extractors.py
+"""
+Compare PDF text backends on a local PDF set: pages/sec and how much the
+cleaned page text differs from the pypdf baseline.
+
+    python -m scripts.bench_pdf_extractors --pdf-dir data/fia_pdfs
+    python -m scripts.bench_pdf_extractors --backends pypdf,pymupdf --json bench_extractors.json
+"""
+import argparse
+import json
+import time
+from difflib import SequenceMatcher
+from typing import Dict, List
+
+from config import PDF_DIR
+from index.pdf_extractors import available_extractors, get_extractor
+from index.pdf_loader import list_pdfs, _extract_lines, _clean_document
+
+
+def _run_backend(name: str, pdf_paths) -> Dict:
+    ex = get_extractor(name)
+    pages: Dict[str, List[str]] = {}
+    n_pages = 0
+
+    t0 = time.perf_counter()
+    for p in pdf_paths:
+        raw = ex.extract_pages(str(p))
+        n_pages += len(raw)
+        cleaned = _clean_document(p.name, [_extract_lines(t) for t in raw])
+        pages[p.name] = [""] * len(raw)
+        for pg in cleaned:
+            pages[p.name][pg["page"] - 1] = pg["text"]
+    dt = time.perf_counter() - t0
+
+    return {"backend": name, "pages": n_pages, "seconds": dt, "pages_per_sec": n_pages / dt if dt else 0.0,
+            "_text": pages}
+
+
+def _diff(base: Dict[str, List[str]], other: Dict[str, List[str]]) -> Dict:
+    ratios: List[float] = []
+    differing = 0
+    char_delta = 0
+    for source, base_pages in base.items():
+        other_pages = other.get(source, [])
+        for i, a in enumerate(base_pages):
+            b = other_pages[i] if i < len(other_pages) else ""
+            if a == b:
+                ratios.append(1.0)
+                continue
+            differing += 1
+            char_delta += len(b) - len(a)
+            ratios.append(SequenceMatcher(None, a.split(), b.split(), autojunk=False).ratio())
+    return {
+        "pages_differing": differing,
+        "mean_word_similarity": sum(ratios) / len(ratios) if ratios else 1.0,
+        "min_word_similarity": min(ratios) if ratios else 1.0,
+        "char_delta": char_delta,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pdf-dir", default=PDF_DIR)
+    ap.add_argument("--backends", default="", help="comma list (default: every installed backend)")
+    ap.add_argument("--json", default="", help="also write results to this path")
+    args = ap.parse_args()
+
+    pdf_paths = list_pdfs(args.pdf_dir)
+    if not pdf_paths:
+        raise SystemExit(f"No PDFs in {args.pdf_dir}")
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()] or available_extractors()
+    if "pypdf" not in backends:
+        backends.insert(0, "pypdf")  # baseline for the diff columns
+
+    results = {b: _run_backend(b, pdf_paths) for b in backends}
+    base = results["pypdf"]["_text"]
+
+    print(f"{len(pdf_paths)} PDFs from {args.pdf_dir}")
+    print(f"{'backend':>9} | {'pages/s':>8} | {'seconds':>8} | {'differing':>9} | {'mean sim':>8} | {'min sim':>7}")
+    rows = []
+    for b, r in results.items():
+        d = _diff(base, r.pop("_text"))
+        r.update(d)
+        rows.append(r)
+        print(f"{b:>9} | {r['pages_per_sec']:8.1f} | {r['seconds']:8.2f} | "
+              f"{d['pages_differing']:9d} | {d['mean_word_similarity']:8.3f} | {d['min_word_similarity']:7.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"pdf_dir": args.pdf_dir, "pdfs": len(pdf_paths), "results": rows}, f, indent=2)
+        print("wrote", args.json)
+
+
+if __name__ == "__main__":
+    main()
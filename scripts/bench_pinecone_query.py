@@ -0,0 +1,116 @@
+# scripts/bench_pinecone_query.py
+"""
+Pinecone query latency (p50 / p99), random unit vectors (no embedding cost):
+
+  per-call  a new Index(host=...) for every query (previous behaviour)
+  pooled    PineconeStore.query on the long-lived data-plane client
+  async     PineconeStore.aquery, --concurrency queries in flight on one event loop
+
+--concurrency > 1 runs per-call / pooled from that many threads.
+
+    python -m scripts.bench_pinecone_query --queries 200
+    python -m scripts.bench_pinecone_query --queries 400 --concurrency 8 --json pc_bench.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from config import PINECONE_NAMESPACE, INDEX_DIM, RECALL_K, PINECONE_GRPC, VECTOR_BACKEND
+from index.ingest_pipeline import percentile
+from index.vector_store import make_vector_store
+
+
+def _vectors(n: int, dim: int, seed: int = 0) -> List[List[float]]:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        v = [rnd.gauss(0.0, 1.0) for _ in range(dim)]
+        norm = math.sqrt(sum(x * x for x in v)) or 1.0
+        out.append([x / norm for x in v])
+    return out
+
+
+def _stats(ms: List[float], wall: float) -> Dict[str, float]:
+    return {"n": len(ms), "p50_ms": percentile(ms, 0.50), "p99_ms": percentile(ms, 0.99), "max_ms": max(ms), "qps": len(ms) / wall}
+
+
+def _run_sync(fn: Callable[[List[float]], None], vecs: List[List[float]], concurrency: int) -> Dict[str, float]:
+    def timed(v: List[float]) -> float:
+        t0 = time.perf_counter()
+        fn(v)
+        return (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        ms = list(pool.map(timed, vecs))
+    return _stats(ms, time.perf_counter() - t0)
+
+
+async def _run_async(store, vecs: List[List[float]], concurrency: int, top_k: int, namespace: str) -> Dict[str, float]:
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def timed(v: List[float]) -> float:
+        async with sem:
+            t0 = time.perf_counter()
+            await store.aquery(vector=v, top_k=top_k, namespace=namespace)
+            return (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    ms = await asyncio.gather(*(timed(v) for v in vecs))
+    wall = time.perf_counter() - t0
+    await store.aclose()
+    return _stats(list(ms), wall)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--top-k", type=int, default=RECALL_K)
+    ap.add_argument("--namespace", default=PINECONE_NAMESPACE)
+    ap.add_argument("--modes", nargs="+", default=["per-call", "pooled", "async"])
+    ap.add_argument("--json", default=None)
+    args = ap.parse_args()
+    if VECTOR_BACKEND != "pinecone":
+        raise SystemExit("bench_pinecone_query needs VECTOR_BACKEND=pinecone")
+
+    store = make_vector_store()
+    store.ensure_index()
+    store.index()  # resolve host + connect once, outside the timings
+    vecs = _vectors(args.queries, INDEX_DIM)
+
+    def per_call(v: List[float]) -> None:
+        store.pc.Index(host=store.host).query(
+            namespace=args.namespace, vector=v, top_k=args.top_k, include_metadata=True, filter={}
+        )
+
+    def pooled(v: List[float]) -> None:
+        store.query(vector=v, top_k=args.top_k, namespace=args.namespace)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for mode in args.modes:
+        if mode == "per-call":
+            results[mode] = _run_sync(per_call, vecs, args.concurrency)
+        elif mode == "pooled":
+            results[mode] = _run_sync(pooled, vecs, args.concurrency)
+        elif mode == "async":
+            if PINECONE_GRPC:
+                print("async: skipped (HTTP client only)")
+                continue
+            results[mode] = asyncio.run(_run_async(store, vecs, args.concurrency, args.top_k, args.namespace))
+        else:
+            raise SystemExit(f"unknown mode {mode!r}")
+        r = results[mode]
+        print(
+            f"{mode:<9} n={r['n']:<5} p50={r['p50_ms']:7.1f} ms  p99={r['p99_ms']:7.1f} ms  "
+            f"max={r['max_ms']:7.1f} ms  {r['qps']:.1f} q/s"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"host": store.host, "concurrency": args.concurrency, "results": results}, f, indent=2)
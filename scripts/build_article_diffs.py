@@ -0,0 +1,48 @@
+# scripts/build_article_diffs.py
+"""
+Rebuild the season-to-season article diffs from the local article index + docstore
+(no PDF parsing, embedding or Pinecone calls). build_index rebuilds the regulations
+whose documents it wrote or deleted; this rebuilds all of them.
+
+    python -m scripts.build_article_diffs
+    python -m scripts.build_article_diffs --show 12 --seasons 2024 2025
+"""
+import argparse
+import time
+
+from config import (
+    PINECONE_NAMESPACE,
+    DOCSTORE_PATH,
+    ARTICLE_INDEX_PATH,
+    ARTICLE_DIFF_PATH,
+)
+from index.article_diffs import ArticleDiffIndex, build_article_diffs, render_diff
+from index.article_index import ArticleIndex
+from index.docstore_sqlite import SQLiteDocStore
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--namespace", default=PINECONE_NAMESPACE)
+    ap.add_argument("--show", default=None, help="print the stored diffs of this article")
+    ap.add_argument("--seasons", type=int, nargs=2, default=None, metavar=("FROM", "TO"))
+    ap.add_argument("--no-build", action="store_true", help="only --show, do not rebuild")
+    args = ap.parse_args()
+
+    diff_index = ArticleDiffIndex(ARTICLE_DIFF_PATH)
+
+    if not args.no_build:
+        t0 = time.perf_counter()
+        n = build_article_diffs(
+            args.namespace,
+            article_index=ArticleIndex(ARTICLE_INDEX_PATH),
+            docstore=SQLiteDocStore(DOCSTORE_PATH),
+            diff_index=diff_index,
+        )
+        print(f"Built {n} article diffs for namespace={args.namespace} in {time.perf_counter() - t0:.2f}s")
+
+    if args.show:
+        lo, hi = args.seasons or (0, 9999)
+        for d in diff_index.lookup(args.namespace, [args.show], lo, hi):
+            print()
+            print(f"[{d.doc_type} | {d.source_from} -> {d.source_to}]")
+            print(render_diff(d))
@@ -1,6 +1,17 @@
 # scripts/build_index.py
+import argparse
+
 from index.build_index import build_index_from_pdfs
-from config import PDF_DIR
+from config import PDF_DIR, INCREMENTAL_INDEX
 
 if __name__ == "__main__":
-    build_index_from_pdfs(PDF_DIR)
+    ap = argparse.ArgumentParser(description="Build / refresh the FIA regulations index.")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", dest="incremental", action="store_true",
+                      help="only re-index new or modified PDFs (by version_hash)")
+    mode.add_argument("--full", dest="incremental", action="store_false",
+                      help="re-index every PDF")
+    ap.set_defaults(incremental=INCREMENTAL_INDEX)
+    args = ap.parse_args()
+
+    build_index_from_pdfs(PDF_DIR, incremental=args.incremental)
@@ -0,0 +1,133 @@
+# scripts/eval_first_stage.py
+"""
+recall@k of shortened first-stage vectors against full-dimension search, computed
+locally from the embedding store (exact search, no Pinecone calls):
+
+  first-stage  top-k by the shortened vectors only
+  two-stage    top-ceil(k * oversample) by the shortened vectors, rescored with the
+               full vectors (what PineconeRetriever does with FIRST_STAGE_DIM)
+
+Ground truth is the exact top-k by the full EMBED_DIM vectors (= the full-dimension index).
+Queries: the gold eval questions (embedded with the configured backend), or with
+--sample N, stored vectors of N random chunks (fully offline; the chunk itself is excluded).
+
+    python -m scripts.eval_first_stage --dims 256 512 1024 --k 24
+    python -m scripts.eval_first_stage --sample 200 --oversample 2 3
+"""
+import argparse
+import json
+import math
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from config import (
+    PINECONE_NAMESPACE,
+    DOCSTORE_PATH,
+    MANIFEST_PATH,
+    MANIFEST_TARGET,
+    EMBED_STORE_PATH,
+    EMBEDDING_MODEL,
+    EMBED_DIM,
+    FIRST_STAGE_DIM,
+    RESCORE_OVERSAMPLE,
+)
+from embeddings.embedding_store import EmbeddingStore
+from index.docstore_sqlite import SQLiteDocStore
+from index.manifest import IndexManifest
+
+
+def _shorten_rows(mat: np.ndarray, dim: int) -> np.ndarray:
+    """embedder.shorten for every row: first `dim` components renormalized."""
+    head = mat[:, :dim]
+    norms = np.linalg.norm(head, axis=1, keepdims=True)
+    return head / np.where(norms == 0, 1.0, norms)
+
+
+def _top(scores: np.ndarray, n: int) -> np.ndarray:
+    """Column indices of the n best scores per row, best first."""
+    n = min(n, scores.shape[1])
+    part = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+def _load_corpus(namespace: str) -> Dict[str, np.ndarray]:
+    ids = sorted({cid for e in IndexManifest(MANIFEST_PATH, target=MANIFEST_TARGET).get_all(namespace).values() for cid in e.chunk_ids})
+    store = EmbeddingStore(EMBED_STORE_PATH, model=EMBEDDING_MODEL, dimension=EMBED_DIM)
+    docstore = SQLiteDocStore(DOCSTORE_PATH)
+    out: Dict[str, np.ndarray] = {}
+    for i in range(0, len(ids), 500):
+        texts = docstore.get_many(ids[i:i + 500])
+        keys = {cid: store.key(t) for cid, t in texts.items()}
+        vecs = store.get_many(list(keys.values()))
+        out.update({cid: np.asarray(vecs[k], dtype=np.float32) for cid, k in keys.items() if k in vecs})
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--namespace", default=PINECONE_NAMESPACE)
+    ap.add_argument("--dims", type=int, nargs="+", default=[FIRST_STAGE_DIM] if FIRST_STAGE_DIM else [256, 512, 1024])
+    ap.add_argument("--k", type=int, default=24, help="recall depth (RECALL_K)")
+    ap.add_argument("--oversample", type=float, nargs="+", default=[RESCORE_OVERSAMPLE])
+    ap.add_argument("--queries", default="gold_rag_eval.json")
+    ap.add_argument("--sample", type=int, default=0, help="use N random chunks as queries instead")
+    ap.add_argument("--json", default=None, help="also write results here")
+    args = ap.parse_args()
+
+    corpus = _load_corpus(args.namespace)
+    if not corpus:
+        raise SystemExit(f"No stored vectors for namespace={args.namespace} (build with EMBED_STORE_ENABLED=1)")
+
+    ids = sorted(corpus)
+    full = _shorten_rows(np.stack([corpus[cid] for cid in ids]), EMBED_DIM)  # unit rows
+
+    skip: List[int]  # row of the chunk each query was taken from (-1: none)
+    if args.sample:
+        rnd = random.Random(0)
+        skip = sorted(rnd.sample(range(len(ids)), min(args.sample, len(ids))))
+        queries = full[skip]
+    else:
+        from embeddings.embedder import embed_texts
+
+        with open(args.queries, encoding="utf-8") as f:
+            texts = [row["query"] for row in json.load(f)]
+        queries = _shorten_rows(np.asarray(embed_texts(texts), dtype=np.float32), EMBED_DIM)
+        skip = [-1] * len(texts)
+
+    def scores_for(q: np.ndarray, c: np.ndarray) -> np.ndarray:
+        s = q @ c.T
+        for row, col in enumerate(skip):
+            if col >= 0:
+                s[row, col] = -np.inf  # the query chunk itself
+        return s
+
+    full_scores = scores_for(queries, full)
+    truth = [set(row) for row in _top(full_scores, args.k).tolist()]
+    print(f"namespace={args.namespace} | {len(ids)} chunks | {len(queries)} queries | k={args.k} | full dim={EMBED_DIM}")
+
+    results = []
+    n_max = max(args.k, math.ceil(args.k * max(args.oversample)))
+    for dim in args.dims:
+        cand = _top(scores_for(_shorten_rows(queries, dim), _shorten_rows(full, dim)), n_max)
+        row = {"dim": dim, "index_size": dim / EMBED_DIM, "first_stage": 0.0}
+        for os_ in args.oversample:
+            row[f"two_stage@{os_:g}x"] = 0.0
+        for qi, want in enumerate(truth):
+            row["first_stage"] += len(want & set(cand[qi, :args.k].tolist())) / args.k
+            for os_ in args.oversample:
+                pool = cand[qi, :math.ceil(args.k * os_)]
+                rescored = pool[np.argsort(-full_scores[qi, pool], kind="stable")]
+                row[f"two_stage@{os_:g}x"] += len(want & set(rescored[:args.k].tolist())) / args.k
+        for key in row:
+            if key not in ("dim", "index_size"):
+                row[key] /= len(queries)
+        results.append(row)
+        cols = " | ".join(f"{k}={v:.3f}" for k, v in row.items() if k != "dim")
+        print(f"dim={dim:<5} {cols}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "chunks": len(ids), "queries": len(queries), "results": results}, f, indent=2)
@@ -0,0 +1,113 @@
+# scripts/eval_retrieval_modes.py
+"""
+recall@k of RETRIEVAL_MODE=vector vs hybrid (and lexical) across RECALL_K values,
+through PineconeRetriever.retrieve_many (same embedding, vector search, BM25 and RRF
+code as serving): does hybrid at a lower RECALL_K keep vector recall at the default?
+
+Queries need known answers:
+
+  --queries FILE  rows {"query": ..., "relevant_ids": [chunk ids]}; recall@k =
+                  share of a query's relevant ids in its top k
+  --sample N      known-item queries: a --query-words span of N random indexed chunks;
+                  hit@k = the chunk (or an identical copy from another issue) is in
+                  the top k. Spans are verbatim text, which favours BM25.
+
+Needs a built index (configured vector backend + docstore with the lexical index,
+LEXICAL_INDEX_ENABLED=1).
+
+    python -m scripts.eval_retrieval_modes --sample 200 --ks 8 12 16 24
+    python -m scripts.eval_retrieval_modes --queries labelled.json --ks 12 24 --json modes.json
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+from config import (
+    PINECONE_NAMESPACE,
+    DOCSTORE_PATH,
+    MANIFEST_PATH,
+    MANIFEST_TARGET,
+    RECALL_K,
+)
+from retriever_interface import RetrievalRequest
+from index.docstore_sqlite import SQLiteDocStore
+from index.manifest import IndexManifest
+from index.pinecone_adapter import PineconeRetriever
+from index.vector_store import make_vector_store
+
+# (query, relevant chunk ids, ids that must be found: 1 for known-item queries)
+Query = Tuple[str, Set[str], int]
+
+
+def _sample_queries(n: int, words: int, seed: int) -> List[Query]:
+    manifest = IndexManifest(MANIFEST_PATH, target=MANIFEST_TARGET)
+    ids = sorted({cid for e in manifest.get_all(PINECONE_NAMESPACE).values() for cid in e.chunk_ids})
+    texts = SQLiteDocStore(DOCSTORE_PATH).get_many(ids)
+    copies: Dict[str, Set[str]] = {}
+    for cid, text in texts.items():
+        copies.setdefault(text, set()).add(cid)
+
+    rnd = random.Random(seed)
+    out: List[Query] = []
+    for cid in rnd.sample(sorted(texts), min(n, len(texts))):
+        toks = texts[cid].split()
+        start = rnd.randrange(max(1, len(toks) - words + 1))
+        out.append((" ".join(toks[start:start + words]), copies[texts[cid]], 1))
+    return out
+
+
+def _labelled_queries(path: str) -> List[Query]:
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+    out = [
+        (row["query"], set(row["relevant_ids"]), len(set(row["relevant_ids"])))
+        for row in rows
+        if row.get("relevant_ids")
+    ]
+    if not out:
+        raise SystemExit(f"No rows with relevant_ids in {path} (or use --sample N)")
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ks", type=int, nargs="+", default=sorted({8, 12, 16, RECALL_K}))
+    ap.add_argument("--modes", nargs="+", default=["vector", "hybrid", "lexical"])
+    ap.add_argument("--queries", default=None, help="labelled queries (relevant_ids per row)")
+    ap.add_argument("--sample", type=int, default=200, help="known-item queries from N random chunks")
+    ap.add_argument("--query-words", type=int, default=12)
+    ap.add_argument("--batch", type=int, default=32, help="requests per retrieve_many call")
+    ap.add_argument("--json", default=None, help="also write results here")
+    args = ap.parse_args()
+
+    queries = _labelled_queries(args.queries) if args.queries else _sample_queries(args.sample, args.query_words, seed=0)
+    if not queries:
+        raise SystemExit(f"Nothing indexed in namespace={PINECONE_NAMESPACE} ({MANIFEST_TARGET})")
+
+    store = make_vector_store()
+    store.ensure_index()
+    retrievers = {mode: PineconeRetriever(pinecone_store=store, mode=mode) for mode in args.modes}
+    if any(m != "vector" for m in args.modes) and not next(iter(retrievers.values())).docstore.lexical:
+        raise SystemExit("Docstore has no lexical index: build with LEXICAL_INDEX_ENABLED=1")
+
+    print(f"namespace={PINECONE_NAMESPACE} | {len(queries)} queries ({'labelled' if args.queries else 'known-item'})")
+    results = []
+    for k in args.ks:
+        for mode, retriever in retrievers.items():
+            found = 0.0
+            t0 = time.perf_counter()
+            for i in range(0, len(queries), args.batch):
+                part = queries[i:i + args.batch]
+                lists = retriever.retrieve_many([RetrievalRequest(query=q, filters={}, recall_k=k) for q, _, _ in part])
+                for (_, relevant, need), chunks in zip(part, lists):
+                    found += min(need, len(relevant & {c.id for c in chunks})) / need
+            ms = (time.perf_counter() - t0) * 1000 / len(queries)
+            row = {"k": k, "mode": mode, "recall": found / len(queries), "ms_per_query": ms}
+            results.append(row)
+            print(f"k={k:<4} {mode:<8} recall@k={row['recall']:.3f}  {ms:.1f} ms/query")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"queries": len(queries), "labelled": bool(args.queries), "results": results}, f, indent=2)
@@ -1,28 +1,11 @@
 # scripts/run_eval.py
-from index.pinecone_store import PineconeStore
+from index.vector_store import make_vector_store
 from index.pinecone_adapter import PineconeRetriever
 from eval.run_eval import run_eval
 
-from config import (
-    PINECONE_API_KEY,
-    PINECONE_INDEX,
-    EMBED_DIM,
-    METRIC,
-    PINECONE_CLOUD,
-    PINECONE_REGION,
-    PINECONE_HOST,
-)
 
 def make_retriever():
-    store = PineconeStore(
-        api_key=PINECONE_API_KEY,
-        index_name=PINECONE_INDEX,
-        dimension=EMBED_DIM,
-        metric=METRIC,
-        cloud=PINECONE_CLOUD,
-        region=PINECONE_REGION,
-        host=PINECONE_HOST,
-    )
+    store = make_vector_store()
     store.ensure_index()
     return PineconeRetriever(pinecone_store=store)
 
@@ -2,27 +2,15 @@
 import time
 
 from config import RECALL_K, TOP_K
-from index.pinecone_store import PineconeStore
+from index.vector_store import make_vector_store
 from index.pinecone_adapter import PineconeRetriever
-from config import (
-    PINECONE_API_KEY, PINECONE_INDEX, EMBED_DIM, METRIC,
-    PINECONE_CLOUD, PINECONE_REGION, PINECONE_HOST
-)
 
 from index.query_planner import plan_query
 from index.retrieval_executor import execute_plan
 
 
 def main():
-    store = PineconeStore(
-        api_key=PINECONE_API_KEY,
-        index_name=PINECONE_INDEX,
-        dimension=EMBED_DIM,
-        metric=METRIC,
-        cloud=PINECONE_CLOUD,
-        region=PINECONE_REGION,
-        host=PINECONE_HOST,
-    )
+    store = make_vector_store()
     store.ensure_index()
 
     retriever = PineconeRetriever(pinecone_store=store)
@@ -1,23 +1,11 @@
 import time
 from config import RECALL_K
-from index.pinecone_store import PineconeStore
+from index.vector_store import make_vector_store
 from index.pinecone_adapter import PineconeRetriever
 from index.filters import build_filters
-from config import (
-    PINECONE_API_KEY, PINECONE_INDEX, EMBED_DIM, METRIC,
-    PINECONE_CLOUD, PINECONE_REGION, PINECONE_HOST
-)
 
 def main():
-    store = PineconeStore(
-        api_key=PINECONE_API_KEY,
-        index_name=PINECONE_INDEX,
-        dimension=EMBED_DIM,
-        metric=METRIC,
-        cloud=PINECONE_CLOUD,
-        region=PINECONE_REGION,
-        host=PINECONE_HOST,
-    )
+    store = make_vector_store()
     store.ensure_index()
 
     r = PineconeRetriever(pinecone_store=store)